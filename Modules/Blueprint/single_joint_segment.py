@@ -1,6 +1,7 @@
 import maya.cmds as cmds
 import os
 import System.blueprint as blueprint_mod
+import System.utils as utils
 from importlib import reload
 
 reload(blueprint_mod)
@@ -40,24 +41,20 @@ class Single_Joint_Segment(blueprint_mod.Blueprint):
         # return module_info
 
         joint_positions = []
-        joint_orientation_values = []
         joint_rotation_orders = []
         joints = self.get_joints()
 
-        for joint in joints:
-            joint_positions.append(
-                cmds.xform(joint, q=True, worldSpace=True, translation=True)
-            )
+        joint_positions.extend(utils.split_rows(utils.get_world_positions(joints), 3))
 
         clean_parent = self.module_namespace + ":joints_grp"
 
-        orientation_info = self.orientation_control_joint_get_orientation(
-            joints[0], clean_parent
+        # Solved with the rest of the character, see solve_lock_orientations
+        joint_orientations = (
+            self.orientation_control_joint_get_orientation_inputs(
+                [(joints[0], joints[1])], clean_parent
+            ),
+            None,
         )
-        cmds.delete(orientation_info[1])
-        joint_orientation_values.append(orientation_info[0])
-
-        joint_orientations = (joint_orientation_values, None)
         joint_rotation_orders.append(cmds.getAttr(joints[0] + ".rotateOrder"))
         joint_preferred_angles = None
         hook_object = self.find_hook_obj_for_lock()
@@ -71,7 +68,7 @@ class Single_Joint_Segment(blueprint_mod.Blueprint):
             hook_object,
             root_transform,
         )
-        return module_info
+        return blueprint_mod.make_lock_record(module_info)
 
     def UI_custom(self):
         joints = self.get_joints()
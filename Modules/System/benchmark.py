@@ -0,0 +1,335 @@
+"""Scaling benchmarks for blueprint install, lock, rename, rehook and delete.
+
+Run from the Modules directory, either headless or inside mayapy:
+
+    python -m System.benchmark --backend headless --sizes 1 10 100
+    mayapy -m System.benchmark --backend maya --baseline bench.json
+
+Each run builds synthetic characters out of Single_Joint_Segment modules
+hooked into a chain or a binary tree and reports, per operation, wall time,
+the number of cmds calls and the nodes created per module. Calls are counted
+through System.instrumentation; --profile and --trace expose its full output.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import System.instrumentation as instrumentation
+
+SIZES = [1, 10, 100, 1000]
+TOPOLOGIES = ["chain", "tree"]
+OPERATIONS = [
+    "install",
+    "rename",
+    "rehook",
+    "delete",
+    "lock",
+    "lock_compact",
+    "bulk_install",
+]
+UTILITY_NODE_TYPES = ["plusMinusAverage", "multiplyDivide"]
+
+MODULE_FILE = "single_joint_segment"
+INSTRUMENTED_MODULES = ["System.utils", "System.blueprint", "System.blueprint_UI"]
+
+
+def load_backend(backend):
+    if backend == "headless":
+        import System.headless_cmds as headless_cmds
+
+        headless_cmds.install()
+    else:
+        import maya.standalone
+
+        maya.standalone.initialize(name="python")
+
+    import maya.cmds as cmds
+
+    return cmds
+
+
+def hook_index(topology, index):
+    if index == 0:
+        return None
+    if topology == "chain":
+        return index - 1
+    return (index - 1) // 2
+
+
+def module_names(size):
+    return ["bench_%d" % index for index in range(size)]
+
+
+def hook_control(module_class, user_specified_name):
+    return "%s__%s:end_joint_translation_control" % (
+        module_class.__name__,
+        user_specified_name,
+    )
+
+
+def build_specs(module_class, topology, size):
+    names = module_names(size)
+    specs = []
+
+    for index, name in enumerate(names):
+        hook = hook_index(topology, index)
+        hook_obj = None
+        if hook != None:
+            hook_obj = hook_control(module_class, names[hook])
+
+        specs.append(
+            {"module": module_class, "user_specified_name": name, "hook_object": hook_obj}
+        )
+
+    return specs
+
+
+def build(module_class, topology, size):
+    modules = []
+
+    for spec in build_specs(module_class, topology, size):
+        module = module_class(spec["user_specified_name"], spec["hook_object"])
+        module.install()
+        modules.append(module)
+
+    return modules
+
+
+def bulk_build(module_class, topology, size):
+    import System.bulk_install as bulk_install
+
+    # Reversed so the dependency ordering has work to do
+    specs = build_specs(module_class, topology, size)
+    specs.reverse()
+    return bulk_install.install_modules(specs)
+
+
+def run_operation(cmds, operation):
+    node_count = len(cmds.ls())
+    calls = instrumentation.total_calls()
+    start = time.perf_counter()
+
+    operation()
+
+    return {
+        "seconds": time.perf_counter() - start,
+        "calls": instrumentation.total_calls() - calls,
+        "nodes": len(cmds.ls()) - node_count,
+    }
+
+
+def time_scene_open(cmds):
+    # Saves the scene to a temporary .ma and times opening it again
+    import os
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "benchmark_scene.ma")
+    cmds.file(rename=path)
+    cmds.file(save=True, type="mayaAscii", force=True)
+
+    start = time.perf_counter()
+    cmds.file(path, open=True, force=True)
+    seconds = time.perf_counter() - start
+
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+    return seconds
+
+
+def run_case(cmds, backend, module_class, topology, size):
+    import System.blueprint_UI as blueprint_UI
+
+    results = {}
+    names = module_names(size)
+    modules = []
+
+    def install():
+        modules.extend(build(module_class, topology, size))
+
+    def rename():
+        for module in modules:
+            module.rename_module_instance(module.user_specified_name + "_renamed")
+            module.user_specified_name += "_renamed"
+
+    def rehook():
+        for module in modules:
+            module.rehook(None)
+        for index, module in enumerate(modules):
+            hook = hook_index(topology, index)
+            if hook != None:
+                module.rehook(
+                    modules[hook].module_namespace + ":end_joint_translation_control"
+                )
+
+    def delete():
+        for module in modules:
+            module.delete()
+
+    cmds.file(new=True, force=True)
+    for name, operation in [
+        ("install", install),
+        ("rename", rename),
+        ("rehook", rehook),
+        ("delete", delete),
+    ]:
+        results[name] = run_operation(cmds, operation)
+
+    for name, compact_creation_pose in [("lock", False), ("lock_compact", True)]:
+        cmds.file(new=True, force=True)
+        build(module_class, topology, size)
+        results[name] = run_operation(
+            cmds, lambda: blueprint_UI.lock_blueprint_modules(compact_creation_pose)
+        )
+
+        # Creation pose network size, and on Maya what it costs to load
+        results[name]["utility_nodes"] = len(cmds.ls(type=UTILITY_NODE_TYPES))
+        if backend == "maya":
+            results[name]["open_seconds"] = time_scene_open(cmds)
+
+    cmds.file(new=True, force=True)
+    results["bulk_install"] = run_operation(
+        cmds, lambda: bulk_build(module_class, topology, size)
+    )
+
+    for result in results.values():
+        result["nodes_per_module"] = result["nodes"] / float(len(names))
+
+    return results
+
+
+def run(backend, sizes, topologies, trace=False):
+    cmds = load_backend(backend)
+
+    # blueprint_UI reloads utils and the module class reloads blueprint on
+    # import, so load both before enabling instrumentation or the patches
+    # get replaced
+    import System.blueprint_UI
+    import System.utils as utils
+
+    module_class = utils.find_module_class("/Modules/Blueprint", MODULE_FILE)
+    instrumentation.reset()
+    instrumentation.enable(INSTRUMENTED_MODULES, trace=trace)
+
+    report = {"backend": backend, "results": {}}
+    for topology in topologies:
+        for size in sizes:
+            key = "%s/%d" % (topology, size)
+            report["results"][key] = run_case(
+                cmds, backend, module_class, topology, size
+            )
+
+    instrumentation.disable()
+    return report
+
+
+def compare(report, baseline, time_tolerance):
+    # A case regresses when it makes more cmds calls than the baseline, or
+    # takes more than (1 + time_tolerance) times as long.
+    regressions = []
+    for key, operations in report["results"].items():
+        baseline_operations = baseline.get("results", {}).get(key)
+        if baseline_operations == None:
+            continue
+
+        for operation, result in operations.items():
+            expected = baseline_operations.get(operation)
+            if expected == None:
+                continue
+
+            if result["calls"] > expected["calls"]:
+                regressions.append(
+                    "%s %s: %d cmds calls (baseline %d)"
+                    % (key, operation, result["calls"], expected["calls"])
+                )
+            if result["seconds"] > expected["seconds"] * (1.0 + time_tolerance):
+                regressions.append(
+                    "%s %s: %.3fs (baseline %.3fs)"
+                    % (key, operation, result["seconds"], expected["seconds"])
+                )
+
+    return regressions
+
+
+def format_report(report):
+    lines = [
+        "%-12s %-12s %10s %10s %14s"
+        % ("case", "op", "seconds", "calls", "nodes/module")
+    ]
+    for key, operations in report["results"].items():
+        for operation in OPERATIONS:
+            result = operations[operation]
+            lines.append(
+                "%-12s %-12s %10.4f %10d %14.1f"
+                % (
+                    key,
+                    operation,
+                    result["seconds"],
+                    result["calls"],
+                    result["nodes_per_module"],
+                )
+            )
+
+    lines.append("")
+    lines.append(
+        "%-12s %-12s %14s %14s" % ("case", "lock", "utility nodes", "open seconds")
+    )
+    for key, operations in report["results"].items():
+        for operation in ["lock", "lock_compact"]:
+            result = operations[operation]
+            open_seconds = result.get("open_seconds")
+            lines.append(
+                "%-12s %-12s %14d %14s"
+                % (
+                    key,
+                    operation,
+                    result["utility_nodes"],
+                    "-" if open_seconds == None else "%.4f" % open_seconds,
+                )
+            )
+
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["headless", "maya"], default="headless")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--topologies", nargs="+", choices=TOPOLOGIES, default=TOPOLOGIES)
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--save-baseline", help="write this run's report as JSON")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--profile", action="store_true", help="print per-command timings"
+    )
+    parser.add_argument("--trace", help="write a Chrome trace-event JSON file")
+    args = parser.parse_args(argv)
+
+    report = run(args.backend, args.sizes, args.topologies, trace=args.trace != None)
+    print(format_report(report))
+
+    if args.profile:
+        print("")
+        print(instrumentation.format_table(limit=25))
+    if args.trace:
+        instrumentation.write_chrome_trace(args.trace)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.time_tolerance)
+
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
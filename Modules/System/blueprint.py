@@ -1,6 +1,137 @@
-import os
 import maya.cmds as cmds
 import System.utils as utils
+import System.module_index as module_index
+import System.hook_graph as hook_graph
+import System.transform_math as transform_math
+
+from array import array
+from collections import namedtuple
+
+
+class LockRecord(
+    namedtuple(
+        "LockRecord",
+        [
+            "joint_positions",
+            "joint_orientations",
+            "joint_rotation_orders",
+            "joint_preferred_angles",
+            "hook_object",
+            "root_transform",
+        ],
+    )
+):
+    # lock_phase_1 output, field for field the old 6-tuple, with per-joint
+    # vectors flattened into arrays: positions array("d") of 3 * joints,
+    # orientations (array("d"), None), (OrientationInputs, None) until
+    # solve_lock_orientations or (None, axis_info), rotation orders array("i")
+    # and preferred angles array("d") or None
+    __slots__ = ()
+
+    @property
+    def joint_count(self):
+        return len(self.joint_positions) // 3
+
+    def joint_position(self, index):
+        return self.joint_positions[index * 3 : index * 3 + 3].tolist()
+
+
+class OrientationInputs(
+    namedtuple(
+        "OrientationInputs", ["aim_vectors", "up_vectors", "twists", "parent_matrices"]
+    )
+):
+    # Joint orient solver inputs, one entry per joint. lock_phase_1 may return
+    # them in place of orientation values, to be solved together with the rest
+    # of the character by solve_lock_orientations.
+    __slots__ = ()
+
+
+def solve_lock_orientations(module_infos):
+    # LockRecords for lock_phase_1 results, with the OrientationInputs of all
+    # of them solved in one solve_joint_orientations call
+    records = [make_lock_record(module_info) for module_info in module_infos]
+    inputs = [
+        record.joint_orientations[0]
+        for record in records
+        if isinstance(record.joint_orientations[0], OrientationInputs)
+    ]
+    if not inputs:
+        return records
+
+    orientations = transform_math.solve_joint_orientations(
+        *[[value for entry in inputs for value in entry[field]] for field in range(4)]
+    )
+
+    solved = []
+    offset = 0
+    for record in records:
+        joint_orientations = record.joint_orientations[0]
+        if isinstance(joint_orientations, OrientationInputs):
+            count = len(joint_orientations.twists)
+            record = record._replace(
+                joint_orientations=(
+                    flatten_vectors(orientations[offset : offset + count]),
+                    None,
+                )
+            )
+            offset += count
+        solved.append(record)
+
+    return solved
+
+
+def flatten_vectors(vectors):
+    values = array("d")
+    for vector in vectors:
+        values.extend(vector)
+    return values
+
+
+def make_lock_record(module_info):
+    if isinstance(module_info, LockRecord):
+        return module_info
+
+    joint_orientations = module_info[1]
+    if joint_orientations[0] != None and not isinstance(
+        joint_orientations[0], OrientationInputs
+    ):
+        joint_orientations = (flatten_vectors(joint_orientations[0]), None)
+
+    joint_preferred_angles = module_info[3]
+    if joint_preferred_angles != None:
+        joint_preferred_angles = flatten_vectors(joint_preferred_angles)
+
+    return LockRecord(
+        flatten_vectors(module_info[0]),
+        joint_orientations,
+        array("i", [int(order) for order in module_info[2]]),
+        joint_preferred_angles,
+        module_info[4],
+        module_info[5],
+    )
+
+
+def snap_modules_roots_to_hooks(modules):
+    # snap_root_to_hook for many modules, with one position query for all hooks
+    roots_and_hooks = []
+    for module in modules:
+        hook_object = module.find_hook_obj()
+        if hook_object != f"{module.module_namespace}:unhookedTarget":
+            root_control = module.get_translation_control(
+                f"{module.module_namespace}:{module.joint_info[0][0]}"
+            )
+            roots_and_hooks.append((root_control, hook_object))
+
+    hook_positions = utils.split_rows(
+        utils.get_world_positions([hook for root, hook in roots_and_hooks]), 3
+    )
+    for (root_control, hook_object), hook_object_pos in zip(
+        roots_and_hooks, hook_positions
+    ):
+        cmds.xform(
+            root_control, worldSpace=True, absolute=True, translation=hook_object_pos
+        )
 
 
 class Blueprint:
@@ -29,6 +160,7 @@ class Blueprint:
         # joint_positions = list of joint positions, from root down the hierarchy
         # joint_orientations = a list or orientations, or a list of axis information (orientJoint and secondaryAxisOrient for joint command)
         #                   These are passed in the following tuple: (orientations, None) or (None, axis_info)
+        #                   orientations may be OrientationInputs, solved for the whole character at lock
         # joint_rotation_orders = a list of joint rotations orders (integer values gathered with getAttr)
         # joint_preferred_angles = a list of joint preferred angles, optional (can pass None)
         # hook_object = self.find_hook_object_for_lock()
@@ -41,7 +173,8 @@ class Blueprint:
         temp = 1
 
     # BaseClass Methods
-    def install(self):
+    def install(self, update_scene=True, lock_container=True):
+        # Bulk installs pass False for both and refresh/lock once at the end
         cmds.namespace(setNamespace=":")
         cmds.namespace(add=self.module_namespace)
 
@@ -92,7 +225,15 @@ class Blueprint:
 
             cmds.setAttr(joint_name_full + ".visibility", 0)
 
-            utils.add_node_to_container(self.container_name, joint_name_full)
+            if index > 0:
+                cmds.joint(parent_joint, edit=True, orientJoint="xyz", sao="yup")
+
+            index += 1
+
+        utils.add_node_to_container(self.container_name, joints)
+
+        for joint_name_full in joints:
+            joint_name = utils.strip_all_namespaces(joint_name_full)[1]
             cmds.container(
                 self.container_name,
                 edit=True,
@@ -107,18 +248,16 @@ class Blueprint:
                 ],
             )
 
-            if index > 0:
-                cmds.joint(parent_joint, edit=True, orientJoint="xyz", sao="yup")
-
-            index += 1
-
         cmds.parent(joints[0], self.joints_grp, absolute=True)
 
         self.initialize_module_transform(self.joint_info[0][1])
 
         translation_controls = []
-        for joint in joints:
-            translation_controls.append(self.create_translation_control_at_joint(joint))
+        joint_positions = utils.split_rows(utils.get_world_positions(joints), 3)
+        for joint, joint_pos in zip(joints, joint_positions):
+            translation_controls.append(
+                self.create_translation_control_at_joint(joint, joint_pos)
+            )
 
         root_joint_point_constraint = cmds.pointConstraint(
             translation_controls[0],
@@ -132,35 +271,40 @@ class Blueprint:
         self.initialize_hook(translation_controls[0])
 
         # Setup stretchy joint segments
-        for index in range(len(joints) - 1):
-            self.setup_stretchy_joint_segments(joints[index], joints[index + 1])
+        with utils.container_batch():
+            for index in range(len(joints) - 1):
+                self.setup_stretchy_joint_segments(joints[index], joints[index + 1])
 
         self.install_custom(joints)
 
-        utils.force_scene_update()
+        if update_scene:
+            utils.force_scene_update(self.container_name)
 
-        cmds.lockNode(self.container_name, lock=True, lockUnpublished=True)
+        if lock_container:
+            cmds.lockNode(self.container_name, lock=True, lockUnpublished=True)
 
-    def create_translation_control_at_joint(self, joint):
-        pos_control_file = (
-            os.environ["RIGGING_TOOL_ROOT"]
-            + "/ControlObjects/Blueprint/translation_control.ma"
+        module_index.add_module(
+            type(self).__module__.rpartition(".")[2],
+            self.module_name,
+            self.user_specified_name,
         )
-        cmds.file(pos_control_file, i=True)
+        hook_graph.set_hook(self.module_namespace, self.hook_obj)
 
-        container = cmds.rename(
-            "translation_control_container", joint + "_translation_control_container"
-        )
+    def create_translation_control_at_joint(self, joint, joint_pos=None):
+        container = utils.create_control_object(
+            "/ControlObjects/Blueprint/translation_control.ma",
+            joint + "_",
+            "translation_control_container",
+        )[0]
 
         utils.add_node_to_container(self.container_name, container)
-        for node in cmds.container(container, q=True, nodeList=True):
-            cmds.rename(node, joint + "_" + node, ignoreShape=True)
 
         control = joint + "_translation_control"
 
         cmds.parent(control, self.module_transform, absolute=True)
 
-        joint_pos = cmds.xform(joint, q=True, worldSpace=True, translation=True)
+        if joint_pos == None:
+            joint_pos = utils.get_world_positions([joint]).tolist()
         cmds.xform(control, worldSpace=True, absolute=True, translation=joint_pos)
 
         nice_name = utils.strip_leading_namespace(joint)[1]
@@ -205,6 +349,7 @@ class Blueprint:
             lock_minimum_length=False,
             pole_vector_object=pole_vector_locator,
             scale_correction_attribute=None,
+            pack_channels=True,
         )
 
         ik_handle = ik_nodes["ik_handle"]
@@ -255,15 +400,9 @@ class Blueprint:
         parent_joint,
         child_joint,
     ):
-        object_file = os.environ["RIGGING_TOOL_ROOT"] + object_relative_file_path
-
-        cmds.file(object_file, i=True)
-        object_container = cmds.rename(
-            object_container_name, parent_joint + "_" + object_container_name
-        )
-
-        for node in cmds.container(object_container, q=True, nodeList=True):
-            cmds.rename(node, parent_joint + "_" + node, ignoreShape=True)
+        object_container = utils.create_control_object(
+            object_relative_file_path, parent_joint + "_", object_container_name
+        )[0]
 
         object = parent_joint + "_" + object_name
 
@@ -289,14 +428,13 @@ class Blueprint:
         return (object_container, object, constrained_grp)
 
     def initialize_module_transform(self, root_pos):
-        control_grp_file = (
-            os.environ["RIGGING_TOOL_ROOT"]
-            + "/ControlObjects/Blueprint/controlGroup_control.ma"
-        )
-        cmds.file(control_grp_file, i=True)
+        control_grp = utils.create_control_object(
+            "/ControlObjects/Blueprint/controlGroup_control.ma",
+            self.module_namespace + ":",
+        )[1][0]
 
         self.module_transform = cmds.rename(
-            "controlGroup_control", self.module_namespace + ":module_transform"
+            control_grp, self.module_namespace + ":module_transform"
         )
 
         cmds.xform(
@@ -383,6 +521,53 @@ class Blueprint:
     def get_orientation_control(self, joint_name):
         return joint_name + "_orientation_control"
 
+    def orientation_control_joint_get_orientations(self, joint_pairs, clean_parent):
+        # Joint orients, relative to clean_parent, for each (joint, child) pair
+        # with the joint's orientation control twist baked in
+        return transform_math.solve_joint_orientations(
+            *self.orientation_control_joint_get_orientation_inputs(
+                joint_pairs, clean_parent
+            )
+        )
+
+    def orientation_control_joint_get_orientation_inputs(
+        self, joint_pairs, clean_parent
+    ):
+        # OrientationInputs for orientation_control_joint_get_orientations, read
+        # from queried world transforms without creating or editing any nodes
+        num_pairs = len(joint_pairs)
+        matrices = utils.split_rows(
+            utils.get_world_matrices(
+                [clean_parent]
+                + [pair[0] for pair in joint_pairs]
+                + [pair[1] for pair in joint_pairs]
+            ),
+            16,
+        )
+        parent_matrix = matrices[0]
+
+        aim_vectors = []
+        up_vectors = []
+        twists = []
+        for index, (joint, child_joint) in enumerate(joint_pairs):
+            joint_matrix = matrices[1 + index]
+            child_matrix = matrices[1 + num_pairs + index]
+
+            aim_vectors.append(
+                transform_math.subtract(
+                    transform_math.get_translation(child_matrix),
+                    transform_math.get_translation(joint_matrix),
+                )
+            )
+            up_vectors.append(joint_matrix[4:7])
+            twists.append(
+                cmds.getAttr(self.get_orientation_control(joint) + ".rotateX")
+            )
+
+        return OrientationInputs(
+            aim_vectors, up_vectors, twists, [parent_matrix] * num_pairs
+        )
+
     def orientation_control_joint_get_orientation(self, joint, clean_parent):
         new_clean_parent = cmds.duplicate(joint, parentOnly=True)[0]
 
@@ -410,101 +595,200 @@ class Blueprint:
         orientation_values = (orient_x, orient_y, orient_z)
         return (orientation_values, new_clean_parent)
 
-    def lock_phase_2(self, module_info):
-        joint_positions = module_info[0]
-        num_joints = len(joint_positions)
-        joint_orientations = module_info[1]
-        orient_with_axis = False
-        pure_orientations = False
-
-        if joint_orientations[0] == None:
-            orient_with_axis = True
-            joint_orientations = joint_orientations[1]
-        else:
-            pure_orientations = True
-            joint_orientations = joint_orientations[0]
-
-        num_orientations = len(joint_orientations)
-        joint_rotation_orders = module_info[2]
-        num_rotations_orders = len(joint_rotation_orders)
-        joint_preferred_angles = module_info[3]
-        num_preferred_angles = 0
-        if joint_preferred_angles != None:
-            num_preferred_angles = len(joint_preferred_angles)
-
-        # hook_object = module_info[4]
-        root_transform = module_info[5]
-
-        # Delete blueprint controls
+    def delete_blueprint_controls(self):
         cmds.lockNode(self.container_name, lock=False, lockUnpublished=False)
         cmds.delete(self.container_name)
         cmds.namespace(setNamespace=":")
 
+    def create_lock_joints(self, module_info):
+        # Builds the locked joint chain from a LockRecord without touching the
+        # selection. Returns (joints, local translateX of each joint).
+        record = solve_lock_orientations([module_info])[0]
+        if record.joint_orientations[0] == None:
+            return self.create_lock_joints_with_axis(record)
+
+        num_joints = record.joint_count
+        orientations = record.joint_orientations[0]
+        num_orientations = len(orientations) // 3
+        rotation_orders = record.joint_rotation_orders
+        preferred_angles = record.joint_preferred_angles
+
         joint_radius = 1
         if num_joints == 1:
             joint_radius = 1.5
 
-        # Initialize as an empty list
+        # Local transforms are solved up front; the chain sits under an
+        # identity group, so the root's world matrix is its local matrix
+        parent_world_matrix = transform_math.identity()
+        local_values = []
+        for i in range(num_joints):
+            joint_orientation = [0.0, 0.0, 0.0]
+            if i < num_orientations:
+                joint_orientation = orientations[i * 3 : i * 3 + 3].tolist()
+
+            local_translation = transform_math.transform_point(
+                record.joint_position(i), transform_math.inverse(parent_world_matrix)
+            )
+            local_values.append((local_translation, joint_orientation))
+
+            parent_world_matrix = transform_math.multiply(
+                transform_math.compose(
+                    translate=local_translation, joint_orient=joint_orientation
+                ),
+                parent_world_matrix,
+            )
+
         new_joints = []
+        for i in range(num_joints):
+            local_translation, joint_orientation = local_values[i]
 
+            parent = {}
+            if i > 0:
+                parent = {"parent": new_joints[i - 1]}
+            new_joint = cmds.createNode(
+                "joint",
+                name=self.module_namespace + ":blueprint_" + self.joint_info[i][0],
+                **parent,
+            )
+            new_joints.append(new_joint)
+
+            cmds.setAttr(new_joint + ".translate", *local_translation, type="double3")
+            if joint_orientation != [0.0, 0.0, 0.0]:
+                cmds.setAttr(
+                    new_joint + ".jointOrient", *joint_orientation, type="double3"
+                )
+            if joint_radius != 1:
+                cmds.setAttr(new_joint + ".radius", joint_radius)
+            if i < len(rotation_orders) and rotation_orders[i] != 0:
+                cmds.setAttr(new_joint + ".rotateOrder", rotation_orders[i])
+            if preferred_angles != None and i < len(preferred_angles) // 3:
+                cmds.setAttr(
+                    new_joint + ".preferredAngle",
+                    *preferred_angles[i * 3 : i * 3 + 3].tolist(),
+                    type="double3",
+                )
+            cmds.setAttr(new_joint + ".segmentScaleCompensate", 0)
+
+        return new_joints, array("d", [values[0][0] for values in local_values])
+
+    def create_lock_joints_with_axis(self, record):
+        # orientJoint needs the chain in place, so these joints are built with
+        # the joint command one at a time
+        num_joints = record.joint_count
+        joint_orientations = record.joint_orientations[1]
+        num_orientations = len(joint_orientations)
+        rotation_orders = record.joint_rotation_orders
+        preferred_angles = record.joint_preferred_angles
+
+        joint_radius = 1
+        if num_joints == 1:
+            joint_radius = 1.5
+
+        new_joints = []
         for i in range(num_joints):
             cmds.select(clear=True)
 
-            if orient_with_axis:
-                new_joint = cmds.joint(
-                    n=self.module_namespace + ":blueprint_" + self.joint_info[i][0],
-                    p=joint_positions[i],
-                    rotationOrder="xyz",
-                    radius=joint_radius,
+            new_joint = cmds.joint(
+                n=self.module_namespace + ":blueprint_" + self.joint_info[i][0],
+                p=record.joint_position(i),
+                rotationOrder="xyz",
+                radius=joint_radius,
+            )
+
+            if i != 0:
+                cmds.parent(new_joint, new_joints[i - 1], absolute=True)
+                offset_index = i - 1
+                if offset_index < num_orientations:
+                    cmds.joint(
+                        new_joints[offset_index],
+                        edit=True,
+                        oj=joint_orientations[offset_index][0],
+                        sao=joint_orientations[offset_index][1],
+                    )
+
+                    cmds.makeIdentity(new_joint, rotate=True, apply=True)
+
+            new_joints.append(new_joint)
+
+            if i < len(rotation_orders):
+                cmds.setAttr(new_joint + ".rotateOrder", rotation_orders[i])
+
+            if preferred_angles != None and i < len(preferred_angles) // 3:
+                cmds.setAttr(
+                    new_joint + ".preferredAngle",
+                    *preferred_angles[i * 3 : i * 3 + 3].tolist(),
+                    type="double3",
                 )
 
-                if i != 0:
-                    cmds.parent(new_joint, new_joints[i - 1], absolute=True)
-                    offset_index = i - 1
-                    if offset_index < num_orientations:
-                        cmds.joint(
-                            new_joints[offset_index],
-                            edit=True,
-                            oj=joint_orientations[offset_index][0],
-                            sao=joint_orientations[offset_index][1],
-                        )
+            cmds.setAttr(new_joint + ".segmentScaleCompensate", 0)
 
-                        cmds.makeIdentity(new_joint, rotate=True, apply=True)
+        local_tx = array("d", [cmds.getAttr(joint + ".tx") for joint in new_joints])
+        return new_joints, local_tx
 
-            else:
-                if i != 0:
-                    cmds.select(new_joints[i - 1])
+    def create_compact_creation_pose_network(
+        self, joints, local_tx, setting_locator
+    ):
+        # One plusMinusAverage per joint drives both rotate (output3D) and
+        # translateX (output1D). The weighted rest translateX values are packed
+        # three joints to a multiplyDivide, and there are no dummy rotation
+        # multipliers: an unconnected input3D[0] already contributes zero.
+        num_joints = len(joints)
+        utility_nodes = []
+        add_nodes = []
 
-                joint_orientation = [0.0, 0.0, 0.0]
-                if i < num_orientations:
-                    # Assign the orientation values
-                    joint_orientation = list(joint_orientations[i])
+        for i, joint in enumerate(joints):
+            drives_rotation = i < (num_joints - 1) or num_joints == 1
+            suffix = "_addRotations" if drives_rotation else "_addTx"
 
-                new_joint = cmds.joint(
-                    n=self.module_namespace + ":blueprint_" + self.joint_info[i][0],
-                    p=joint_positions[i],
-                    orientation=joint_orientation,
-                    rotationOrder="xyz",
-                    radius=joint_radius,
+            add_node = cmds.shadingNode(
+                "plusMinusAverage", n=joint + suffix, asUtility=True
+            )
+            if drives_rotation:
+                cmds.connectAttr(add_node + ".output3D", joint + ".rotate", force=True)
+            if i > 0:
+                cmds.connectAttr(
+                    add_node + ".output1D", joint + ".translateX", force=True
                 )
 
-            new_joints.append(new_joint)
+            add_nodes.append(add_node)
+            utility_nodes.append(add_node)
 
-            if i < num_rotations_orders:
-                cmds.setAttr(new_joint + ".rotateOrder", int(joint_rotation_orders[i]))
+        for first in range(1, num_joints, 3):
+            original_tx_multiply = cmds.shadingNode(
+                "multiplyDivide", n=joints[first] + "_original_Tx", asUtility=True
+            )
+            utility_nodes.append(original_tx_multiply)
 
-            if i < num_preferred_angles:
+            for i, channel in zip(range(first, min(first + 3, num_joints)), "XYZ"):
                 cmds.setAttr(
-                    new_joint + ".preferredAngleX", int(joint_rotation_orders[i][0])
+                    original_tx_multiply + ".input1" + channel, local_tx[i], lock=True
                 )
-                cmds.setAttr(
-                    new_joint + ".preferredAngleY", int(joint_rotation_orders[i][1])
+                cmds.connectAttr(
+                    setting_locator + ".creationPoseWeight",
+                    original_tx_multiply + ".input2" + channel,
+                    force=True,
                 )
-                cmds.setAttr(
-                    new_joint + ".preferredAngleZ", int(joint_rotation_orders[i][2])
+                cmds.connectAttr(
+                    original_tx_multiply + ".output" + channel,
+                    add_nodes[i] + ".input1D[0]",
+                    force=True,
                 )
 
-            cmds.setAttr(new_joint + ".segmentScaleCompensate", 0)
+        return utility_nodes
+
+    def lock_phase_2(self, module_info, lock_joints=None, compact_creation_pose=False):
+        # lock_joints is create_lock_joints() output when the caller has already
+        # built the joints (see lock_blueprint_modules). compact_creation_pose
+        # builds the smaller network from create_compact_creation_pose_network.
+        record = make_lock_record(module_info)
+        num_joints = record.joint_count
+        root_transform = record.root_transform
+
+        if lock_joints == None:
+            self.delete_blueprint_controls()
+            lock_joints = self.create_lock_joints(record)
+
+        new_joints, local_tx = lock_joints
 
         blueprint_grp = cmds.group(
             empty=True, name=self.module_namespace + ":blueprint_joint_grp"
@@ -527,8 +811,8 @@ class Blueprint:
             cmds.setAttr(rename_node + ".visibility", 0)
             i += 1
 
-        cmds.select(blueprint_grp, replace=True)
         cmds.addAttr(
+            blueprint_grp,
             at="bool", defaultValue=0, longName="controlModulesInstalled", k=False
         )
 
@@ -539,15 +823,24 @@ class Blueprint:
         setting_locator = cmds.spaceLocator(n=self.module_namespace + ":SETTINGS")[0]
         cmds.setAttr(setting_locator + ".visibility", 0)
 
-        cmds.select(setting_locator, replace=True)
-        cmds.addAttr(at="enum", ln="activeModule", en="None:", k=False)
-        cmds.addAttr(at="float", ln="creationPoseWeight", defaultValue=1, k=False)
+        cmds.addAttr(setting_locator, at="enum", ln="activeModule", en="None:", k=False)
+        cmds.addAttr(
+            setting_locator,
+            at="float",
+            ln="creationPoseWeight",
+            defaultValue=1,
+            k=False,
+        )
 
         i = 0
         utility_nodes = []
+        if compact_creation_pose:
+            utility_nodes = self.create_compact_creation_pose_network(
+                new_joints, local_tx, setting_locator
+            )
 
         for joint in new_joints:
-            if i < (num_joints - 1) or num_joints == 1:
+            if not compact_creation_pose and (i < (num_joints - 1) or num_joints == 1):
                 add_node = cmds.shadingNode(
                     "plusMinusAverage", n=joint + "_addRotations", asUtility=True
                 )
@@ -566,8 +859,8 @@ class Blueprint:
                 )
                 utility_nodes.append(dummy_rotations_multiply)
 
-            if i > 0:
-                original_tx = cmds.getAttr(joint + ".tx")
+            if i > 0 and not compact_creation_pose:
+                original_tx = local_tx[i]
                 add_tx_node = cmds.shadingNode(
                     "plusMinusAverage", n=joint + "_addTx", asUtility=True
                 )
@@ -593,7 +886,7 @@ class Blueprint:
                     force=True,
                 )
                 utility_nodes.append(original_tx_multiply)
-            else:
+            elif i == 0:
                 if root_transform:
                     original_translates = cmds.getAttr(joint + ".translate")[0]
                     add_translate_node = cmds.shadingNode(
@@ -700,8 +993,7 @@ class Blueprint:
             ],
         )
 
-        cmds.select(module_grp)
-        cmds.addAttr(at="float", longName="hierarchicalScale")
+        cmds.addAttr(module_grp, at="float", longName="hierarchicalScale")
         cmds.connectAttr(f"{hook_grp}.scaleY", f"{module_grp}.hierarchicalScale")
 
     def UI(self, blueprint_ui_instance, parent_column_layout):
@@ -726,43 +1018,23 @@ class Blueprint:
             )
 
     def delete(self):
-        cmds.lockNode(self.container_name, lock=False, lockUnpublished=False)
-
-        valid_module_info = utils.find_all_module_names("/Modules/Blueprint")
-        valid_modules = valid_module_info[0]
-        valid_module_names = valid_module_info[1]
-
-        hooked_modules = set()
-        for joint_inf in self.joint_info:
-            joint = joint_inf[0]
-            translation_control = self.get_translation_control(
-                f"{self.module_namespace}:{joint}"
-            )
-
-            connections = cmds.listConnections(translation_control)
-
-            for connection in connections:
-                module_instance = utils.strip_leading_namespace(connection)
-
-                if module_instance != None:
-                    split_string = module_instance[0].partition("__")
-                    if (
-                        module_instance[0] != self.module_namespace
-                        and split_string[0] in valid_module_names
-                    ):
-                        index = valid_module_names.index(split_string[0])
-                        hooked_modules.add((valid_modules[index], split_string[2]))
+        with utils.editing_session(self.container_name, "delete_module"):
+            for namespace in hook_graph.find_hooked_modules(self.module_namespace):
+                module_info = module_index.find_module(namespace)
+                module_class = utils.find_module_class(
+                    "/Modules/Blueprint", module_info["file"]
+                )
+                module_inst = module_class(module_info["user_specified_name"], None)
+                module_inst.rehook(None)
 
-        for module in hooked_modules:
-            mod = __import__(f"Blueprint.{module[0]}", {}, {}, [module[0]])
-            module_class = getattr(mod, mod.CLASS_NAME)
-            module_inst = module_class(module[1], None)
-            module_inst.rehook(None)
+            cmds.delete(self.container_name)
+            utils.rename_session_container(self.container_name)
 
-        cmds.delete(self.container_name)
+            cmds.namespace(setNamespace=":")
+            cmds.namespace(removeNamespace=self.module_namespace)
 
-        cmds.namespace(setNamespace=":")
-        cmds.namespace(removeNamespace=self.module_namespace)
+        module_index.remove_module(self.module_namespace)
+        hook_graph.remove_module(self.module_namespace)
 
     def rename_module_instance(self, new_name):
         if new_name == self.user_specified_name:
@@ -778,16 +1050,20 @@ class Blueprint:
             return False
         else:
             new_namespace = f"{self.module_name}__{new_name}"
-            cmds.lockNode(self.container_name, lock=False, lockUnpublished=False)
-            cmds.namespace(setNamespace=":")
-            cmds.namespace(add=new_namespace)
-            cmds.namespace(setNamespace=":")
-            cmds.namespace(moveNamespace=[self.module_namespace, new_namespace])
-            cmds.namespace(removeNamespace=self.module_namespace)
-
-            self.module_namespace = new_namespace
-            self.container_name = f"{self.module_namespace}:module_container"
-            cmds.lockNode(self.container_name, lock=True, lockUnpublished=True)
+            with utils.editing_session(self.container_name, "rename_module"):
+                cmds.namespace(setNamespace=":")
+                cmds.namespace(add=new_namespace)
+                cmds.namespace(setNamespace=":")
+                cmds.namespace(moveNamespace=[self.module_namespace, new_namespace])
+                cmds.namespace(removeNamespace=self.module_namespace)
+
+                module_index.rename_module(self.module_namespace, new_name)
+                hook_graph.rename_module(self.module_namespace, new_namespace)
+
+                self.module_namespace = new_namespace
+                container_name = f"{self.module_namespace}:module_container"
+                utils.rename_session_container(self.container_name, container_name)
+                self.container_name = container_name
             return True
 
     def initialize_hook(self, root_translation_control):
@@ -802,11 +1078,8 @@ class Blueprint:
         if self.hook_obj == None:
             self.hook_obj = unhooked_locator
 
-        root_pos = cmds.xform(
-            root_translation_control, q=True, worldSpace=True, translation=True
-        )
-        target_pos = cmds.xform(
-            self.hook_obj, q=True, worldSpace=True, translation=True
+        root_pos, target_pos = utils.split_rows(
+            utils.get_world_positions([root_translation_control, self.hook_obj]), 3
         )
 
         cmds.select(clear=True)
@@ -843,7 +1116,11 @@ class Blueprint:
             )
 
         ik_nodes = utils.basic_stretchy_ik(
-            root_joint, target_joint, hook_container, lock_minimum_length=False
+            root_joint,
+            target_joint,
+            hook_container,
+            lock_minimum_length=False,
+            pack_channels=True,
         )
         ik_handle = ik_nodes["ik_handle"]
         root_locator = ik_nodes["root_locator"]
@@ -903,10 +1180,14 @@ class Blueprint:
 
         if self.hook_obj == old_hook_obj:
             return
-        
-        self.unconstrain_root_from_hook()
 
-        cmds.lockNode(self.container_name, lock=False, lockUnpublished=False)
+        with utils.editing_session(self.container_name, "rehook"):
+            self.unconstrain_root_from_hook()
+            self.connect_hook_constraint()
+
+        hook_graph.set_hook(self.module_namespace, self.hook_obj)
+
+    def connect_hook_constraint(self):
         hook_constraint = f"{self.module_namespace}:hook_pointConstraint"
 
         cmds.connectAttr(
@@ -930,16 +1211,11 @@ class Blueprint:
             force=True,
         )
 
-        cmds.lockNode(self.container_name, lock=True, lockUnpublished=True)
-
     def find_hook_obj(self):
-        hook_constraint = f"{self.module_namespace}:hook_pointConstraint"
-        source_attr = cmds.connectionInfo(
-            f"{hook_constraint}.target[0].targetParentMatrix",
-            sourceFromDestination=True,
-        )
-        source_node = str(source_attr.rpartition(".")[0])
-        return source_node
+        hook_object = hook_graph.find_hook_object(self.module_namespace)
+        if hook_object == None:
+            hook_object = hook_graph.query_hook_object(self.module_namespace)
+        return hook_object
 
     def find_hook_obj_for_lock(self):
         hook_object = self.find_hook_obj()
@@ -980,20 +1256,7 @@ class Blueprint:
         cmds.lockNode(module_container, lock=True, lockUnpublished=True)
 
     def snap_root_to_hook(self):
-        root_control = self.get_translation_control(
-            f"{self.module_namespace}:{self.joint_info[0][0]}"
-        )
-        hook_object = self.find_hook_obj()
-
-        if hook_object == f"{self.module_namespace}:unhookedTarget":
-            return
-
-        hook_object_pos = cmds.xform(
-            hook_object, q=True, worldSpace=True, translation=True
-        )
-        cmds.xform(
-            root_control, worldSpace=True, absolute=True, translation=hook_object_pos
-        )
+        snap_modules_roots_to_hooks([self])
 
     def constrain_root_to_hook(self):
         root_control = self.get_translation_control(
@@ -1004,43 +1267,37 @@ class Blueprint:
         if hook_object == f"{self.module_namespace}:unhookedTarget":
             return
 
-        cmds.lockNode(self.container_name, lock=False, lockUnpublished=False)
-
-        cmds.pointConstraint(
-            hook_object,
-            root_control,
-            maintainOffset=False,
-            n=f"{root_control}_hookConstraint",
-        )
-        cmds.setAttr(f"{root_control}.translate", l=True)
-        cmds.setAttr(f"{root_control}.visibility", l=False)
-        cmds.setAttr(f"{root_control}.visibility", 0)
-        cmds.setAttr(f"{root_control}.visibility", l=True)
-
-        cmds.select(clear=True)
+        with utils.editing_session(self.container_name, "constrain_root_to_hook"):
+            cmds.pointConstraint(
+                hook_object,
+                root_control,
+                maintainOffset=False,
+                n=f"{root_control}_hookConstraint",
+            )
+            cmds.setAttr(f"{root_control}.translate", l=True)
+            cmds.setAttr(f"{root_control}.visibility", l=False)
+            cmds.setAttr(f"{root_control}.visibility", 0)
+            cmds.setAttr(f"{root_control}.visibility", l=True)
 
-        cmds.lockNode(self.container_name, lock=True, lockUnpublished=True)
+            cmds.select(clear=True)
 
     def unconstrain_root_from_hook(self):
-        cmds.lockNode(self.container_name, lock=False, lockUnpublished=False)
-
         root_control = self.get_translation_control(
             f"{self.module_namespace}:{self.joint_info[0][0]}"
         )
         root_control_hook_constraint = f"{root_control}_hookConstraint"
 
-        if cmds.objExists(root_control_hook_constraint):
-            cmds.delete(root_control_hook_constraint)
+        with utils.editing_session(self.container_name, "unconstrain_root_from_hook"):
+            if cmds.objExists(root_control_hook_constraint):
+                cmds.delete(root_control_hook_constraint)
 
-            cmds.setAttr(f"{root_control}.translate", l=False)
-            cmds.setAttr(f"{root_control}.visibility", l=False)
-            cmds.setAttr(f"{root_control}.visibility", 1)
-            cmds.setAttr(f"{root_control}.visibility", l=True)
-            
-            cmds.select(root_control, replace=True)
-            cmds.setToolTo("moveSuperContext")
+                cmds.setAttr(f"{root_control}.translate", l=False)
+                cmds.setAttr(f"{root_control}.visibility", l=False)
+                cmds.setAttr(f"{root_control}.visibility", 1)
+                cmds.setAttr(f"{root_control}.visibility", l=True)
 
-        cmds.lockNode(self.container_name, lock=True, lockUnpublished=True)
+                cmds.select(root_control, replace=True)
+                cmds.setToolTo("moveSuperContext")
         
     def is_root_constrained(self):
         root_control = self.get_translation_control(
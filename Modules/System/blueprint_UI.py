@@ -1,16 +1,90 @@
 import maya.cmds as cmds
+from collections import OrderedDict
 from functools import partial
 from importlib import reload
 import System.utils as utils
+import System.module_index as module_index
+import System.hook_graph as hook_graph
+import System.blueprint as blueprint
 
 reload(utils)
 
+# Module specific panels kept alive (hidden) for quick reselection
+MODULE_PANEL_CACHE_SIZE = 8
+
+# Module library rows built per "More..." click
+MODULE_LIST_PAGE_SIZE = 20
+
+
+def lock_blueprint_modules(compact_creation_pose=False):
+    # Converts every blueprint module in the scene to joints, returns the count.
+    # Modules lock in hook order; raises ValueError, before touching the
+    # scene, if the hooks form a cycle.
+    module_index.is_module_index_consistent()
+    module_info = []
+    for namespace in hook_graph.hook_order():
+        module = module_index.find_module(namespace)
+        module_info.append([module["file"], module["user_specified_name"]])
+
+    if len(module_info) == 0:
+        return 0
+
+    # Gather every module's data first, solving all joint orients in one call,
+    # then delete the blueprint controls and build all locked joints in one
+    # pass before the per-module networks. Classes are loaded first, since
+    # loading one may reload System.blueprint and with it OrientationInputs.
+    module_classes = [
+        utils.find_module_class("/Modules/Blueprint", module[0])
+        for module in module_info
+    ]
+
+    module_insts = [
+        module_class(module[1], None)
+        for module, module_class in zip(module_info, module_classes)
+    ]
+    lock_records = blueprint.solve_lock_orientations(
+        [module_inst.lock_phase_1() for module_inst in module_insts]
+    )
+    module_instances = list(zip(module_insts, lock_records))
+
+    for module in module_instances:
+        module[0].delete_blueprint_controls()
+
+    lock_joints = [module[0].create_lock_joints(module[1]) for module in module_instances]
+
+    for module, joints in zip(module_instances, lock_joints):
+        module[0].lock_phase_2(module[1], joints, compact_creation_pose)
+
+    for module in module_instances:
+        hook_object = module[1][4]
+        module[0].lock_phase3(hook_object)
+
+    # No blueprint controls are left to share the control object templates
+    utils.invalidate_control_object_templates()
+
+    return len(module_instances)
+
 
 class Blueprint_UI:
     def __init__(self) -> None:
         self.module_instance = None
         self.UI_elements = {}
 
+        # Namespace the module specific controls were last built for
+        self.selected_module_namespace = None
+        self.selection_resolved = False
+        self.selection_update_pending = False
+
+        # namespace -> (panel layout, module instance, module index entry), least
+        # recently shown first
+        self.module_panels = OrderedDict()
+        self.shown_panel = None
+
+        # Module library entries matching the filter, and how many have rows
+        self.module_matches = []
+        self.shown_module_count = 0
+        self.pending_icons = []
+
         if cmds.window("blueprint_UI_window", exists=True):
             cmds.deleteUI("blueprint_UI_window")
 
@@ -56,13 +130,27 @@ class Blueprint_UI:
 
         self.create_script_job()
 
+        for event in ["NewSceneOpened", "SceneOpened"]:
+            cmds.scriptJob(
+                event=[event, self.clear_module_panels],
+                parent=self.UI_elements["window"],
+            )
+
     def create_script_job(self):
+        # Stays registered until the window closes or a rehook takes over the
+        # selection; bursts of events (marquee drags) become one idle update
         self.job_num = cmds.scriptJob(
-            event=["SelectionChanged", self.modify_selected],
-            runOnce=True,
+            event=["SelectionChanged", self.queue_selection_update],
             parent=self.UI_elements["window"],
         )
 
+    def queue_selection_update(self, *args):
+        if self.selection_update_pending:
+            return
+
+        self.selection_update_pending = True
+        cmds.evalDeferred(self.modify_selected, lowestPriority=True)
+
     def delete_script_job(self):
         cmds.scriptJob(kill=self.job_num)
 
@@ -72,6 +160,11 @@ class Blueprint_UI:
 
         self.UI_elements["module_column"] = cmds.columnLayout(adj=True, rs=3)
 
+        self.UI_elements["module_filter"] = cmds.textField(
+            placeholderText="Search modules",
+            textChangedCommand=self.filter_module_list,
+        )
+
         self.UI_elements["module_frame_layout"] = cmds.frameLayout(
             height=scroll_height,
             collapsable=False,
@@ -88,10 +181,15 @@ class Blueprint_UI:
         # First separator
         cmds.separator()
 
-        for module in utils.find_all_modules("Modules/Blueprint"):
-            self.create_module_install_button(module)
+        # Rows are built a page at a time once the window is up, see
+        # filter_module_list
+        self.UI_elements["module_rows_column"] = cmds.columnLayout(adj=True, rs=2)
         cmds.setParent(self.UI_elements["module_list_column"])
+        self.UI_elements["more_modules_btn"] = cmds.button(
+            label="More...", manage=False, c=self.show_more_modules
+        )
         cmds.separator()
+        cmds.evalDeferred(self.filter_module_list, lowestPriority=True)
 
         cmds.setParent(self.UI_elements["module_column"])
         cmds.separator()
@@ -168,13 +266,64 @@ class Blueprint_UI:
         cmds.setParent(self.UI_elements["module_column"])
         cmds.separator()
 
-    def create_module_install_button(self, module):
-        mod = __import__("Blueprint." + module, {}, {}, [module])
-        reload(mod)
+    def filter_module_list(self, *args):
+        if not cmds.window(self.UI_elements["window"], exists=True):
+            return
+
+        search_text = cmds.textField(
+            self.UI_elements["module_filter"], q=True, text=True
+        )
+        terms = (search_text or "").lower().split()
+
+        self.module_matches = []
+        for module_info in utils.find_all_module_info("/Modules/Blueprint"):
+            module_text = " ".join(
+                [module_info["file"], module_info["title"], module_info["description"]]
+            ).lower()
+            if all(term in module_text for term in terms):
+                self.module_matches.append(module_info)
+
+        existing_rows = cmds.columnLayout(
+            self.UI_elements["module_rows_column"], q=True, childArray=True
+        )
+        if existing_rows != None:
+            cmds.deleteUI(existing_rows)
+
+        self.shown_module_count = 0
+        self.show_more_modules()
 
-        title = mod.TITLE
-        description = mod.DESCRIPTION
-        icon = mod.ICON
+    def show_more_modules(self, *args):
+        start = self.shown_module_count
+        page = self.module_matches[start : start + MODULE_LIST_PAGE_SIZE]
+
+        for module_info in page:
+            cmds.setParent(self.UI_elements["module_rows_column"])
+            self.create_module_install_button(module_info)
+        self.shown_module_count += len(page)
+
+        cmds.button(
+            self.UI_elements["more_modules_btn"],
+            edit=True,
+            manage=self.shown_module_count < len(self.module_matches),
+        )
+
+        if self.pending_icons:
+            cmds.evalDeferred(self.load_module_icons, lowestPriority=True)
+
+    def load_module_icons(self, *args):
+        # Icons are read after the rows they belong to are on screen
+        pending_icons = self.pending_icons
+        self.pending_icons = []
+
+        for button, icon in pending_icons:
+            if cmds.symbolButton(button, exists=True):
+                cmds.symbolButton(button, edit=True, image=icon)
+
+    def create_module_install_button(self, module_info):
+        module = module_info["file"]
+        title = module_info["title"]
+        description = module_info["description"]
+        icon = module_info["icon"]
 
         # Create UI
         button_size = 64
@@ -187,9 +336,9 @@ class Blueprint_UI:
         self.UI_elements["module_button_" + module] = cmds.symbolButton(
             width=button_size,
             height=button_size,
-            image=icon,
             command=partial(self.install_module, module),
         )
+        self.pending_icons.append((self.UI_elements["module_button_" + module], icon))
 
         text_column = cmds.columnLayout(columnAlign="center")
         cmds.text(align="left", width=self.scroll_width - button_size - 16, label=title)
@@ -203,27 +352,15 @@ class Blueprint_UI:
         )
 
     def install_module(self, module, *args):
-        basename = "instance_"
-        cmds.namespace(setNamespace=":")
-        namespaces = cmds.namespaceInfo(listOnlyNamespaces=True)
-
-        for i in range(len(namespaces)):
-            if namespaces[i].find("__") != -1:
-                namespaces[i] = namespaces[i].partition("__")[2]
-
-        new_suffix = utils.find_highest_trailing_number(namespaces, basename) + 1
-        user_spec_name = basename + str(new_suffix)
+        user_spec_name = module_index.allocate_user_specified_names("instance_")[0]
 
         hook_obj = self.find_hook_object_from_selection()
 
-        mod = __import__("Blueprint." + module, {}, {}, [module])
-        reload(mod)
-
-        module_class = getattr(mod, mod.CLASS_NAME)
+        module_class = utils.find_module_class("/Modules/Blueprint", module)
         module_instance = module_class(user_spec_name, hook_obj)
         module_instance.install()
 
-        module_transform = mod.CLASS_NAME + "__" + user_spec_name + ":module_transform"
+        module_transform = module_instance.module_namespace + ":module_transform"
         cmds.select(module_transform, replace=True)
         cmds.setToolTo("moveSuperContext")
 
@@ -241,59 +378,36 @@ class Blueprint_UI:
         if result != "Accept":
             return
 
-        module_info = []  # store  (module, user_specified_name) pairs
-
-        cmds.namespace(setNamespace=":")
-        namespaces = cmds.namespaceInfo(listOnlyNamespaces=True)
-
-        module_name_info = utils.find_all_module_names("/Modules/Blueprint")
-        valid_modules = module_name_info[0]
-        valid_modules_names = module_name_info[1]
-
-        for n in namespaces:
-            split_string = n.partition("__")
-
-            if split_string[1] != "":
-                module = split_string[0]
-                user_specified_name = split_string[2]
-
-                if module in valid_modules_names:
-                    index = valid_modules_names.index(module)
-                    module_info.append([valid_modules[index], user_specified_name])
-
-        if len(module_info) == 0:
+        try:
+            module_count = lock_blueprint_modules()
+        except ValueError as error:
             cmds.confirmDialog(
                 messageAlign="center",
                 title="Lock Blueprints",
-                message="There appears to be no blueprint module \ninstances in the current scene. \nAborting lock.",
+                message=f"{error}. \nRe-hook one of these modules and lock again.",
                 button=["Accept"],
                 defaultButton="Accept",
             )
             return
+        self.clear_module_panels()
 
-        module_instances = []
-        for module in module_info:
-            mod = __import__("Blueprint." + module[0], {}, {}, [module[0]])
-            reload(mod)
-
-            module_class = getattr(mod, mod.CLASS_NAME)
-            module_inst = module_class(module[1], None)
-            module_info = module_inst.lock_phase_1()
-
-            module_instances.append((module_inst, module_info))
-
-        for module in module_instances:
-            module[0].lock_phase_2(module[1])
-
-        for module in module_instances:
-            hook_object = module[1][4]
-            module[0].lock_phase3(hook_object)
+        if module_count == 0:
+            cmds.confirmDialog(
+                messageAlign="center",
+                title="Lock Blueprints",
+                message="There appears to be no blueprint module \ninstances in the current scene. \nAborting lock.",
+                button=["Accept"],
+                defaultButton="Accept",
+            )
 
     def modify_selected(self, *args):
+        self.selection_update_pending = False
+        if not cmds.window(self.UI_elements["window"], exists=True):
+            return
+
         selected_nodes = cmds.ls(selection=True)
 
         if len(selected_nodes) <= 1:
-            self.module_instance = None
             selected_module_namespace = None
             current_module_file = None
 
@@ -304,20 +418,20 @@ class Blueprint_UI:
                 if namespace_and_node != None:
                     namespace = namespace_and_node[0]
 
-                    module_name_info = utils.find_all_module_names("/Modules/Blueprint")
-                    valid_modules = module_name_info[0]
-                    valid_module_names = module_name_info[1]
+                    module_info = module_index.find_module(namespace)
+                    if module_info != None:
+                        current_module_file = module_info["file"]
+                        selected_module_namespace = namespace
 
-                    index = 0
-                    for module_name in valid_module_names:
-                        module_name_including_suffix = module_name + "__"
+            if (
+                self.selection_resolved
+                and selected_module_namespace == self.selected_module_namespace
+            ):
+                return
 
-                        if namespace.find(module_name_including_suffix) == 0:
-                            current_module_file = valid_modules[index]
-                            selected_module_namespace = namespace
-                            break
-
-                        index += 1
+            self.selection_resolved = True
+            self.selected_module_namespace = selected_module_namespace
+            self.module_instance = None
 
             control_enable = False
             user_specified_name = ""
@@ -329,13 +443,14 @@ class Blueprint_UI:
                 control_enable = True
                 user_specified_name = selected_module_namespace.partition("__")[2]
 
-                mod = __import__(
-                    # "Blueprint." + current_module_file, {}, {}, [current_module_file]
-                    f"Blueprint.{current_module_file}", {}, {}, [current_module_file])
-                reload(mod)
-
-                module_class = getattr(mod, mod.CLASS_NAME)
-                self.module_instance = module_class(user_specified_name, None)
+                cached = self.find_module_panel(selected_module_namespace)
+                if cached != None:
+                    self.module_instance = cached[1]
+                else:
+                    module_class = utils.find_module_class(
+                        "/Modules/Blueprint", current_module_file
+                    )
+                    self.module_instance = module_class(user_specified_name, None)
                 
                 if self.module_instance.is_root_constrained():
                     constrain_command = self.unconstrain_root_from_hook
@@ -369,28 +484,88 @@ class Blueprint_UI:
 
             self.create_specific_controls()
 
-        self.create_script_job()
-
     def create_specific_controls(self):
-        existing_controls = cmds.columnLayout(
-            self.UI_elements["module_specific_column"], q=True, childArray=True
+        # Each module gets its own panel under module_specific_column, built on
+        # first selection and then only shown or hidden
+        namespace = None
+        if self.module_instance != None:
+            namespace = self.selected_module_namespace
+
+        cached = self.find_module_panel(namespace)
+        self.module_panels.pop(namespace, None)
+        panel = None
+        if cached != None:
+            panel = cached[0]
+
+        if self.shown_panel not in [None, panel]:
+            if cmds.columnLayout(self.shown_panel, exists=True):
+                cmds.columnLayout(self.shown_panel, edit=True, manage=False)
+        self.shown_panel = None
+
+        if namespace == None:
+            return
+
+        if panel == None:
+            cmds.setParent(self.UI_elements["module_specific_column"])
+            panel = cmds.columnLayout(adjustableColumn=True)
+            self.module_instance.UI(self, panel)
+        else:
+            cmds.columnLayout(panel, edit=True, manage=True)
+
+        self.module_panels[namespace] = (
+            panel,
+            self.module_instance,
+            module_index.find_module(namespace),
         )
-        if existing_controls != None:
-            cmds.deleteUI(existing_controls)
+        self.shown_panel = panel
+
+        while len(self.module_panels) > MODULE_PANEL_CACHE_SIZE:
+            self.evict_module_panel(next(iter(self.module_panels)))
+
+    def find_module_panel(self, namespace):
+        # The cached (panel, module instance, index entry) for namespace, if
+        # any. Modules deleted or renamed outside this UI (undo, the outliner,
+        # scripts) no longer have the index entry their panel was built for,
+        # so their panels are dropped first.
+        for cached_namespace, cached in list(self.module_panels.items()):
+            if module_index.find_module(cached_namespace) is not cached[2]:
+                self.evict_module_panel(cached_namespace)
+
+        cached = self.module_panels.get(namespace)
+        if cached != None and not cmds.columnLayout(cached[0], exists=True):
+            self.module_panels.pop(namespace)
+            cached = None
+        return cached
+
+    def evict_module_panel(self, namespace):
+        cached = self.module_panels.pop(namespace, None)
+        if cached == None:
+            return
 
-        cmds.setParent(self.UI_elements["module_specific_column"])
+        if cached[0] == self.shown_panel:
+            self.shown_panel = None
+        if cmds.columnLayout(cached[0], exists=True):
+            cmds.deleteUI(cached[0])
 
-        if self.module_instance != None:
-            self.module_instance.UI(self, self.UI_elements["module_specific_column"])
+    def clear_module_panels(self, *args):
+        for namespace in list(self.module_panels):
+            self.evict_module_panel(namespace)
+
+        self.module_instance = None
+        self.selection_resolved = False
 
     def delete_module(self, *args):
         self.module_instance.delete()
+        self.evict_module_panel(self.selected_module_namespace)
+        self.selection_resolved = False
         cmds.select(clear=True)
 
     def rename_module(self, *args):
         new_name = cmds.textField(self.UI_elements["module_name"], q=True, text=True)
 
         self.module_instance.rename_module_instance(new_name)
+        self.evict_module_panel(self.selected_module_namespace)
+        self.selection_resolved = False
 
         previous_selection = cmds.ls(selection=True)
         if len(previous_selection) > 0:
@@ -0,0 +1,150 @@
+import maya.cmds as cmds
+import System.utils as utils
+import System.module_index as module_index
+
+# Installs many blueprint modules as one transaction. Each spec is a dict:
+#
+#   {
+#       "module": "single_joint_segment",  # module file, or a Blueprint class
+#       "user_specified_name": "clavicle_L",  # optional, allocated if missing
+#       "joint_positions": [[0, 0, 0], [4, 0, 0]],  # optional, one per joint
+#       "hook_object": "Single_Joint_Segment__spine:end_joint_translation_control",
+#   }
+#
+# hook_object may name a translation control of another module in the same
+# batch; modules are installed in hook dependency order so it exists by then.
+
+DEFAULT_BASENAME = "instance_"
+
+
+def find_spec_class(spec):
+    module = spec["module"]
+    if isinstance(module, str):
+        return utils.find_module_class("/Modules/Blueprint", module)
+    return module
+
+
+def find_hook_namespace(hook_object):
+    if hook_object == None:
+        return None
+
+    namespace_and_node = utils.strip_leading_namespace(hook_object)
+    if namespace_and_node == None:
+        return None
+    return namespace_and_node[0]
+
+
+def allocate_missing_names(specs):
+    # Names for the specs without one, skipping names given in the batch.
+    # Raises ValueError if a given name is repeated or already in the scene.
+    given_names = set()
+    for spec in specs:
+        name = spec.get("user_specified_name")
+        if not name:
+            continue
+        if name in given_names:
+            raise ValueError("Duplicate user_specified_name in bulk install: " + name)
+        if module_index.user_specified_name_exists(name):
+            raise ValueError("user_specified_name already exists: " + name)
+        given_names.add(name)
+
+    missing_count = len(specs) - len(given_names)
+    allocated_names = []
+    while len(allocated_names) < missing_count:
+        allocated_names.extend(
+            name
+            for name in module_index.allocate_user_specified_names(
+                DEFAULT_BASENAME, missing_count - len(allocated_names)
+            )
+            if name not in given_names
+        )
+
+    return allocated_names
+
+
+def order_module_specs(specs):
+    # Returns [(spec, module_class, user_specified_name)] so that every module
+    # comes after the batch module it hooks to. Raises ValueError on a cycle,
+    # a name clash or a joint_positions count that doesn't match the module.
+    allocated_names = allocate_missing_names(specs)
+
+    entries = {}
+    order = []
+    for spec in specs:
+        module_class = find_spec_class(spec)
+        name = spec.get("user_specified_name") or allocated_names.pop(0)
+        module = module_class(name, None)
+        namespace = module.module_namespace
+
+        joint_positions = spec.get("joint_positions")
+        if joint_positions != None and len(joint_positions) != len(module.joint_info):
+            raise ValueError(
+                "%s takes %d joint positions, got %d"
+                % (namespace, len(module.joint_info), len(joint_positions))
+            )
+
+        entries[namespace] = (spec, module_class, name)
+        order.append(namespace)
+
+    ordered = []
+    state = {}  # namespace -> "visiting" or "done"
+
+    for namespace in order:
+        stack = [namespace]
+        while stack:
+            current = stack[-1]
+            if state.get(current) == "done":
+                stack.pop()
+                continue
+
+            state[current] = "visiting"
+
+            dependency = find_hook_namespace(entries[current][0].get("hook_object"))
+            if dependency in entries and dependency != current:
+                if state.get(dependency) == "visiting":
+                    raise ValueError(
+                        "Hook cycle in bulk install: %s -> %s" % (current, dependency)
+                    )
+                if state.get(dependency) != "done":
+                    stack.append(dependency)
+                    continue
+
+            state[current] = "done"
+            ordered.append(entries[current])
+            stack.pop()
+
+    return ordered
+
+
+def install_modules(specs):
+    # One undo chunk, one scene update and one locking pass for the whole batch.
+    # Returns the installed module instances in install order. Specs are
+    # checked before the scene is touched.
+    ordered = order_module_specs(specs)
+    modules = []
+
+    cmds.undoInfo(openChunk=True, chunkName="bulk_install")
+    cmds.refresh(suspend=True)
+    try:
+        for spec, module_class, user_specified_name in ordered:
+            module = module_class(user_specified_name, spec.get("hook_object"))
+
+            joint_positions = spec.get("joint_positions")
+            if joint_positions != None:
+                for joint, position in zip(module.joint_info, joint_positions):
+                    joint[1] = list(position)
+
+            module.install(update_scene=False, lock_container=False)
+            modules.append(module)
+    finally:
+        containers = [module.container_name for module in modules]
+        if containers:
+            utils.force_scene_update(containers)
+
+        for container in containers:
+            cmds.lockNode(container, lock=True, lockUnpublished=True)
+
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    return modules
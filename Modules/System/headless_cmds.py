@@ -0,0 +1,1909 @@
+"""In-memory stand-in for the subset of maya.cmds used by the rigging tool.
+
+Call install() before importing System.utils or System.blueprint (or let it
+rebind modules that were already imported) to run the tool without Maya:
+
+    import System.headless_cmds as headless_cmds
+    headless_cmds.install()
+
+The DG is not evaluated. Attributes hold the values they were set to, and
+constraints snap their targets once, when they are created.
+"""
+
+import os
+import re
+import sys
+import types
+
+import System.ma_parser as ma_parser
+import System.transform_math as transform_math
+
+
+ATTRIBUTE_SHORT_NAMES = {
+    "t": "translate",
+    "tx": "translateX",
+    "ty": "translateY",
+    "tz": "translateZ",
+    "r": "rotate",
+    "rx": "rotateX",
+    "ry": "rotateY",
+    "rz": "rotateZ",
+    "s": "scale",
+    "sx": "scaleX",
+    "sy": "scaleY",
+    "sz": "scaleZ",
+    "v": "visibility",
+    "ro": "rotateOrder",
+    "jo": "jointOrient",
+    "jox": "jointOrientX",
+    "joy": "jointOrientY",
+    "joz": "jointOrientZ",
+    "pa": "preferredAngle",
+    "pax": "preferredAngleX",
+    "pay": "preferredAngleY",
+    "paz": "preferredAngleZ",
+    "ssc": "segmentScaleCompensate",
+    "msg": "message",
+    "hl": "hyperLayout",
+    "iog": "instObjGroups",
+    "op": "operation",
+    "i1": "input1",
+    "i1x": "input1X",
+    "i1y": "input1Y",
+    "i1z": "input1Z",
+    "i2": "input2",
+    "i2x": "input2X",
+    "i2y": "input2Y",
+    "i2z": "input2Z",
+    "o": "output",
+    "ox": "outputX",
+    "oy": "outputY",
+    "oz": "outputZ",
+    "oc": "outColor",
+    "ss": "surfaceShader",
+    "dsm": "dagSetMembers",
+}
+
+COMPOUND_ATTRIBUTES = {
+    "translate": ("translateX", "translateY", "translateZ"),
+    "rotate": ("rotateX", "rotateY", "rotateZ"),
+    "scale": ("scaleX", "scaleY", "scaleZ"),
+    "jointOrient": ("jointOrientX", "jointOrientY", "jointOrientZ"),
+    "preferredAngle": ("preferredAngleX", "preferredAngleY", "preferredAngleZ"),
+    "input1": ("input1X", "input1Y", "input1Z"),
+    "input2": ("input2X", "input2Y", "input2Z"),
+    "output": ("outputX", "outputY", "outputZ"),
+    "poleVector": ("poleVectorX", "poleVectorY", "poleVectorZ"),
+}
+
+TRANSFORM_DEFAULTS = {
+    "translateX": 0.0,
+    "translateY": 0.0,
+    "translateZ": 0.0,
+    "rotateX": 0.0,
+    "rotateY": 0.0,
+    "rotateZ": 0.0,
+    "scaleX": 1.0,
+    "scaleY": 1.0,
+    "scaleZ": 1.0,
+    "visibility": True,
+    "rotateOrder": 0,
+}
+
+NODE_DEFAULTS = {
+    "joint": {
+        "jointOrientX": 0.0,
+        "jointOrientY": 0.0,
+        "jointOrientZ": 0.0,
+        "preferredAngleX": 0.0,
+        "preferredAngleY": 0.0,
+        "preferredAngleZ": 0.0,
+        "segmentScaleCompensate": True,
+        "radius": 1.0,
+    },
+    "ikHandle": {"poleVectorX": 0.0, "poleVectorY": 0.0, "poleVectorZ": 0.0},
+    "multiplyDivide": {
+        "operation": 1,
+        "input1X": 0.0,
+        "input1Y": 0.0,
+        "input1Z": 0.0,
+        "input2X": 1.0,
+        "input2Y": 1.0,
+        "input2Z": 1.0,
+        "outputX": 0.0,
+        "outputY": 0.0,
+        "outputZ": 0.0,
+    },
+    "plusMinusAverage": {"operation": 1, "output1D": 0.0},
+    "distanceBetween": {"distance": 0.0},
+}
+
+TRANSFORM_TYPES = {
+    "transform",
+    "joint",
+    "ikHandle",
+    "ikEffector",
+    "pointConstraint",
+    "parentConstraint",
+    "scaleConstraint",
+    "poleVectorConstraint",
+}
+SHAPE_TYPES = {"locator", "mesh", "nurbsSurface", "nurbsCurve"}
+
+LAYOUT_COMMANDS = {
+    "window",
+    "columnLayout",
+    "rowLayout",
+    "rowColumnLayout",
+    "frameLayout",
+    "scrollLayout",
+    "tabLayout",
+    "formLayout",
+}
+CONTROL_COMMANDS = {
+    "button",
+    "symbolButton",
+    "text",
+    "textField",
+    "scrollField",
+    "checkBox",
+    "separator",
+    "attrControlGrp",
+    "iconTextButton",
+    "image",
+}
+
+
+class Node:
+    def __init__(self, name, node_type):
+        self.name = name
+        self.node_type = node_type
+        self.attrs = dict(TRANSFORM_DEFAULTS) if node_type in TRANSFORM_TYPES else {}
+        self.attrs.update(NODE_DEFAULTS.get(node_type, {}))
+        self.locked_attrs = set()
+        self.aliases = {}
+        self.parent = None
+        self.children = []
+        self.container = None
+        self.members = []
+        self.published = {}
+        self.bindings = set()
+        self.locked = False
+        self.lock_unpublished = False
+
+    def is_dag(self):
+        return self.node_type in TRANSFORM_TYPES or self.node_type in SHAPE_TYPES
+
+
+class Scene:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes = {}
+        self.namespace_nodes = {}
+        self.namespaces = {"UI", "shared"}
+        self.current_namespace = ""
+        self.selection = []
+        self.connections = {}
+        self.node_connections = {}
+        self.ui_elements = {}
+        self.ui_parent = None
+        self.script_jobs = {}
+        self.next_script_job = 1
+        self.deferred = []
+        self.undo_chunks = 0
+
+
+scene = Scene()
+
+
+def new_scene():
+    # Like Maya, UI and scriptJobs (other than killWithScene ones) outlive the scene
+    ui_elements = scene.ui_elements
+    script_jobs = dict(
+        (job_number, job)
+        for job_number, job in scene.script_jobs.items()
+        if not job.get("killWithScene")
+    )
+    next_script_job = scene.next_script_job
+
+    scene.reset()
+
+    scene.ui_elements = ui_elements
+    scene.script_jobs = script_jobs
+    scene.next_script_job = next_script_job
+
+
+# Helpers
+
+
+def _flag(kwargs, long_name, short_name=None, default=None):
+    if long_name in kwargs:
+        return kwargs[long_name]
+    if short_name != None and short_name in kwargs:
+        return kwargs[short_name]
+    return default
+
+
+def _as_list(value):
+    if value == None:
+        return []
+    if isinstance(value, (list, tuple)):
+        result = []
+        for item in value:
+            result.extend(_as_list(item))
+        return result
+    return [value]
+
+
+def _args_or_selection(args):
+    names = _as_list(list(args))
+    if not names:
+        names = list(scene.selection)
+    return names
+
+
+def _short_name(name):
+    return str(name).rpartition("|")[2]
+
+
+def _namespace_of(name):
+    return name.rpartition(":")[0]
+
+
+def _find_node(name):
+    name = _short_name(name)
+    if name.startswith(":"):
+        name = name[1:]
+
+    node = scene.nodes.get(name)
+    if node == None and scene.current_namespace and ":" not in name:
+        node = scene.nodes.get(scene.current_namespace + ":" + name)
+
+    return node
+
+
+def _get_node(name):
+    node = _find_node(name)
+    if node == None:
+        raise ValueError("No object matches name: " + str(name))
+    return node
+
+
+def _absolute_name(name):
+    if name.startswith(":"):
+        return name[1:]
+    if ":" in name or not scene.current_namespace:
+        return name
+    return scene.current_namespace + ":" + name
+
+
+def _unique_name(name):
+    if name not in scene.nodes:
+        return name
+
+    base = re.sub("[0-9]+$", "", name)
+    index = 1
+    while base + str(index) in scene.nodes:
+        index += 1
+
+    return base + str(index)
+
+
+def _create_node(node_type, name=None, parent=None):
+    if name == None:
+        name = node_type[0].lower() + node_type[1:] + "1"
+
+    namespace = _namespace_of(_absolute_name(name))
+    if namespace and namespace not in scene.namespaces:
+        raise RuntimeError("Namespace does not exist: " + namespace)
+
+    node = Node(_unique_name(_absolute_name(name)), node_type)
+    _register_node(node)
+
+    if parent != None:
+        _set_parent(node, parent)
+
+    return node
+
+
+def _register_node(node):
+    scene.nodes[node.name] = node
+    scene.namespace_nodes.setdefault(_namespace_of(node.name), set()).add(node.name)
+
+
+def _unregister_node(node):
+    del scene.nodes[node.name]
+    scene.namespace_nodes.get(_namespace_of(node.name), set()).discard(node.name)
+
+
+def _set_parent(node, parent):
+    if node.parent != None:
+        node.parent.children.remove(node)
+
+    node.parent = parent
+    if parent != None:
+        parent.children.append(node)
+
+
+def _descendants(node):
+    result = []
+    stack = list(reversed(node.children))
+    while stack:
+        child = stack.pop()
+        result.append(child)
+        stack.extend(reversed(child.children))
+    return result
+
+
+def _long_name(node):
+    path = []
+    while node != None:
+        path.append(node.name)
+        node = node.parent
+    return "|" + "|".join(reversed(path))
+
+
+def _split_plug(plug):
+    node_name, _, attr = str(plug).partition(".")
+    node = _get_node(node_name)
+    return node, _canonical_attribute(node, attr)
+
+
+def _canonical_attribute(node, attr):
+    match = re.match("^([A-Za-z_][A-Za-z0-9_]*)(.*)$", attr)
+    if match == None:
+        return attr
+
+    leading, rest = match.group(1), match.group(2)
+    leading = node.aliases.get(leading, leading)
+    if "." in leading:
+        return leading + rest
+
+    return ATTRIBUTE_SHORT_NAMES.get(leading, leading) + rest
+
+
+def _plug_name(node, attr):
+    return node.name + "." + attr
+
+
+def _get_value(node, attr):
+    if attr in COMPOUND_ATTRIBUTES and COMPOUND_ATTRIBUTES[attr][0] in node.attrs:
+        return [tuple(node.attrs[child] for child in COMPOUND_ATTRIBUTES[attr])]
+
+    if attr in node.published:
+        return getAttr(node.published[attr])
+
+    if attr in node.attrs:
+        return node.attrs[attr]
+
+    raise ValueError("No object matches name: " + _plug_name(node, attr))
+
+
+def _set_value(node, attr, values):
+    if attr in COMPOUND_ATTRIBUTES and len(values) > 1:
+        for child, value in zip(COMPOUND_ATTRIBUTES[attr], values):
+            _set_value(node, child, [value])
+        return
+
+    if attr in node.locked_attrs:
+        raise RuntimeError("The attribute '%s' is locked" % _plug_name(node, attr))
+
+    if attr in node.published:
+        node = _get_node(node.published[attr].partition(".")[0])
+        attr = _canonical_attribute(node, node.published[attr].partition(".")[2])
+
+    value = values[0] if len(values) == 1 else tuple(values)
+    if isinstance(node.attrs.get(attr), bool) and not isinstance(value, str):
+        value = bool(value)
+
+    node.attrs[attr] = value
+
+
+def _attribute_exists(node, attr):
+    if attr in COMPOUND_ATTRIBUTES:
+        return COMPOUND_ATTRIBUTES[attr][0] in node.attrs
+    return attr in node.attrs or attr in node.published or attr in node.aliases
+
+
+# Transform math
+
+
+def _local_matrix(node):
+    if node.node_type not in TRANSFORM_TYPES:
+        return transform_math.identity()
+
+    attrs = node.attrs
+    joint_orient = None
+    if node.node_type == "joint":
+        joint_orient = (
+            attrs["jointOrientX"],
+            attrs["jointOrientY"],
+            attrs["jointOrientZ"],
+        )
+
+    return transform_math.compose(
+        (attrs["translateX"], attrs["translateY"], attrs["translateZ"]),
+        (attrs["rotateX"], attrs["rotateY"], attrs["rotateZ"]),
+        int(attrs["rotateOrder"]),
+        (attrs["scaleX"], attrs["scaleY"], attrs["scaleZ"]),
+        joint_orient,
+    )
+
+
+def _world_matrix(node):
+    matrix = _local_matrix(node)
+    parent = node.parent
+    while parent != None:
+        matrix = transform_math.multiply(matrix, _local_matrix(parent))
+        parent = parent.parent
+    return matrix
+
+
+def _parent_world_matrix(node):
+    if node.parent == None:
+        return transform_math.identity()
+    return _world_matrix(node.parent)
+
+
+def _set_local_values(node, attr, values):
+    for child, value in zip(COMPOUND_ATTRIBUTES[attr], values):
+        if child not in node.locked_attrs:
+            node.attrs[child] = value
+
+
+def _set_world_matrix(node, world_matrix):
+    if node.node_type not in TRANSFORM_TYPES:
+        return
+
+    local = transform_math.multiply(
+        world_matrix, transform_math.inverse(_parent_world_matrix(node))
+    )
+    rotation = transform_math.rotation_part(local)
+
+    _set_local_values(node, "translate", transform_math.get_translation(local))
+    _set_local_values(node, "scale", transform_math.get_scale(local))
+
+    rotate_order = int(node.attrs["rotateOrder"])
+    if node.node_type == "joint":
+        rotate = [node.attrs[child] for child in COMPOUND_ATTRIBUTES["rotate"]]
+        joint_orient = transform_math.multiply(
+            transform_math.inverse(transform_math.euler_to_matrix(rotate, rotate_order)),
+            rotation,
+        )
+        _set_local_values(
+            node, "jointOrient", transform_math.matrix_to_euler(joint_orient, "xyz")
+        )
+    else:
+        _set_local_values(
+            node, "rotate", transform_math.matrix_to_euler(rotation, rotate_order)
+        )
+
+
+def _set_world_translation(node, position):
+    local = transform_math.transform_point(
+        position, transform_math.inverse(_parent_world_matrix(node))
+    )
+    _set_local_values(node, "translate", local)
+
+
+def _preserving_children(node, edit):
+    children = [child for child in node.children if child.node_type in TRANSFORM_TYPES]
+    world_matrices = [_world_matrix(child) for child in children]
+
+    edit()
+
+    for child, world_matrix in zip(children, world_matrices):
+        _set_world_matrix(child, world_matrix)
+
+
+# Connections
+
+
+def _connect(source, destination):
+    scene.connections[destination] = source
+    for plug in [source, destination]:
+        node_name = plug.partition(".")[0]
+        scene.node_connections.setdefault(node_name, set()).add((source, destination))
+
+
+def _disconnect(destination):
+    source = scene.connections.pop(destination, None)
+    if source == None:
+        return
+
+    for plug in [source, destination]:
+        node_connections = scene.node_connections.get(plug.partition(".")[0])
+        if node_connections != None:
+            node_connections.discard((source, destination))
+
+
+def _connect_plugs(node_a, attr_a, node_b, attr_b):
+    destination = _plug_name(node_b, attr_b)
+    _disconnect(destination)
+    _connect(_plug_name(node_a, attr_a), destination)
+
+
+def _rename_in_connections(old_name, new_name):
+    node_connections = scene.node_connections.pop(old_name, set())
+
+    def rename_plug(plug):
+        node_name, dot, attr = plug.partition(".")
+        if node_name == old_name:
+            return new_name + dot + attr
+        return plug
+
+    renamed = set()
+    for source, destination in node_connections:
+        scene.connections.pop(destination, None)
+        other = None
+        for plug in [source, destination]:
+            if plug.partition(".")[0] != old_name:
+                other = plug.partition(".")[0]
+
+        new_pair = (rename_plug(source), rename_plug(destination))
+        scene.connections[new_pair[1]] = new_pair[0]
+        renamed.add(new_pair)
+
+        if other != None:
+            other_connections = scene.node_connections.get(other, set())
+            other_connections.discard((source, destination))
+            other_connections.add(new_pair)
+
+    scene.node_connections[new_name] = renamed
+
+
+# Namespaces
+
+
+def namespace(*args, **kwargs):
+    add = _flag(kwargs, "add")
+    if add != None:
+        name = add.lstrip(":")
+        if not add.startswith(":") and scene.current_namespace:
+            name = scene.current_namespace + ":" + name
+        if name in scene.namespaces:
+            raise RuntimeError("Namespace already exists: " + name)
+        scene.namespaces.add(name)
+        return name
+
+    set_namespace = _flag(kwargs, "setNamespace", "set")
+    if set_namespace != None:
+        name = set_namespace.lstrip(":")
+        if name and name not in scene.namespaces:
+            raise RuntimeError("Namespace does not exist: " + name)
+        scene.current_namespace = name
+        return ":" + name
+
+    exists = _flag(kwargs, "exists", "ex")
+    if exists != None:
+        return exists.lstrip(":") in scene.namespaces
+
+    remove = _flag(kwargs, "removeNamespace", "rm")
+    if remove != None:
+        name = remove.lstrip(":")
+        prefix = name + ":"
+        nested = [other for other in scene.namespaces if other.startswith(prefix)]
+
+        if _flag(kwargs, "deleteNamespaceContent", "dnc"):
+            nodes = []
+            for namespace_name in [name] + nested:
+                nodes.extend(
+                    scene.nodes[node_name]
+                    for node_name in scene.namespace_nodes.get(namespace_name, ())
+                )
+            _delete_nodes(nodes)
+            for namespace_name in nested:
+                scene.namespaces.discard(namespace_name)
+            nested = []
+
+        if scene.namespace_nodes.get(name) or nested:
+            raise RuntimeError("Namespace is not empty: " + name)
+        scene.namespaces.discard(name)
+        return None
+
+    move = _flag(kwargs, "moveNamespace", "mv")
+    if move != None:
+        source = move[0].lstrip(":")
+        destination = move[1].lstrip(":")
+        prefix = source + ":"
+
+        moved = [
+            name
+            for name in scene.namespaces | {source}
+            if name == source or name.startswith(prefix)
+        ]
+        for moved_namespace in moved:
+            for node_name in list(scene.namespace_nodes.get(moved_namespace, ())):
+                new_name = node_name[len(prefix) :]
+                if destination:
+                    new_name = destination + ":" + new_name
+                _rename_node(scene.nodes[node_name], new_name)
+
+        for other in [n for n in scene.namespaces if n.startswith(prefix)]:
+            scene.namespaces.discard(other)
+            scene.namespaces.add(destination + ":" + other[len(prefix) :])
+        return None
+
+    return None
+
+
+def namespaceInfo(*args, **kwargs):
+    if _flag(kwargs, "currentNamespace", "cur"):
+        if _flag(kwargs, "absoluteName", "an"):
+            return ":" + scene.current_namespace
+        return scene.current_namespace or ":"
+
+    if _flag(kwargs, "listOnlyNamespaces", "lon") or _flag(
+        kwargs, "listNamespace", "ls"
+    ):
+        parent = scene.current_namespace
+        result = []
+        for name in sorted(scene.namespaces):
+            if parent:
+                if name.startswith(parent + ":") and ":" not in name[len(parent) + 1 :]:
+                    result.append(name)
+            elif ":" not in name:
+                result.append(name)
+        return result
+
+    return None
+
+
+# Node creation
+
+
+def createNode(node_type, **kwargs):
+    parent = _flag(kwargs, "parent", "p")
+    parent_node = _get_node(parent) if parent != None else None
+    return _create_node(node_type, _flag(kwargs, "name", "n"), parent_node).name
+
+
+def shadingNode(node_type, **kwargs):
+    return _create_node(node_type, _flag(kwargs, "name", "n")).name
+
+
+def spaceLocator(*args, **kwargs):
+    name = _flag(kwargs, "name", "n", "locator1")
+    transform = _create_node("transform", name)
+    shape = _create_node("locator", transform.name + "Shape", transform)
+    shape.attrs["worldPosition"] = 0.0
+
+    position = _flag(kwargs, "position", "p")
+    if position != None:
+        _set_local_values(transform, "translate", position)
+
+    return [transform.name]
+
+
+def group(*args, **kwargs):
+    name = _flag(kwargs, "name", "n", "group1")
+    parent = _flag(kwargs, "parent", "p")
+    parent_node = _get_node(parent) if parent != None else None
+
+    group_node = _create_node("transform", name, parent_node)
+
+    if not _flag(kwargs, "empty", "em"):
+        for child_name in _args_or_selection(args):
+            _parent_node(_get_node(child_name), group_node, relative=False)
+
+    return group_node.name
+
+
+def joint(*args, **kwargs):
+    if _flag(kwargs, "edit", "e"):
+        joint_node = _get_node(_as_list(list(args))[0])
+        orient_joint = _flag(kwargs, "orientJoint", "oj")
+        if orient_joint != None:
+            _orient_joint(
+                joint_node,
+                orient_joint,
+                _flag(kwargs, "secondaryAxisOrient", "sao", "none"),
+            )
+        return None
+
+    parent_node = None
+    for selected in reversed(scene.selection):
+        node = _find_node(selected)
+        if node != None and node.node_type == "joint":
+            parent_node = node
+            break
+
+    joint_node = _create_node("joint", _flag(kwargs, "name", "n", "joint1"), parent_node)
+
+    radius = _flag(kwargs, "radius", "rad")
+    if radius != None:
+        joint_node.attrs["radius"] = radius
+
+    rotation_order = _flag(kwargs, "rotationOrder", "roo")
+    if rotation_order != None:
+        joint_node.attrs["rotateOrder"] = transform_math.ROTATE_ORDERS.index(
+            rotation_order
+        )
+
+    orientation = _flag(kwargs, "orientation", "o")
+    if orientation != None:
+        _set_local_values(joint_node, "jointOrient", orientation)
+
+    position = _flag(kwargs, "position", "p")
+    if position != None:
+        if _flag(kwargs, "relative", "r"):
+            _set_local_values(joint_node, "translate", position)
+        else:
+            _set_world_translation(joint_node, position)
+
+    scene.selection = [joint_node.name]
+    return joint_node.name
+
+
+def _orient_joint(joint_node, orient_joint, secondary_axis_orient):
+    child_joints = [child for child in joint_node.children if child.node_type == "joint"]
+
+    def edit():
+        for attr in COMPOUND_ATTRIBUTES["rotate"]:
+            joint_node.attrs[attr] = 0.0
+
+        parent_rotation = transform_math.rotation_part(_parent_world_matrix(joint_node))
+        world_rotation = parent_rotation
+
+        if child_joints and orient_joint != "none":
+            aim = transform_math.subtract(
+                transform_math.get_translation(_world_matrix(child_joints[0])),
+                transform_math.get_translation(_world_matrix(joint_node)),
+            )
+            up = [0.0, 1.0, 0.0]
+            up_axis = orient_joint[1]
+            if secondary_axis_orient != "none":
+                up = [0.0, 0.0, 0.0]
+                up[transform_math.AXIS_INDEX[secondary_axis_orient[0]]] = (
+                    -1.0 if secondary_axis_orient.endswith("down") else 1.0
+                )
+
+            aimed = transform_math.aim_matrix(aim, up, orient_joint[0], up_axis)
+            if aimed == None:
+                up = [1.0, 0.0, 0.0] if abs(aim[1]) > abs(aim[0]) else [0.0, 1.0, 0.0]
+                aimed = transform_math.aim_matrix(aim, up, orient_joint[0], up_axis)
+            if aimed != None:
+                world_rotation = aimed
+
+        local = transform_math.multiply(
+            world_rotation, transform_math.inverse(parent_rotation)
+        )
+        _set_local_values(
+            joint_node, "jointOrient", transform_math.matrix_to_euler(local, "xyz")
+        )
+
+    _preserving_children(joint_node, edit)
+
+
+def ikHandle(*args, **kwargs):
+    start_joint = _get_node(_flag(kwargs, "startJoint", "sj"))
+    end_joint = _get_node(_flag(kwargs, "endEffector", "ee"))
+
+    handle = _create_node("ikHandle", _flag(kwargs, "name", "n", "ikHandle1"))
+    effector = _create_node("ikEffector", "effector1", end_joint.parent)
+
+    _set_world_translation(
+        handle, transform_math.get_translation(_world_matrix(end_joint))
+    )
+    _set_world_translation(
+        effector, transform_math.get_translation(_world_matrix(end_joint))
+    )
+
+    handle.attrs["solver"] = _flag(kwargs, "solver", "sol", "ikRPsolver")
+    handle.attrs["twist"] = 0.0
+    _connect_plugs(start_joint, "message", handle, "startJoint")
+    _connect_plugs(effector, "handlePath[0]", handle, "endEffector")
+    _connect_plugs(end_joint, "translate", effector, "translate")
+
+    return [handle.name, effector.name]
+
+
+# Constraints
+
+
+def _constraint_node(constraint_type, args, kwargs):
+    names = _as_list(list(args))
+    if len(names) < 2:
+        names = names + list(scene.selection)
+
+    targets = [_get_node(name) for name in names[:-1]]
+    constrained = _get_node(names[-1])
+
+    name = _flag(
+        kwargs,
+        "name",
+        "n",
+        constrained.name.rpartition(":")[2] + "_" + constraint_type + "1",
+    )
+    if ":" not in name and _namespace_of(constrained.name):
+        name = _namespace_of(constrained.name) + ":" + name
+
+    constraint = _create_node(constraint_type, name, constrained)
+    for index, target in enumerate(targets):
+        prefix = "target[%d]." % index
+        _connect_plugs(target, "translate", constraint, prefix + "targetTranslate")
+        _connect_plugs(target, "rotatePivot", constraint, prefix + "targetRotatePivot")
+        _connect_plugs(
+            target, "rotatePivotTranslate", constraint, prefix + "targetRotateTranslate"
+        )
+        _connect_plugs(
+            target, "parentMatrix[0]", constraint, prefix + "targetParentMatrix"
+        )
+
+    return targets, constrained, constraint
+
+
+def _skipped(kwargs):
+    return [axis.lower() for axis in _as_list(_flag(kwargs, "skip", "sk"))]
+
+
+def pointConstraint(*args, **kwargs):
+    targets, constrained, constraint = _constraint_node("pointConstraint", args, kwargs)
+    skip = _skipped(kwargs)
+
+    for axis in "XYZ":
+        if axis.lower() not in skip:
+            _connect_plugs(
+                constraint, "constraintTranslate" + axis, constrained, "translate" + axis
+            )
+
+    if not _flag(kwargs, "maintainOffset", "mo", False):
+        positions = [
+            transform_math.get_translation(_world_matrix(target)) for target in targets
+        ]
+        position = [sum(values) / len(positions) for values in zip(*positions)]
+        offset = _flag(kwargs, "offset", "o", [0.0, 0.0, 0.0])
+        _set_world_translation(constrained, [a + b for a, b in zip(position, offset)])
+
+    return [constraint.name]
+
+
+def parentConstraint(*args, **kwargs):
+    targets, constrained, constraint = _constraint_node(
+        "parentConstraint", args, kwargs
+    )
+
+    for axis in "XYZ":
+        _connect_plugs(
+            constraint, "constraintTranslate" + axis, constrained, "translate" + axis
+        )
+        _connect_plugs(constraint, "constraintRotate" + axis, constrained, "rotate" + axis)
+
+    if not _flag(kwargs, "maintainOffset", "mo", False):
+        target_matrix = transform_math.rotation_part(_world_matrix(targets[0]))
+        target_matrix[12:15] = transform_math.get_translation(_world_matrix(targets[0]))
+        scale = transform_math.get_scale(_world_matrix(constrained))
+        _set_world_matrix(
+            constrained,
+            transform_math.multiply(transform_math.scale_matrix(scale), target_matrix),
+        )
+
+    return [constraint.name]
+
+
+def scaleConstraint(*args, **kwargs):
+    targets, constrained, constraint = _constraint_node("scaleConstraint", args, kwargs)
+    skip = _skipped(kwargs)
+
+    for axis in "XYZ":
+        if axis.lower() not in skip:
+            _connect_plugs(
+                constraint, "constraintScale" + axis, constrained, "scale" + axis
+            )
+
+    if not _flag(kwargs, "maintainOffset", "mo", False):
+        scale = transform_math.get_scale(_world_matrix(targets[0]))
+        for index, axis in enumerate("XYZ"):
+            if axis.lower() not in skip:
+                constrained.attrs["scale" + axis] = scale[index]
+
+    return [constraint.name]
+
+
+def poleVectorConstraint(*args, **kwargs):
+    targets, handle, constraint = _constraint_node(
+        "poleVectorConstraint", args, kwargs
+    )
+
+    for axis in "XYZ":
+        _connect_plugs(
+            constraint, "constraintTranslate" + axis, handle, "poleVector" + axis
+        )
+
+    start_joint = scene.connections.get(_plug_name(handle, "startJoint"))
+    if start_joint != None:
+        start_position = transform_math.get_translation(
+            _world_matrix(_get_node(start_joint.partition(".")[0]))
+        )
+        target_position = transform_math.get_translation(_world_matrix(targets[0]))
+        _set_local_values(
+            handle,
+            "poleVector",
+            transform_math.subtract(target_position, start_position),
+        )
+
+    return [constraint.name]
+
+
+# Attributes
+
+
+def getAttr(plug, **kwargs):
+    node, attr = _split_plug(plug)
+    return _get_value(node, attr)
+
+
+def setAttr(plug, *values, **kwargs):
+    node, attr = _split_plug(plug)
+    lock = _flag(kwargs, "lock", "l")
+
+    if values:
+        if kwargs.get("type") in ["string"]:
+            node.attrs[attr] = values[0]
+        else:
+            _set_value(node, attr, list(values))
+
+    if lock != None:
+        attrs = COMPOUND_ATTRIBUTES.get(attr, ()) + (attr,)
+        for locked_attr in attrs:
+            if lock:
+                node.locked_attrs.add(locked_attr)
+            else:
+                node.locked_attrs.discard(locked_attr)
+
+
+def addAttr(*args, **kwargs):
+    long_name = _flag(kwargs, "longName", "ln")
+    default_value = _flag(kwargs, "defaultValue", "dv", 0.0)
+
+    attribute_type = _flag(kwargs, "attributeType", "at")
+    if attribute_type in ["bool"]:
+        default_value = bool(default_value)
+    elif attribute_type in ["enum"]:
+        default_value = int(default_value)
+
+    for name in _args_or_selection(args):
+        node = _get_node(name)
+        if long_name in node.attrs:
+            raise RuntimeError(
+                "Found a conflicting attribute: " + _plug_name(node, long_name)
+            )
+        node.attrs[long_name] = default_value
+
+
+def aliasAttr(*args, **kwargs):
+    alias, plug = args[0], args[1]
+    node, attr = _split_plug(plug)
+    node.aliases[alias] = attr
+
+
+def attributeQuery(attr, **kwargs):
+    node = _find_node(_flag(kwargs, "node", "n"))
+    if _flag(kwargs, "exists", "ex"):
+        return node != None and _attribute_exists(
+            node, _canonical_attribute(node, attr)
+        )
+    return None
+
+
+def connectAttr(source, destination, **kwargs):
+    source_node, source_attr = _split_plug(source)
+    destination_node, destination_attr = _split_plug(destination)
+
+    if destination_attr in destination_node.locked_attrs:
+        raise RuntimeError("The destination attribute '%s' is locked" % destination)
+
+    source_plug = _plug_name(source_node, source_attr)
+    destination_plug = _plug_name(destination_node, destination_attr)
+
+    if destination_plug in scene.connections and not _flag(kwargs, "force", "f"):
+        raise RuntimeError(
+            "'%s' is already connected to '%s'"
+            % (scene.connections[destination_plug], destination_plug)
+        )
+
+    _disconnect(destination_plug)
+    _connect(source_plug, destination_plug)
+    return None
+
+
+def disconnectAttr(source, destination, **kwargs):
+    destination_node, destination_attr = _split_plug(destination)
+    _disconnect(_plug_name(destination_node, destination_attr))
+
+
+def connectionInfo(plug, **kwargs):
+    node, attr = _split_plug(plug)
+    plug = _plug_name(node, attr)
+
+    if _flag(kwargs, "sourceFromDestination", "sfd"):
+        return scene.connections.get(plug, "")
+
+    if _flag(kwargs, "destinationFromSource", "dfs"):
+        return sorted(
+            destination
+            for source, destination in scene.node_connections.get(node.name, ())
+            if source == plug
+        )
+
+    return None
+
+
+def listConnections(*args, **kwargs):
+    source = _flag(kwargs, "source", "s", True)
+    destination = _flag(kwargs, "destination", "d", True)
+    connections = _flag(kwargs, "connections", "c", False)
+    plugs = _flag(kwargs, "plugs", "p", False)
+    node_types = _as_list(_flag(kwargs, "type", "t"))
+
+    result = []
+    for name in _as_list(list(args)):
+        node_name, dot, attr = str(name).partition(".")
+        node = _get_node(node_name)
+        plug_filter = None
+        if dot:
+            plug_filter = _plug_name(node, _canonical_attribute(node, attr))
+
+        for src, dst in sorted(scene.node_connections.get(node.name, ())):
+            for this_plug, other_plug, wanted in [
+                (dst, src, source),
+                (src, dst, destination),
+            ]:
+                if not wanted or this_plug.partition(".")[0] != node.name:
+                    continue
+                if plug_filter != None and this_plug != plug_filter:
+                    continue
+
+                other_node = scene.nodes.get(other_plug.partition(".")[0])
+                if other_node == None:
+                    continue
+                if node_types and other_node.node_type not in node_types:
+                    continue
+
+                if connections:
+                    result.append(this_plug)
+                result.append(other_plug if plugs else other_node.name)
+
+    return result or None
+
+
+# DAG
+
+
+def _rename_node(node, new_name):
+    old_name = node.name
+    _unregister_node(node)
+    node.name = new_name
+    _register_node(node)
+
+    _rename_in_connections(old_name, new_name)
+
+    for container in [node.container]:
+        if container != None:
+            container.members = [
+                new_name if member == old_name else member
+                for member in container.members
+            ]
+
+    for container_node, published_name in node.bindings:
+        attr = container_node.published[published_name].partition(".")[2]
+        container_node.published[published_name] = new_name + "." + attr
+
+    scene.selection = [
+        new_name if selected == old_name else selected for selected in scene.selection
+    ]
+
+
+def rename(*args, **kwargs):
+    if len(args) == 1:
+        old_name, new_name = scene.selection[-1], args[0]
+    else:
+        old_name, new_name = args[0], args[1]
+
+    node = _get_node(old_name)
+    if node.locked:
+        raise RuntimeError("Cannot rename locked node '%s'" % node.name)
+
+    new_name = _absolute_name(new_name)
+    namespace_name = _namespace_of(new_name)
+    if namespace_name and namespace_name not in scene.namespaces:
+        raise RuntimeError("Namespace does not exist: " + namespace_name)
+
+    if new_name == node.name:
+        return node.name
+
+    old_short = node.name.rpartition(":")[2]
+    _rename_node(node, _unique_name(new_name))
+
+    if not _flag(kwargs, "ignoreShape", "is"):
+        for child in node.children:
+            if (
+                child.node_type in SHAPE_TYPES
+                and child.name.rpartition(":")[2] == old_short + "Shape"
+            ):
+                _rename_node(child, _unique_name(node.name + "Shape"))
+
+    return node.name
+
+
+def _parent_node(node, parent_node, relative=False):
+    world_matrix = _world_matrix(node)
+    _set_parent(node, parent_node)
+
+    if not relative:
+        _set_world_matrix(node, world_matrix)
+
+
+def parent(*args, **kwargs):
+    names = _as_list(list(args))
+    world = _flag(kwargs, "world", "w", False)
+
+    if world:
+        parent_node = None
+        children = names or list(scene.selection)
+    else:
+        if len(names) < 2:
+            names = names + list(scene.selection)
+        parent_node = _get_node(names[-1])
+        children = names[:-1]
+
+    relative = _flag(kwargs, "relative", "r", False)
+
+    result = []
+    for child_name in children:
+        node = _get_node(child_name)
+        if node.parent is not parent_node:
+            _parent_node(node, parent_node, relative)
+        result.append(node.name)
+
+    return result
+
+
+def listRelatives(*args, **kwargs):
+    full_path = _flag(kwargs, "fullPath", "f", False)
+    node_types = _as_list(_flag(kwargs, "type", "typ"))
+    shapes = _flag(kwargs, "shapes", "s", False)
+
+    result = []
+    for name in _args_or_selection(args):
+        node = _get_node(name)
+
+        if _flag(kwargs, "parent", "p"):
+            relatives = [node.parent] if node.parent != None else []
+        elif _flag(kwargs, "allDescendents", "ad"):
+            relatives = list(reversed(_descendants(node)))
+        else:
+            relatives = list(node.children)
+
+        for relative in relatives:
+            if shapes and relative.node_type not in SHAPE_TYPES:
+                continue
+            if node_types and relative.node_type not in node_types:
+                continue
+            result.append(_long_name(relative) if full_path else relative.name)
+
+    return result or None
+
+
+def duplicate(*args, **kwargs):
+    parent_only = _flag(kwargs, "parentOnly", "po", False)
+    name = _flag(kwargs, "name", "n")
+
+    result = []
+    for index, original_name in enumerate(_args_or_selection(args)):
+        original = _get_node(original_name)
+
+        def copy(source, new_parent, new_name):
+            node = _create_node(source.node_type, new_name, new_parent)
+            node.attrs = dict(source.attrs)
+            node.locked_attrs = set(source.locked_attrs)
+            node.aliases = dict(source.aliases)
+            return node
+
+        root = copy(
+            original,
+            original.parent,
+            name if name != None and index == 0 else original.name,
+        )
+        result.append(root.name)
+
+        if not parent_only:
+            stack = [(child, root) for child in original.children]
+            while stack:
+                child, new_parent = stack.pop(0)
+                if child.node_type.endswith("Constraint"):
+                    continue
+                new_child = copy(child, new_parent, child.name)
+                if not _flag(kwargs, "returnRootsOnly", "rr", False):
+                    result.append(new_child.name)
+                stack.extend((grandchild, new_child) for grandchild in child.children)
+
+    scene.selection = [result[0]] if result else []
+    return result
+
+
+def sets(*args, **kwargs):
+    # Shading group membership only, tracked as instObjGroups -> dagSetMembers
+    # connections. Components are not modelled; members are whole nodes.
+    names = _as_list(list(args))
+
+    def member_connections(set_node):
+        return sorted(
+            (source, destination)
+            for source, destination in scene.node_connections.get(set_node.name, ())
+            if destination.startswith(set_node.name + ".dagSetMembers")
+        )
+
+    if _flag(kwargs, "query", "q"):
+        set_node = _get_node(names[0])
+        members = [
+            source.partition(".")[0] for source, _ in member_connections(set_node)
+        ]
+        return members or None
+
+    force_element = _flag(kwargs, "forceElement", "fe")
+    if force_element != None:
+        set_node = _get_node(force_element)
+        for name in names:
+            node = _get_node(str(name).partition(".")[0])
+            for source, destination in list(scene.node_connections.get(node.name, ())):
+                if source.partition(".")[0] == node.name and ".dagSetMembers" in (
+                    destination
+                ):
+                    _disconnect(destination)
+
+            index = len(member_connections(set_node))
+            while "%s.dagSetMembers[%d]" % (set_node.name, index) in scene.connections:
+                index += 1
+            _connect(
+                _plug_name(node, "instObjGroups"),
+                "%s.dagSetMembers[%d]" % (set_node.name, index),
+            )
+        return None
+
+    node_type = "shadingEngine" if _flag(kwargs, "renderable", "r") else "objectSet"
+    return _create_node(node_type, _flag(kwargs, "name", "n")).name
+
+
+def makeIdentity(*args, **kwargs):
+    for name in _args_or_selection(args):
+        node = _get_node(name)
+
+        if node.node_type == "joint" and _flag(kwargs, "rotate", "r"):
+            rotate = [node.attrs[attr] for attr in COMPOUND_ATTRIBUTES["rotate"]]
+            joint_orient = [
+                node.attrs[attr] for attr in COMPOUND_ATTRIBUTES["jointOrient"]
+            ]
+            combined = transform_math.multiply(
+                transform_math.euler_to_matrix(rotate, int(node.attrs["rotateOrder"])),
+                transform_math.euler_to_matrix(joint_orient, "xyz"),
+            )
+            _set_local_values(
+                node, "jointOrient", transform_math.matrix_to_euler(combined, "xyz")
+            )
+            _set_local_values(node, "rotate", [0.0, 0.0, 0.0])
+            continue
+
+        def edit():
+            if _flag(kwargs, "translate", "t"):
+                _set_local_values(node, "translate", [0.0, 0.0, 0.0])
+            if _flag(kwargs, "rotate", "r"):
+                _set_local_values(node, "rotate", [0.0, 0.0, 0.0])
+            if _flag(kwargs, "scale", "s"):
+                _set_local_values(node, "scale", [1.0, 1.0, 1.0])
+
+        _preserving_children(node, edit)
+
+
+def xform(*args, **kwargs):
+    names = _args_or_selection(args)
+    world_space = _flag(kwargs, "worldSpace", "ws", False)
+
+    if _flag(kwargs, "query", "q"):
+        result = []
+        for name in names:
+            node = _get_node(name)
+            if _flag(kwargs, "matrix", "m"):
+                if world_space:
+                    result.extend(_world_matrix(node))
+                else:
+                    result.extend(_local_matrix(node))
+            elif _flag(kwargs, "translation", "t"):
+                if world_space:
+                    result.extend(transform_math.get_translation(_world_matrix(node)))
+                else:
+                    result.extend(
+                        node.attrs[attr] for attr in COMPOUND_ATTRIBUTES["translate"]
+                    )
+            elif _flag(kwargs, "rotation", "ro"):
+                if world_space:
+                    result.extend(
+                        transform_math.matrix_to_euler(
+                            transform_math.rotation_part(_world_matrix(node)),
+                            int(node.attrs["rotateOrder"]),
+                        )
+                    )
+                else:
+                    result.extend(
+                        node.attrs[attr] for attr in COMPOUND_ATTRIBUTES["rotate"]
+                    )
+        return result
+
+    translation = _flag(kwargs, "translation", "t")
+    relative = _flag(kwargs, "relative", "r", False)
+
+    for name in names:
+        node = _get_node(name)
+
+        if translation != None:
+            if world_space:
+                position = list(translation)
+                if relative:
+                    current = transform_math.get_translation(_world_matrix(node))
+                    position = [a + b for a, b in zip(current, translation)]
+                _set_world_translation(node, position)
+            else:
+                if relative:
+                    translation = [
+                        node.attrs[attr] + value
+                        for attr, value in zip(
+                            COMPOUND_ATTRIBUTES["translate"], translation
+                        )
+                    ]
+                _set_local_values(node, "translate", translation)
+
+        matrix = _flag(kwargs, "matrix", "m")
+        if matrix != None:
+            if world_space:
+                _set_world_matrix(node, list(matrix))
+            else:
+                _set_world_matrix(
+                    node,
+                    transform_math.multiply(list(matrix), _parent_world_matrix(node)),
+                )
+
+    return None
+
+
+# Containers
+
+
+def _container_members(container):
+    return [scene.nodes[member] for member in container.members if member in scene.nodes]
+
+
+def _add_to_container(container, nodes, include_hierarchy, include_shapes, force):
+    expanded = []
+    for node in nodes:
+        expanded.append(node)
+        if include_hierarchy:
+            expanded.extend(_descendants(node))
+        elif include_shapes:
+            expanded.extend(
+                child for child in node.children if child.node_type in SHAPE_TYPES
+            )
+
+    for node in expanded:
+        if node is container or node.container is container:
+            continue
+        if node.container != None:
+            if not force:
+                continue
+            node.container.members.remove(node.name)
+
+        node.container = container
+        container.members.append(node.name)
+
+
+def container(*args, **kwargs):
+    names = _as_list(list(args))
+    add_nodes = [_get_node(name) for name in _as_list(_flag(kwargs, "addNode", "an"))]
+    include_hierarchy = _flag(kwargs, "includeHierarchyBelow", "ihb", False)
+    include_shapes = _flag(kwargs, "includeShapes", "isd", False)
+    force = _flag(kwargs, "force", "f", False)
+
+    if _flag(kwargs, "query", "q"):
+        container_node = _get_node(names[0])
+        if _flag(kwargs, "nodeList", "nl"):
+            return list(container_node.members) or None
+        if _flag(kwargs, "publishName", "pn"):
+            return list(container_node.published) or None
+        return None
+
+    if _flag(kwargs, "edit", "e"):
+        container_node = _get_node(names[0])
+
+        if add_nodes:
+            _add_to_container(
+                container_node, add_nodes, include_hierarchy, include_shapes, force
+            )
+
+        for name in _as_list(_flag(kwargs, "removeNode", "rn")):
+            node = _get_node(name)
+            if node.container is container_node:
+                node.container = None
+                container_node.members.remove(node.name)
+
+        publish_and_bind = _flag(kwargs, "publishAndBind", "pb")
+        if publish_and_bind != None:
+            plug, published_name = publish_and_bind
+            node, attr = _split_plug(plug)
+            if published_name in container_node.published:
+                raise RuntimeError("Published name already exists: " + published_name)
+            container_node.published[published_name] = _plug_name(node, attr)
+            node.bindings.add((container_node, published_name))
+
+        if _flag(kwargs, "removeContainer", "rc"):
+            for member in _container_members(container_node):
+                member.container = container_node.container
+                if container_node.container != None:
+                    container_node.container.members.append(member.name)
+            container_node.members = []
+            _delete_nodes([container_node])
+
+        return None
+
+    container_node = _create_node("container", _flag(kwargs, "name", "n", "container1"))
+    if add_nodes:
+        _add_to_container(
+            container_node, add_nodes, include_hierarchy, include_shapes, force
+        )
+
+    return container_node.name
+
+
+def lockNode(*args, **kwargs):
+    nodes = [_get_node(name) for name in _args_or_selection(args)]
+
+    if _flag(kwargs, "query", "q"):
+        return [node.locked for node in nodes]
+
+    for node in nodes:
+        node.locked = _flag(kwargs, "lock", "l", True)
+        lock_unpublished = _flag(kwargs, "lockUnpublished", "lu")
+        if lock_unpublished != None:
+            node.lock_unpublished = lock_unpublished
+
+
+# Scene queries and editing
+
+
+def _delete_nodes(nodes):
+    to_delete = []
+    seen = set()
+    stack = list(nodes)
+
+    while stack:
+        node = stack.pop()
+        if node.name in seen or node.name not in scene.nodes:
+            continue
+        seen.add(node.name)
+        to_delete.append(node)
+
+        stack.extend(node.children)
+        if node.node_type == "container":
+            stack.extend(_container_members(node))
+
+    for node in to_delete:
+        if node.locked:
+            raise RuntimeError("Cannot delete locked node '%s'" % node.name)
+
+    for node in to_delete:
+        for source, destination in list(scene.node_connections.get(node.name, ())):
+            _disconnect(destination)
+        scene.node_connections.pop(node.name, None)
+
+        if node.container != None and node.container.name in scene.nodes:
+            if node.name in node.container.members:
+                node.container.members.remove(node.name)
+        if node.parent != None and node in node.parent.children:
+            node.parent.children.remove(node)
+
+        _unregister_node(node)
+
+    deleted = set(node.name for node in to_delete)
+    scene.selection = [name for name in scene.selection if name not in deleted]
+
+
+def delete(*args, **kwargs):
+    names = _args_or_selection(args)
+    _delete_nodes([_get_node(name) for name in names])
+
+
+def objExists(name):
+    node_name, dot, attr = str(name).partition(".")
+    node = _find_node(node_name)
+    if node == None:
+        return False
+    if dot:
+        return _attribute_exists(node, _canonical_attribute(node, attr))
+    return True
+
+
+def ls(*args, **kwargs):
+    node_types = _as_list(_flag(kwargs, "type", "typ"))
+    long_names = _flag(kwargs, "long", "l", False)
+
+    if _flag(kwargs, "selection", "sl"):
+        nodes = [_find_node(name) for name in scene.selection]
+    elif args:
+        nodes = [_find_node(name) for name in _as_list(list(args))]
+    else:
+        nodes = list(scene.nodes.values())
+
+    result = []
+    seen = set()
+    for node in nodes:
+        if node == None or node.name in seen:
+            continue
+        if _flag(kwargs, "transforms", "tr") and node.node_type not in TRANSFORM_TYPES:
+            continue
+        if _flag(kwargs, "shapes", "s") and node.node_type not in SHAPE_TYPES:
+            continue
+        if _flag(kwargs, "dag", "dag") and not node.is_dag():
+            continue
+        if _flag(kwargs, "assemblies", "assemblies") and (
+            not node.is_dag() or node.parent != None
+        ):
+            continue
+        if node_types:
+            matches = node.node_type in node_types or (
+                "transform" in node_types and node.node_type in TRANSFORM_TYPES
+            )
+            if not matches:
+                continue
+
+        seen.add(node.name)
+        result.append(_long_name(node) if long_names and node.is_dag() else node.name)
+
+    return result
+
+
+def select(*args, **kwargs):
+    if _flag(kwargs, "clear", "cl"):
+        scene.selection = []
+        return None
+
+    names = [_get_node(name).name for name in _as_list(list(args))]
+
+    if _flag(kwargs, "add", "add") or _flag(kwargs, "toggle", "tgl"):
+        scene.selection.extend(name for name in names if name not in scene.selection)
+    elif _flag(kwargs, "deselect", "d"):
+        scene.selection = [name for name in scene.selection if name not in names]
+    else:
+        scene.selection = names
+
+    return None
+
+
+def file(*args, **kwargs):
+    if kwargs.get("new"):
+        new_scene()
+        emit_event("NewSceneOpened")
+        return None
+
+    if _flag(kwargs, "query", "q"):
+        if _flag(kwargs, "sceneName", "sn"):
+            return ""
+        return None
+
+    if _flag(kwargs, "i", "import"):
+        return _import_maya_ascii(
+            args[0],
+            _flag(kwargs, "namespace", "ns"),
+            _flag(kwargs, "returnNewNodes", "rnn", False),
+        )
+
+    return None
+
+
+def _import_maya_ascii(path, namespace_name, return_new_nodes):
+    previous_namespace = scene.current_namespace
+    if namespace_name:
+        namespace_name = namespace_name.lstrip(":")
+        if namespace_name not in scene.namespaces:
+            scene.namespaces.add(namespace_name)
+        scene.current_namespace = namespace_name
+
+    # The cached statement index stands in for reading the file
+    index = ma_parser.load_index(path)
+
+    name_map = {}
+    shared_nodes = {}  # -s nodes that already existed; edited, never connected
+    new_nodes = []
+    hyper_layouts = {}
+    hyper_layout_members = {}
+
+    try:
+        for entry in index["nodes"]:
+            name = entry["name"]
+            if entry["shared"] and name in scene.nodes:
+                shared_nodes[name] = scene.nodes[name]
+                continue
+
+            parent_node = None
+            if entry["parent"] != None:
+                parent_name = entry["parent"]
+                parent_node = scene.nodes.get(name_map.get(parent_name, parent_name))
+
+            node = _create_node(entry["type"], name, parent_node)
+            name_map[name] = node.name
+            new_nodes.append(node)
+
+        def edited_node(name):
+            if name in shared_nodes:
+                return shared_nodes[name]
+            return scene.nodes.get(name_map.get(name, ""))
+
+        for set_attr in index["set_attrs"]:
+            node = edited_node(set_attr["node"])
+            if node != None and set_attr["locked"]:
+                attr = _canonical_attribute(node, set_attr["attr"].lstrip("."))
+                node.locked_attrs.add(attr)
+
+        for add_attr in index["add_attrs"]:
+            node = edited_node(add_attr["node"])
+            if node != None and add_attr["long_name"] != None:
+                node.attrs.setdefault(add_attr["long_name"], 0.0)
+
+        for source, destination in index["connections"]:
+            plugs = []
+            for plug in [source, destination]:
+                node_name, _, attr = plug.partition(".")
+                plugs.append((scene.nodes.get(name_map.get(node_name, "")), attr))
+
+            if plugs[0][0] == None or plugs[1][0] == None:
+                continue
+
+            source_node, source_attr = plugs[0]
+            destination_node, destination_attr = plugs[1]
+
+            destination_attr = _canonical_attribute(destination_node, destination_attr)
+            if _plug_name(destination_node, destination_attr) in scene.connections:
+                # Only -nextAvailable connections repeat a destination plug
+                index = 1
+                while (
+                    _plug_name(destination_node, "%s[%d]" % (destination_attr, index))
+                    in scene.connections
+                ):
+                    index += 1
+                destination_attr = "%s[%d]" % (destination_attr, index)
+
+            if destination_node.node_type == "container":
+                if destination_attr == "hyperLayout":
+                    hyper_layouts[source_node.name] = destination_node
+            if destination_node.node_type == "hyperLayout":
+                if destination_attr.endswith(".dn"):
+                    hyper_layout_members.setdefault(
+                        destination_node.name, []
+                    ).append(source_node)
+
+            _connect_plugs(
+                source_node,
+                _canonical_attribute(source_node, source_attr),
+                destination_node,
+                destination_attr,
+            )
+    finally:
+        scene.current_namespace = previous_namespace
+
+    # Container membership is stored through the container's hyperLayout
+    for hyper_layout, container_node in hyper_layouts.items():
+        members = hyper_layout_members.get(hyper_layout, [])
+        _add_to_container(container_node, members, False, False, False)
+
+    if return_new_nodes:
+        return [_long_name(node) if node.is_dag() else node.name for node in new_nodes]
+    return None
+
+
+# Evaluation, tools and undo. The stand-in does not evaluate the DG.
+
+
+def dgdirty(*args, **kwargs):
+    return None
+
+
+def dgeval(*args, **kwargs):
+    return None
+
+
+def refresh(*args, **kwargs):
+    return None
+
+
+def setToolTo(*args, **kwargs):
+    return None
+
+
+def undoInfo(*args, **kwargs):
+    if _flag(kwargs, "openChunk", "ock"):
+        scene.undo_chunks += 1
+    elif _flag(kwargs, "closeChunk", "cck"):
+        scene.undo_chunks -= 1
+    return None
+
+
+# UI. Elements are recorded so queries and layout hierarchy behave, but nothing
+# is drawn.
+
+
+def _ui_command(command):
+    def ui_command(*args, **kwargs):
+        name = args[0] if args else None
+
+        if _flag(kwargs, "exists", "ex"):
+            return name in scene.ui_elements
+
+        if _flag(kwargs, "query", "q"):
+            element = scene.ui_elements.get(name, {})
+            for flag in kwargs:
+                if flag in ["query", "q"]:
+                    continue
+                if flag in ["childArray", "ca"]:
+                    return list(element.get("children", [])) or None
+                return element.get("flags", {}).get(flag)
+            return None
+
+        if _flag(kwargs, "edit", "e"):
+            scene.ui_elements[name]["flags"].update(kwargs)
+            return None
+
+        if name == None or name in scene.ui_elements:
+            index = len(scene.ui_elements) + 1
+            while command + str(index) in scene.ui_elements:
+                index += 1
+            name = command + str(index)
+
+        parent_name = None if command == "window" else scene.ui_parent
+        scene.ui_elements[name] = {
+            "command": command,
+            "flags": dict(kwargs),
+            "parent": parent_name,
+            "children": [],
+        }
+        if parent_name in scene.ui_elements:
+            scene.ui_elements[parent_name]["children"].append(name)
+
+        if command in LAYOUT_COMMANDS:
+            scene.ui_parent = name
+
+        return name
+
+    ui_command.__name__ = command
+    return ui_command
+
+
+for _command in LAYOUT_COMMANDS | CONTROL_COMMANDS:
+    globals()[_command] = _ui_command(_command)
+
+
+def setParent(*args, **kwargs):
+    if _flag(kwargs, "query", "q"):
+        return scene.ui_parent
+
+    name = args[0]
+    if name == "..":
+        element = scene.ui_elements.get(scene.ui_parent)
+        scene.ui_parent = element["parent"] if element != None else None
+    else:
+        scene.ui_parent = name
+
+    return scene.ui_parent
+
+
+def deleteUI(*args, **kwargs):
+    for name in _as_list(list(args)):
+        element = scene.ui_elements.pop(name, None)
+        if element == None:
+            continue
+
+        parent_element = scene.ui_elements.get(element["parent"])
+        if parent_element != None and name in parent_element["children"]:
+            parent_element["children"].remove(name)
+
+        deleteUI(list(element["children"]))
+
+        if scene.ui_parent == name:
+            scene.ui_parent = element["parent"]
+
+
+def showWindow(*args, **kwargs):
+    return None
+
+
+def confirmDialog(*args, **kwargs):
+    default_button = _flag(kwargs, "defaultButton", "db")
+    if default_button != None:
+        return default_button
+    buttons = _as_list(_flag(kwargs, "button", "b"))
+    return buttons[0] if buttons else "Confirm"
+
+
+def headsUpMessage(*args, **kwargs):
+    return None
+
+
+def scriptJob(*args, **kwargs):
+    kill = _flag(kwargs, "kill", "k")
+    if kill != None:
+        scene.script_jobs.pop(kill, None)
+        return None
+
+    if _flag(kwargs, "exists", "ex") != None:
+        return _flag(kwargs, "exists", "ex") in scene.script_jobs
+
+    job_number = scene.next_script_job
+    scene.next_script_job += 1
+    scene.script_jobs[job_number] = dict(kwargs)
+    return job_number
+
+
+def emit_event(event_name):
+    # Runs the scriptJobs registered for an event, as Maya would
+    for job_number, job in list(scene.script_jobs.items()):
+        event = job.get("event")
+        if event != None and event[0] == event_name:
+            if job.get("runOnce"):
+                scene.script_jobs.pop(job_number, None)
+            event[1]()
+
+
+def evalDeferred(*args, **kwargs):
+    if args:
+        scene.deferred.append(args[0])
+
+
+def process_idle_events():
+    while scene.deferred:
+        command = scene.deferred.pop(0)
+        if callable(command):
+            command()
+
+
+# Installation
+
+
+def install(force=True):
+    # Registers this module as maya.cmds. Unless force is False, this replaces a
+    # real maya.cmds too, and rebinds `cmds` in modules that already imported it.
+    this_module = sys.modules[__name__]
+
+    previous = sys.modules.get("maya.cmds")
+    if previous == None and not force:
+        try:
+            import maya.cmds as previous
+        except ImportError:
+            previous = None
+    if previous != None and not force:
+        return previous
+
+    maya_module = types.ModuleType("maya")
+    maya_module.__path__ = []
+    maya_module.cmds = this_module
+
+    maya_utils = types.ModuleType("maya.utils")
+    maya_utils.executeDeferred = evalDeferred
+    maya_module.utils = maya_utils
+
+    sys.modules["maya"] = maya_module
+    sys.modules["maya.cmds"] = this_module
+    sys.modules["maya.utils"] = maya_utils
+
+    # The scene lives here, so OpenMaya (in mayapy) must not be used to read it
+    sys.modules["maya.api"] = None
+    sys.modules["maya.api.OpenMaya"] = None
+
+    os.environ.setdefault(
+        "RIGGING_TOOL_ROOT",
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    )
+
+    if previous != None:
+        for module in list(sys.modules.values()):
+            if getattr(module, "cmds", None) is previous:
+                module.cmds = this_module
+
+    return this_module
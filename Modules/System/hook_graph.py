@@ -0,0 +1,178 @@
+import maya.cmds as cmds
+import System.utils as utils
+import System.module_index as module_index
+
+# Which module each blueprint module is hooked to, and the reverse. Built from
+# one hook constraint query per indexed module, then kept current by install,
+# rehook, rename_module_instance and delete. Rebuilt whenever module_index is,
+# so the same scene changes (new/open scene, undo, redo) invalidate it.
+hook_objects = {}  # namespace -> node driving its hook constraint
+hook_parents = {}  # namespace -> namespace of the module it is hooked to
+hook_children = {}  # namespace -> set of namespaces hooked to it
+graph_state = {"generation": None}
+
+
+def query_hook_object(namespace):
+    hook_constraint = namespace + ":hook_pointConstraint"
+    if not cmds.objExists(hook_constraint):
+        return None
+
+    source_attr = cmds.connectionInfo(
+        hook_constraint + ".target[0].targetParentMatrix",
+        sourceFromDestination=True,
+    )
+    return str(source_attr.rpartition(".")[0])
+
+
+def find_parent_namespace(namespace, hook_object):
+    if hook_object == None:
+        return None
+
+    namespace_and_node = utils.strip_leading_namespace(hook_object)
+    if namespace_and_node == None or namespace_and_node[0] == namespace:
+        return None  # unhookedTarget, or not a module node
+
+    if namespace_and_node[0] not in module_index.module_index:
+        return None
+    return namespace_and_node[0]
+
+
+def link(namespace, hook_object):
+    parent = find_parent_namespace(namespace, hook_object)
+
+    hook_objects[namespace] = hook_object
+    hook_parents[namespace] = parent
+    hook_children.setdefault(namespace, set())
+    if parent != None:
+        hook_children.setdefault(parent, set()).add(namespace)
+
+
+def unlink(namespace):
+    parent = hook_parents.pop(namespace, None)
+    hook_objects.pop(namespace, None)
+    if parent != None and parent in hook_children:
+        hook_children[parent].discard(namespace)
+
+
+def build_hook_graph():
+    hook_objects.clear()
+    hook_parents.clear()
+    hook_children.clear()
+
+    namespaces = list(module_index.get_module_index())
+    hooks = [(namespace, query_hook_object(namespace)) for namespace in namespaces]
+
+    # Parents resolve against the index, so every module is known before linking
+    for namespace, hook_object in hooks:
+        link(namespace, hook_object)
+
+    graph_state["generation"] = module_index.index_state["generation"]
+
+
+def get_hook_graph():
+    module_index.get_module_index()
+    if graph_state["generation"] != module_index.index_state["generation"]:
+        build_hook_graph()
+    return hook_parents
+
+
+def is_current():
+    return (
+        module_index.index_state["built"]
+        and graph_state["generation"] == module_index.index_state["generation"]
+    )
+
+
+def set_hook(namespace, hook_object):
+    if not is_current():
+        return  # picked up by the next build
+
+    unlink(namespace)
+    link(namespace, hook_object)
+
+
+def remove_module(namespace):
+    if not is_current():
+        return
+
+    unlink(namespace)
+    for child in hook_children.pop(namespace, set()):
+        hook_parents[child] = None
+
+
+def rename_module(namespace, new_namespace):
+    if not is_current():
+        return
+
+    children = hook_children.pop(namespace, set())
+    hook_object = hook_objects.get(namespace)
+    unlink(namespace)
+
+    if hook_object != None and hook_object.startswith(namespace + ":"):
+        hook_object = new_namespace + hook_object[len(namespace) :]
+    link(new_namespace, hook_object)
+
+    for child in children:
+        child_hook = hook_objects[child]
+        hook_objects[child] = new_namespace + child_hook[len(namespace) :]
+        hook_parents[child] = new_namespace
+    hook_children[new_namespace] |= children
+
+
+def find_hook_object(namespace):
+    # None when the module isn't in the graph
+    get_hook_graph()
+    return hook_objects.get(namespace)
+
+
+def find_hooked_modules(namespace):
+    get_hook_graph()
+    return list(hook_children.get(namespace, []))
+
+
+def find_hook_cycle():
+    # Returns the namespaces of one hook cycle, or None. Each module has at
+    # most one parent, so following parents from every module finds them all.
+    parents = get_hook_graph()
+    finished = set()
+
+    for start in parents:
+        path = []
+        on_path = {}
+        namespace = start
+        while namespace != None and namespace not in finished:
+            if namespace in on_path:
+                return path[on_path[namespace] :]
+            on_path[namespace] = len(path)
+            path.append(namespace)
+            namespace = parents.get(namespace)
+        finished.update(path)
+
+    return None
+
+
+def hook_order(namespaces=None):
+    # Returns namespaces with every module after the module it is hooked to.
+    # Raises ValueError on a hook cycle.
+    parents = get_hook_graph()
+    if namespaces == None:
+        namespaces = sorted(parents)
+
+    cycle = find_hook_cycle()
+    if cycle != None:
+        raise ValueError("Hook cycle: " + " -> ".join(cycle + cycle[:1]))
+
+    wanted = set(namespaces)
+    ordered = []
+    done = set()
+    for namespace in namespaces:
+        chain = []
+        while namespace in wanted and namespace not in done:
+            chain.append(namespace)
+            namespace = parents.get(namespace)
+
+        chain.reverse()
+        ordered.extend(chain)
+        done.update(chain)
+
+    return ordered
@@ -0,0 +1,227 @@
+"""Opt-in profiling of the cmds calls and Blueprint methods behind an operation.
+
+Nothing is patched until enable() is called, so leaving this module in a
+production build costs nothing:
+
+    import System.instrumentation as instrumentation
+
+    instrumentation.enable(trace=True)
+    module.install()
+    instrumentation.disable()
+
+    print(instrumentation.format_table())
+    instrumentation.write_chrome_trace("install.json")
+
+Each cmds call and Blueprint method is attributed to the outermost operation
+running at the time (install, lock_phase_1, delete, ...), or "other".
+"""
+
+import json
+import sys
+import threading
+import time
+
+INSTRUMENTED_MODULES = ["System.utils", "System.blueprint"]
+OPERATIONS = [
+    "install",
+    "lock_phase_1",
+    "lock_phase_2",
+    "lock_phase3",
+    "delete",
+    "rename_module_instance",
+    "rehook",
+    "constrain_root_to_hook",
+    "unconstrain_root_from_hook",
+]
+OTHER = "other"
+
+enabled = False
+tracing = False
+
+command_stats = {}  # (operation, command) -> [count, seconds]
+method_stats = {}  # (operation, method) -> [count, seconds]
+trace_events = []
+
+operation_stack = []
+patched_modules = {}  # module -> original cmds
+patched_methods = {}  # (class, name) -> original function
+
+
+class InstrumentedCmds:
+    # Stands in for maya.cmds, timing every command called through it
+    def __init__(self, cmds_module):
+        self.cmds_module = cmds_module
+
+    def __getattr__(self, name):
+        command = getattr(self.cmds_module, name)
+        if not callable(command):
+            return command
+
+        def timed_command(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return command(*args, **kwargs)
+            finally:
+                record(command_stats, name, "cmds", start)
+
+        self.__dict__[name] = timed_command
+        return timed_command
+
+
+def current_operation():
+    if operation_stack:
+        return operation_stack[0]
+    return OTHER
+
+
+def record(stats, name, category, start):
+    end = time.perf_counter()
+    key = (current_operation(), name)
+
+    entry = stats.get(key)
+    if entry == None:
+        entry = stats[key] = [0, 0.0]
+    entry[0] += 1
+    entry[1] += end - start
+
+    if tracing:
+        trace_events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": 0,
+                "tid": threading.get_ident(),
+                "args": {"operation": key[0]},
+            }
+        )
+
+
+def timed_method(name, function):
+    is_operation = name in OPERATIONS
+
+    def wrapper(*args, **kwargs):
+        if is_operation:
+            operation_stack.append(name)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(method_stats, name, "blueprint", start)
+            if is_operation:
+                operation_stack.pop()
+
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    wrapper.instrumented_function = function
+    return wrapper
+
+
+def blueprint_classes():
+    blueprint = sys.modules.get("System.blueprint")
+    if blueprint == None:
+        return []
+
+    classes = [blueprint.Blueprint]
+    for cls in classes:
+        classes.extend(
+            subclass for subclass in cls.__subclasses__() if subclass not in classes
+        )
+    return classes
+
+
+def blueprint_module_names():
+    return [
+        cls.__module__
+        for cls in blueprint_classes()
+        if cls.__module__ != "System.blueprint"
+    ]
+
+
+def enable(modules=None, trace=False):
+    # Patches `cmds` in the given (already imported) modules and wraps the
+    # methods of every loaded Blueprint class. Call again after reloading
+    # System.utils, System.blueprint or a blueprint module.
+    global enabled, tracing
+
+    if enabled:
+        disable()
+
+    if modules == None:
+        modules = INSTRUMENTED_MODULES
+    for name in list(modules) + blueprint_module_names():
+        module = sys.modules.get(name)
+        if module == None or not hasattr(module, "cmds"):
+            continue
+        patched_modules[module] = module.cmds
+        module.cmds = InstrumentedCmds(module.cmds)
+
+    for cls in blueprint_classes():
+        for name, function in list(vars(cls).items()):
+            if name.startswith("__") or not callable(function):
+                continue
+            patched_methods[(cls, name)] = function
+            setattr(cls, name, timed_method(name, function))
+
+    enabled = True
+    tracing = trace
+
+
+def disable():
+    global enabled, tracing
+
+    for module, original in patched_modules.items():
+        module.cmds = original
+    patched_modules.clear()
+
+    for (cls, name), function in patched_methods.items():
+        setattr(cls, name, function)
+    patched_methods.clear()
+
+    del operation_stack[:]
+    enabled = False
+    tracing = False
+
+
+def reset():
+    command_stats.clear()
+    method_stats.clear()
+    del trace_events[:]
+
+
+def total_calls():
+    return sum(entry[0] for entry in command_stats.values())
+
+
+def summary(stats=None):
+    # Returns [(operation, name, count, seconds)] sorted by descending time
+    if stats == None:
+        stats = command_stats
+
+    rows = [
+        (operation, name, entry[0], entry[1])
+        for (operation, name), entry in stats.items()
+    ]
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows
+
+
+def format_table(limit=None):
+    lines = []
+    for title, stats in [("cmds", command_stats), ("Blueprint", method_stats)]:
+        lines.append(
+            "%-28s %-34s %8s %10s" % ("operation", title, "calls", "seconds")
+        )
+        for operation, name, count, seconds in summary(stats)[:limit]:
+            lines.append("%-28s %-34s %8d %10.4f" % (operation, name, count, seconds))
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def write_chrome_trace(path):
+    # Loadable in chrome://tracing or Perfetto
+    with open(path, "w") as trace_file:
+        json.dump({"traceEvents": trace_events}, trace_file)
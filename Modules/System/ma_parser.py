@@ -0,0 +1,470 @@
+import hashlib
+import os
+import re
+import shlex
+import struct
+import sys
+from array import array
+
+import System.user_cache as user_cache
+
+# Streaming reader for Maya ASCII files, and an index of the statements that
+# describe a scene: createNode, setAttr, addAttr and connectAttr. Files are
+# read once, a statement at a time; setAttr values are not kept, only their
+# byte range, so shape data is read back from the file when asked for.
+#
+# An index is a dict:
+#
+#   {
+#       "hash": sha1 of the file,
+#       "nodes": [{"name", "type", "parent", "shared"}],
+#       "set_attrs": [{"node", "attr", "type", "locked", "offset", "length"}],
+#       "add_attrs": [{"node", "long_name", "short_name", "type"}],
+#       "connections": [(source plug, destination plug)],
+#   }
+#
+# load_index caches indices in the user cache (see user_cache), in a binary
+# file per source path and hash, see write_index.
+
+INDEX_MAGIC = b"MAIDX001"
+INDEX_CACHE_KIND = "ma_indices"
+INDEXED_COMMANDS = ["createNode", "setAttr", "addAttr", "connectAttr", "select"]
+
+STATEMENT_TOKEN = re.compile(r'[";]')
+STRING_END = re.compile(r'["\\]')
+QUOTED_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"')
+FLAG_VALUE = re.compile(r'-(\w+)\s+"((?:[^"\\]|\\.)*)"')
+ATTR_NAME = re.compile(r'"(\.[^"]*)"')
+TYPE_FLAG = re.compile(r'\s*-type\s+"([^"]*)"')
+SHARED_FLAG = re.compile(r"\s-s(\s|$)")
+LOCK_FLAG = re.compile(r"-l\s+(on|yes|true|1)\b")
+
+# Per-entry field layouts of the index's int64 blocks. Strings are stored as
+# indices into the index's string table, -1 for None.
+NODE_FIELDS = 4  # name, type, parent, shared
+SET_ATTR_FIELDS = 6  # node, attr, type, locked, offset, length
+ADD_ATTR_FIELDS = 4  # node, long name, short name, type
+CONNECTION_FIELDS = 2  # source, destination
+
+
+def iter_statements(path, commands=None, digest=None):
+    # Yields (command, text, offset, length) per statement. With commands,
+    # only those are yielded; others are scanned past without keeping text.
+    # Lines are decoded as latin-1 so character and byte offsets agree;
+    # digest, if given, is updated with every line read.
+    statement = []
+    command = None
+    keep = True
+    start = 0
+    line_offset = 0
+    in_string = False
+
+    with open(path, "rb") as maya_file:
+        for raw_line in maya_file:
+            if digest != None:
+                digest.update(raw_line)
+            line = raw_line.decode("latin-1")
+            offset = line_offset
+            line_offset += len(line)
+
+            line_start = 0
+            if command == None:
+                line_start = len(line) - len(line.lstrip())
+                if line_start == len(line) or line.startswith("//", line_start):
+                    continue  # blank or comment line between statements
+                command = line[line_start:].split(None, 1)[0].rstrip(";")
+                keep = commands == None or command in commands
+                start = offset + line_start
+
+            if (
+                not in_string
+                and line.count(";") == 1
+                and line.rstrip().endswith(";")
+                and line.count('"') % 2 == 0
+                and "\\" not in line
+            ):
+                # The usual one statement line: quotes balance before the
+                # only ";", so it ends the statement
+                index = line.rindex(";")
+                if keep:
+                    statement.append(line[line_start:index])
+                    text = "".join(statement).strip()
+                    yield command, text, start, offset + index + 1 - start
+                statement = []
+                command = None
+                continue
+
+            position = line_start
+            while command != None:
+                if in_string:
+                    match = STRING_END.search(line, position)
+                    if match == None:
+                        break
+                    position = match.end()
+                    if match.group() == "\\":
+                        position += 1  # skip the escaped character
+                    else:
+                        in_string = False
+                    continue
+
+                match = STATEMENT_TOKEN.search(line, position)
+                if match == None:
+                    break
+                position = match.end()
+                if match.group() == '"':
+                    in_string = True
+                    continue
+
+                index = match.start()
+                if keep:
+                    statement.append(line[line_start:index])
+                    text = "".join(statement).strip()
+                    yield command, text, start, offset + index + 1 - start
+
+                # Another statement may follow on the same line
+                statement = []
+                command = None
+                rest = line[position:]
+                line_start = position + len(rest) - len(rest.lstrip())
+                if line_start < len(line) and not line.startswith("//", line_start):
+                    command = line[line_start:].split(None, 1)[0].rstrip(";")
+                    keep = commands == None or command in commands
+                    start = offset + line_start
+                    position = line_start
+
+            if keep and command != None and line_start < len(line):
+                statement.append(line[line_start:])
+
+
+def parse_create_node(text):
+    # Returns (node type, name, parent, shared)
+    node_type = text.split(None, 2)[1]
+    flags = dict(FLAG_VALUE.findall(text))
+    shared = SHARED_FLAG.search(text) != None
+    return node_type, flags.get("n"), flags.get("p"), shared
+
+
+def parse_connect_attr(text):
+    plugs = QUOTED_STRING.findall(text)
+    if len(plugs) < 2:
+        return None
+    return plugs[0], plugs[1]
+
+
+def parse_set_attr(text):
+    # Returns (attr, -type value, locked), or None for setAttr without a
+    # quoted attribute
+    match = ATTR_NAME.search(text)
+    if match == None:
+        return None
+
+    # Maya writes flags before the attribute and -type right after it
+    flags = text[: match.start()]
+    type_match = TYPE_FLAG.match(text, match.end()) or TYPE_FLAG.search(flags)
+    attr_type = type_match.group(1) if type_match else None
+    return match.group(1), attr_type, LOCK_FLAG.search(flags) != None
+
+
+def parse_add_attr(text):
+    flags = dict(FLAG_VALUE.findall(text))
+    return flags.get("ln"), flags.get("sn"), flags.get("at") or flags.get("dt")
+
+
+def parse_maya_ascii(path):
+    # One pass over the file, hashing it on the way so the index can be cached
+    digest = hashlib.sha1()
+    nodes = []
+    set_attrs = []
+    add_attrs = []
+    connections = []
+    current_node = None
+
+    statements = iter_statements(path, INDEXED_COMMANDS, digest)
+    for command, text, offset, length in statements:
+        if command == "createNode":
+            node_type, name, parent, shared = parse_create_node(text)
+            nodes.append(
+                {"name": name, "type": node_type, "parent": parent, "shared": shared}
+            )
+            current_node = name
+
+        elif command == "select":
+            # select -ne :time1; setAttr then edits a default node
+            names = [token for token in text.split()[1:] if token[0] != "-"]
+            current_node = names[0] if names else None
+
+        elif command == "setAttr" and current_node != None:
+            parsed = parse_set_attr(text)
+            if parsed == None:
+                continue
+            set_attrs.append(
+                {
+                    "node": current_node,
+                    "attr": parsed[0],
+                    "type": parsed[1],
+                    "locked": parsed[2],
+                    "offset": offset,
+                    "length": length,
+                }
+            )
+
+        elif command == "addAttr" and current_node != None:
+            long_name, short_name, attr_type = parse_add_attr(text)
+            add_attrs.append(
+                {
+                    "node": current_node,
+                    "long_name": long_name,
+                    "short_name": short_name,
+                    "type": attr_type,
+                }
+            )
+
+        elif command == "connectAttr":
+            plugs = parse_connect_attr(text)
+            if plugs != None:
+                connections.append(plugs)
+
+    return {
+        "hash": digest.hexdigest(),
+        "nodes": nodes,
+        "set_attrs": set_attrs,
+        "add_attrs": add_attrs,
+        "connections": connections,
+    }
+
+
+def hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as maya_file:
+        for block in iter(lambda: maya_file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Binary index files. Layout:
+#
+#   INDEX_MAGIC, uint32 counts (strings bytes, nodes, set_attrs, add_attrs,
+#   connections), "\0" separated UTF-8 string table, padding to 8 bytes,
+#   little-endian int64 blocks of *_FIELDS values per entry
+
+
+def write_index(index, index_path):
+    strings = {}
+
+    def string_id(value):
+        if value == None:
+            return -1
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    values = array("q")
+    for node in index["nodes"]:
+        values.extend(
+            [
+                string_id(node["name"]),
+                string_id(node["type"]),
+                string_id(node["parent"]),
+                int(node["shared"]),
+            ]
+        )
+    for set_attr in index["set_attrs"]:
+        values.extend(
+            [
+                string_id(set_attr["node"]),
+                string_id(set_attr["attr"]),
+                string_id(set_attr["type"]),
+                int(set_attr["locked"]),
+                set_attr["offset"],
+                set_attr["length"],
+            ]
+        )
+    for add_attr in index["add_attrs"]:
+        values.extend(
+            [
+                string_id(add_attr["node"]),
+                string_id(add_attr["long_name"]),
+                string_id(add_attr["short_name"]),
+                string_id(add_attr["type"]),
+            ]
+        )
+    for source, destination in index["connections"]:
+        values.extend([string_id(source), string_id(destination)])
+
+    string_table = "\0".join(strings).encode("utf-8")
+    header = INDEX_MAGIC + struct.pack(
+        "<5I",
+        len(string_table),
+        len(index["nodes"]),
+        len(index["set_attrs"]),
+        len(index["add_attrs"]),
+        len(index["connections"]),
+    )
+
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    with open(index_path + ".tmp", "wb") as index_file:
+        index_file.write(header)
+        index_file.write(string_table)
+        index_file.write(b"\0" * (-(len(header) + len(string_table)) % 8))
+        values.tofile(index_file)
+    os.replace(index_path + ".tmp", index_path)
+
+
+def read_index(index_path, file_hash):
+    with open(index_path, "rb") as index_file:
+        data = index_file.read()
+
+    if data[: len(INDEX_MAGIC)] != INDEX_MAGIC:
+        raise ValueError("Not a Maya ASCII index: " + index_path)
+
+    header_length = len(INDEX_MAGIC) + 20
+    counts = struct.unpack_from("<5I", data, len(INDEX_MAGIC))
+    string_end = header_length + counts[0]
+    strings = data[header_length:string_end].decode("utf-8").split("\0")
+
+    values = array("q")
+    values.frombytes(data[string_end + (-string_end % 8) :])
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    def string(string_id):
+        return None if string_id == -1 else strings[string_id]
+
+    position = 0
+
+    def entries(count, fields):
+        nonlocal position
+        block = values[position : position + count * fields]
+        position += count * fields
+        return [block[index : index + fields] for index in range(0, len(block), fields)]
+
+    return {
+        "hash": file_hash,
+        "nodes": [
+            {
+                "name": string(name),
+                "type": string(node_type),
+                "parent": string(parent),
+                "shared": bool(shared),
+            }
+            for name, node_type, parent, shared in entries(counts[1], NODE_FIELDS)
+        ],
+        "set_attrs": [
+            {
+                "node": string(node),
+                "attr": string(attr),
+                "type": string(attr_type),
+                "locked": bool(locked),
+                "offset": offset,
+                "length": length,
+            }
+            for node, attr, attr_type, locked, offset, length in entries(
+                counts[2], SET_ATTR_FIELDS
+            )
+        ],
+        "add_attrs": [
+            {
+                "node": string(node),
+                "long_name": string(long_name),
+                "short_name": string(short_name),
+                "type": string(attr_type),
+            }
+            for node, long_name, short_name, attr_type in entries(
+                counts[3], ADD_ATTR_FIELDS
+            )
+        ],
+        "connections": [
+            (string(source), string(destination))
+            for source, destination in entries(counts[4], CONNECTION_FIELDS)
+        ],
+    }
+
+
+def find_index_path(path, file_hash):
+    # <user cache>/ma_indices/<hash of path>/<file hash>.idx
+    directory = user_cache.find_cache_path(INDEX_CACHE_KIND, path)
+    return os.path.join(directory, file_hash + ".idx")
+
+
+def remove_stale_indices(index_path):
+    # Earlier indices of the same source file; the directory holds no others
+    directory = os.path.dirname(index_path)
+    for file_name in os.listdir(directory):
+        stale_path = os.path.join(directory, file_name)
+        if file_name.endswith(".idx") and stale_path != index_path:
+            os.remove(stale_path)
+
+
+def load_index(path):
+    # Returns the file's index, from the cache when its hash has one. An
+    # unwritable cache directory just means parsing every time.
+    file_hash = hash_file(path)
+    index_path = find_index_path(path, file_hash)
+
+    try:
+        return read_index(index_path, file_hash)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    index = parse_maya_ascii(path)
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        write_index(index, index_path)
+        remove_stale_indices(index_path)
+    except OSError:
+        pass
+
+    return index
+
+
+def read_statement(path, entry):
+    with open(path, "rb") as maya_file:
+        maya_file.seek(entry["offset"])
+        return maya_file.read(entry["length"]).decode("latin-1")
+
+
+def read_set_attr_value(path, set_attr):
+    # Returns the value tokens of an indexed setAttr, e.g. the nurbsSurface
+    # data of a shape's ".cc"
+    tokens = shlex.split(read_statement(path, set_attr).rstrip(";"))
+    tokens = tokens[tokens.index(set_attr["attr"]) + 1 :]
+    if tokens[:1] == ["-type"]:
+        tokens = tokens[2:]
+    return tokens
+
+
+def find_nodes(index, node_type=None):
+    return [
+        node["name"]
+        for node in index["nodes"]
+        if node_type == None or node["type"] == node_type
+    ]
+
+
+def find_published_attributes(path, index):
+    # Returns [(container, published name, bound plug or None)]. Maya stores
+    # them as container.borderConnections[i] plugs, named through the
+    # container's attributeAliasList: {"name","borderConnections[i]",...}
+    containers = set(find_nodes(index, "container"))
+    sources = dict(
+        (destination, source) for source, destination in index["connections"]
+    )
+
+    published = []
+    for set_attr in index["set_attrs"]:
+        container = set_attr["node"]
+        if set_attr["attr"] != ".aal" or container not in containers:
+            continue
+
+        statement = read_statement(path, set_attr)
+        aliases = QUOTED_STRING.findall(statement[statement.find("{") :])
+        for name, plug in zip(aliases[0::2], aliases[1::2]):
+            short_plug = plug.replace("borderConnections", "bc", 1)
+            bound = sources.get(container + "." + short_plug)
+            if bound == None:
+                bound = sources.get(container + "." + plug)
+            published.append((container, name, bound))
+
+    return published
@@ -0,0 +1,205 @@
+import maya.cmds as cmds
+import System.utils as utils
+
+# reload() reruns this file over the old globals. The previous load's
+# scriptJobs would keep invalidating its stale state, so they are killed, and
+# generation carries on so hook_graph doesn't take a new index for its own.
+previous_index_state = globals().get("index_state")
+
+# Blueprint modules in the current scene, keyed by namespace
+# ("Class__user_specified_name"). Built from one namespaceInfo scan, then kept
+# current by Blueprint.install, rename_module_instance and delete. Scene
+# changes that bypass those (new/open scene, undo, redo) mark it stale and the
+# next lookup rebuilds it.
+module_index = {}
+user_specified_names = {}  # user specified name -> namespace
+high_water_marks = {}  # basename -> highest trailing number handed out or seen
+# generation counts rebuilds, so caches derived from the index (hook_graph)
+# know when to rebuild too
+index_state = {"built": False, "script_jobs": [], "generation": 0}
+
+INVALIDATING_EVENTS = ["NewSceneOpened", "SceneOpened", "Undo", "Redo"]
+
+
+def invalidate_module_index():
+    index_state["built"] = False
+
+
+def kill_index_script_jobs(state):
+    for job in state["script_jobs"]:
+        if cmds.scriptJob(exists=job):
+            cmds.scriptJob(kill=job, force=True)
+    del state["script_jobs"][:]
+
+
+def create_index_script_jobs():
+    if index_state["script_jobs"]:
+        return
+
+    for event in INVALIDATING_EVENTS:
+        index_state["script_jobs"].append(
+            cmds.scriptJob(event=[event, invalidate_module_index])
+        )
+
+
+if previous_index_state != None:
+    kill_index_script_jobs(previous_index_state)
+    index_state["generation"] = previous_index_state["generation"]
+del previous_index_state
+
+
+def parse_module_namespace(namespace, class_names):
+    split_string = namespace.partition("__")
+    if split_string[1] == "" or split_string[0] not in class_names:
+        return None
+    return split_string[0], split_string[2]
+
+
+def build_module_index():
+    module_index.clear()
+    user_specified_names.clear()
+    high_water_marks.clear()
+
+    module_name_info = utils.find_all_module_names("/Modules/Blueprint")
+    class_names = dict(zip(module_name_info[1], module_name_info[0]))
+
+    cmds.namespace(setNamespace=":")
+    for namespace in cmds.namespaceInfo(listOnlyNamespaces=True) or []:
+        parsed = parse_module_namespace(namespace, class_names)
+        if parsed != None:
+            add_entry(class_names[parsed[0]], parsed[0], parsed[1])
+
+    create_index_script_jobs()
+    index_state["built"] = True
+    index_state["generation"] += 1
+
+
+def get_module_index():
+    if not index_state["built"]:
+        build_module_index()
+    return module_index
+
+
+def add_entry(module_file, class_name, user_specified_name):
+    namespace = class_name + "__" + user_specified_name
+    module_index[namespace] = {
+        "file": module_file,
+        "class_name": class_name,
+        "user_specified_name": user_specified_name,
+        "namespace": namespace,
+        "container": namespace + ":module_container",
+    }
+    user_specified_names[user_specified_name] = namespace
+
+    for basename in high_water_marks:
+        suffix = user_specified_name[len(basename) :]
+        if user_specified_name.find(basename) == 0 and suffix.isdecimal():
+            high_water_marks[basename] = max(high_water_marks[basename], int(suffix))
+
+    return module_index[namespace]
+
+
+def add_module(module_file, class_name, user_specified_name):
+    if not index_state["built"]:
+        # The scan picks up the new module along with everything else
+        build_module_index()
+        return module_index.get(class_name + "__" + user_specified_name)
+
+    return add_entry(module_file, class_name, user_specified_name)
+
+
+def remove_module(namespace):
+    if not index_state["built"]:
+        return
+
+    entry = module_index.pop(namespace, None)
+    if entry == None:
+        return
+
+    name = entry["user_specified_name"]
+    if user_specified_names.get(name) == namespace:
+        del user_specified_names[name]
+
+
+def rename_module(namespace, new_user_specified_name):
+    if not index_state["built"]:
+        return
+
+    entry = module_index.get(namespace)
+    if entry == None:
+        invalidate_module_index()
+        return
+
+    remove_module(namespace)
+    add_entry(entry["file"], entry["class_name"], new_user_specified_name)
+
+
+def find_module(namespace):
+    return get_module_index().get(namespace)
+
+
+def find_modules():
+    return list(get_module_index().values())
+
+
+def find_user_specified_names():
+    get_module_index()
+    return list(user_specified_names)
+
+
+def user_specified_name_exists(name):
+    get_module_index()
+    namespace = user_specified_names.get(name)
+    if namespace == None:
+        return False
+
+    if cmds.namespace(exists=":" + namespace):
+        return True
+
+    # The namespace went away without us hearing about it
+    invalidate_module_index()
+    return name in find_user_specified_names()
+
+
+def allocate_user_specified_names(basename, count=1):
+    # Reserves count unused names basename1, basename2, ... above the highest
+    # number seen for basename. The first request for a basename scans the
+    # index once; later requests are O(count).
+    get_module_index()
+    if basename not in high_water_marks:
+        high_water_marks[basename] = utils.find_highest_trailing_number(
+            user_specified_names, basename
+        )
+
+    first = high_water_marks[basename] + 1
+    names = [basename + str(number) for number in range(first, first + count)]
+
+    if any(name in user_specified_names for name in names):
+        # Names the index saw without updating the mark; resync and retry
+        del high_water_marks[basename]
+        return allocate_user_specified_names(basename, count)
+
+    high_water_marks[basename] = first + count - 1
+    return names
+
+
+def is_module_index_consistent():
+    # One namespace listing compared against the index; rebuilds on mismatch
+    if not index_state["built"]:
+        build_module_index()
+        return True
+
+    class_names = set(utils.find_all_module_names("/Modules/Blueprint")[1])
+
+    cmds.namespace(setNamespace=":")
+    scene_namespaces = set(
+        namespace
+        for namespace in cmds.namespaceInfo(listOnlyNamespaces=True) or []
+        if parse_module_namespace(namespace, class_names) != None
+    )
+
+    if scene_namespaces == set(module_index):
+        return True
+
+    build_module_index()
+    return False
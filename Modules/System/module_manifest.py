@@ -0,0 +1,207 @@
+import ast
+import hashlib
+import json
+import os
+import sys
+
+import System.user_cache as user_cache
+
+# Blueprint module metadata (CLASS_NAME, TITLE, DESCRIPTION, ICON) read from
+# the module source without importing it. Results are kept in a manifest file
+# per module directory, in the user cache (see user_cache), keyed by a hash of
+# each file:
+#
+#   {"version": 1, "modules": {"single_joint_segment": {"hash": "...",
+#       "metadata": {"class_name": ..., "title": ..., "description": ...,
+#                    "icon": "${RIGGING_TOOL_ROOT}/Icons/_singleJointSeg.xpm"}}}}
+#
+# Environment lookups are stored as ${NAME} and expanded when read, so the
+# manifest stays valid on other machines. "metadata" is None for modules
+# whose constants aren't static expressions; those are imported instead.
+
+MANIFEST_CACHE_KIND = "module_manifests"
+MANIFEST_VERSION = 1
+METADATA_NAMES = {
+    "CLASS_NAME": "class_name",
+    "TITLE": "title",
+    "DESCRIPTION": "description",
+    "ICON": "icon",
+}
+
+# Before Python 3.8 (Maya 2022 runs 3.7) string literals parse as ast.Str, and
+# before 3.9 subscripts wrap their index in ast.Index
+LEGACY_STRING_NODE = ast.Str if sys.version_info < (3, 8) else None
+LEGACY_INDEX_NODE = ast.Index if sys.version_info < (3, 9) else None
+
+manifests = {}  # directory -> {"modules": {...}, "dirty": bool}
+
+
+def hash_file(path):
+    with open(path, "rb") as module_file:
+        source = module_file.read()
+    return hashlib.sha1(source).hexdigest(), source
+
+
+def is_name(node, *names):
+    # Matches dotted names such as os.environ or os.path.join
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.insert(0, node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return False
+    parts.insert(0, node.id)
+    return ".".join(parts) in names
+
+
+def string_literal(node):
+    # The string a literal node holds, or None
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if LEGACY_STRING_NODE != None and isinstance(node, LEGACY_STRING_NODE):
+        return node.s
+    return None
+
+
+def subscript_index(node):
+    if LEGACY_INDEX_NODE != None and isinstance(node.slice, LEGACY_INDEX_NODE):
+        return node.slice.value
+    return node.slice
+
+
+def environ_reference(node):
+    name = string_literal(node)
+    if name == None:
+        raise ValueError("Environment variable name is not a literal")
+    return "${" + name + "}"
+
+
+def static_value(node):
+    # Evaluates the string expressions module constants are written with
+    value = string_literal(node)
+    if value != None:
+        return value
+
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return static_value(node.left) + static_value(node.right)
+
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.FormattedValue):
+                if value.conversion != -1 or value.format_spec != None:
+                    raise ValueError("Formatted value is not static")
+                value = value.value
+            parts.append(static_value(value))
+        return "".join(parts)
+
+    if isinstance(node, ast.Subscript) and is_name(node.value, "os.environ"):
+        return environ_reference(subscript_index(node))
+
+    if isinstance(node, ast.Call) and not node.keywords:
+        if is_name(node.func, "os.environ.get", "os.getenv") and node.args:
+            return environ_reference(node.args[0])
+        if is_name(node.func, "os.path.join"):
+            return os.path.join(*[static_value(arg) for arg in node.args])
+
+    raise ValueError("Not a static string expression: " + ast.dump(node))
+
+
+def extract_metadata(source, filename="<module>"):
+    # Returns the metadata dict, or None if any constant is missing or dynamic
+    try:
+        tree = ast.parse(source, filename)
+    except SyntaxError:
+        return None
+
+    metadata = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if not isinstance(target, ast.Name) or target.id not in METADATA_NAMES:
+            continue
+
+        try:
+            metadata[METADATA_NAMES[target.id]] = static_value(node.value)
+        except ValueError:
+            return None
+
+    if len(metadata) != len(METADATA_NAMES):
+        return None
+    return metadata
+
+
+def resolve_metadata(metadata):
+    return dict(
+        (key, os.path.expandvars(value)) for key, value in metadata.items()
+    )
+
+
+def load_manifest(directory):
+    manifest = manifests.get(directory)
+    if manifest != None:
+        return manifest
+
+    manifest = {"modules": {}, "dirty": False}
+    try:
+        with open(find_manifest_path(directory)) as manifest_file:
+            data = json.load(manifest_file)
+        if data.get("version") == MANIFEST_VERSION:
+            manifest["modules"] = data["modules"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    manifests[directory] = manifest
+    return manifest
+
+
+def find_manifest_path(directory):
+    return user_cache.find_cache_path(MANIFEST_CACHE_KIND, directory, ".json")
+
+
+def save_manifest(directory, modules=None):
+    # Writes the manifest if it changed, dropping entries not in modules when
+    # given. An unwritable cache just means re-parsing next session.
+    manifest = load_manifest(directory)
+    if modules != None:
+        for module in list(manifest["modules"]):
+            if module not in modules:
+                del manifest["modules"][module]
+                manifest["dirty"] = True
+
+    if not manifest["dirty"]:
+        return
+
+    path = find_manifest_path(directory)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as manifest_file:
+            json.dump(
+                {"version": MANIFEST_VERSION, "modules": manifest["modules"]},
+                manifest_file,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(path + ".tmp", path)
+    except OSError:
+        return
+
+    manifest["dirty"] = False
+
+
+def find_module_metadata(directory, module):
+    # Returns the module's resolved metadata, or None when it must be imported
+    manifest = load_manifest(directory)
+    path = os.path.join(directory, module + ".py")
+    digest, source = hash_file(path)
+
+    entry = manifest["modules"].get(module)
+    if entry == None or entry["hash"] != digest:
+        entry = {"hash": digest, "metadata": extract_metadata(source, path)}
+        manifest["modules"][module] = entry
+        manifest["dirty"] = True
+
+    if entry["metadata"] == None:
+        return None
+    return resolve_metadata(entry["metadata"])
@@ -0,0 +1,169 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+import maya.cmds as cmds
+import System.utils as utils
+import System.module_index as module_index
+import System.bulk_install as bulk_install
+
+# Blueprint layout snapshots. A file is:
+#
+#   b"BPSNAP01", uint32 header length, JSON header, padding to 8 bytes,
+#   little-endian float64 block
+#
+# The header lists each module (file, user specified name, hook object, root
+# constraint state, joint count, offset into the block). The block holds
+# FIELDS_PER_JOINT values per joint: world position x/y/z, orientation control
+# rotateX (nan when the joint has none) and rotateOrder.
+
+SNAPSHOT_MAGIC = b"BPSNAP01"
+SNAPSHOT_VERSION = 1
+FIELDS_PER_JOINT = 5
+NO_ORIENTATION = float("nan")
+
+
+def gather_module_snapshot(module, values):
+    # Appends the module's joint values to values and returns its header entry.
+    # Reads the same data as lock_phase_1, without unhooking the module.
+    offset = len(values)
+    joints = module.get_joints()
+
+    joint_positions = utils.get_world_positions(joints)
+    for index, joint in enumerate(joints):
+        values.extend(joint_positions[index * 3 : index * 3 + 3])
+
+        orientation_control = module.get_orientation_control(joint)
+        if cmds.objExists(orientation_control):
+            values.append(cmds.getAttr(orientation_control + ".rotateX"))
+        else:
+            values.append(NO_ORIENTATION)
+
+        values.append(cmds.getAttr(joint + ".rotateOrder"))
+
+    hook_object = module.find_hook_obj()
+    if hook_object == f"{module.module_namespace}:unhookedTarget":
+        hook_object = None
+
+    return {
+        "root_constrained": module.is_root_constrained(),
+        "hook_object": hook_object,
+        "joint_count": len(joints),
+        "offset": offset,
+    }
+
+
+def save_snapshot(path):
+    module_index.is_module_index_consistent()
+
+    values = array("d")
+    modules = []
+    for module_info in module_index.find_modules():
+        module_class = utils.find_module_class("/Modules/Blueprint", module_info["file"])
+        module = module_class(module_info["user_specified_name"], None)
+
+        entry = gather_module_snapshot(module, values)
+        entry["module"] = module_info["file"]
+        entry["user_specified_name"] = module_info["user_specified_name"]
+        modules.append(entry)
+
+    header = json.dumps(
+        {"version": SNAPSHOT_VERSION, "value_count": len(values), "modules": modules},
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    prefix_length = len(SNAPSHOT_MAGIC) + 4 + len(header)
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC)
+        snapshot_file.write(struct.pack("<I", len(header)))
+        snapshot_file.write(header)
+        snapshot_file.write(b"\0" * (-prefix_length % 8))
+        values.tofile(snapshot_file)
+
+    return len(modules)
+
+
+def read_snapshot(path):
+    # Returns bulk_install specs, with the snapshot's extra per-joint data under
+    # "orientations", "rotation_orders" and "root_constrained"
+    with open(path, "rb") as snapshot_file:
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError("Not a blueprint snapshot: " + path)
+
+            header_start = len(SNAPSHOT_MAGIC) + 4
+            (header_length,) = struct.unpack_from("<I", data, len(SNAPSHOT_MAGIC))
+            header = json.loads(
+                data[header_start : header_start + header_length].decode("utf-8")
+            )
+
+            block_start = header_start + header_length
+            block_start += -block_start % 8
+            block_end = block_start + header["value_count"] * 8
+
+            if sys.byteorder == "little":
+                view = memoryview(data)[block_start:block_end].cast("d")
+                try:
+                    specs = [snapshot_spec(entry, view) for entry in header["modules"]]
+                finally:
+                    view.release()
+            else:
+                values = array("d", data[block_start:block_end])
+                values.byteswap()
+                specs = [snapshot_spec(entry, values) for entry in header["modules"]]
+
+    return specs
+
+
+def snapshot_spec(entry, values):
+    start = entry["offset"]
+    end = start + entry["joint_count"] * FIELDS_PER_JOINT
+    joint_values = values[start:end].tolist()
+
+    joint_positions = []
+    orientations = []
+    rotation_orders = []
+    for index in range(0, len(joint_values), FIELDS_PER_JOINT):
+        joint_positions.append(joint_values[index : index + 3])
+        orientations.append(joint_values[index + 3])
+        rotation_orders.append(int(joint_values[index + 4]))
+
+    return {
+        "module": entry["module"],
+        "user_specified_name": entry["user_specified_name"],
+        "hook_object": entry["hook_object"],
+        "joint_positions": joint_positions,
+        "orientations": orientations,
+        "rotation_orders": rotation_orders,
+        "root_constrained": entry["root_constrained"],
+    }
+
+
+def load_snapshot(path):
+    # Rebuilds every module in the snapshot with one bulk install, then restores
+    # orientation, rotation order and root constraint state
+    specs = read_snapshot(path)
+    modules = bulk_install.install_modules(specs)
+    specs_by_name = dict((spec["user_specified_name"], spec) for spec in specs)
+
+    for module in modules:
+        spec = specs_by_name[module.user_specified_name]
+
+        for joint, orientation, rotation_order in zip(
+            module.get_joints(), spec["orientations"], spec["rotation_orders"]
+        ):
+            if orientation == orientation:  # not nan
+                cmds.setAttr(
+                    module.get_orientation_control(joint) + ".rotateX", orientation
+                )
+            cmds.setAttr(joint + ".rotateOrder", rotation_order)
+
+        if spec["root_constrained"]:
+            module.constrain_root_to_hook()
+
+    return modules
@@ -0,0 +1,252 @@
+from math import asin, atan2, cos, degrees, radians, sin, sqrt
+
+# 4x4 matrices are flat, row-major lists of 16 floats using Maya's row-vector
+# convention: a point p is transformed as p * M, and the local matrix of a
+# joint is S * R * JO * T.
+
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+AXIS_INDEX = {"x": 0, "y": 1, "z": 2}
+
+
+def identity():
+    return [1.0 if i % 5 == 0 else 0.0 for i in range(16)]
+
+
+def multiply(a, b):
+    result = [0.0] * 16
+    for row in range(4):
+        for column in range(4):
+            result[row * 4 + column] = (
+                a[row * 4] * b[column]
+                + a[row * 4 + 1] * b[4 + column]
+                + a[row * 4 + 2] * b[8 + column]
+                + a[row * 4 + 3] * b[12 + column]
+            )
+    return result
+
+
+def inverse(m):
+    # Affine inverse: invert the upper 3x3 and transform the translation row
+    a, b, c = m[0], m[1], m[2]
+    d, e, f = m[4], m[5], m[6]
+    g, h, i = m[8], m[9], m[10]
+
+    det = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+    if abs(det) < 1e-12:
+        raise ValueError("Matrix is singular")
+
+    inv_det = 1.0 / det
+    r = [
+        (e * i - f * h) * inv_det,
+        (c * h - b * i) * inv_det,
+        (b * f - c * e) * inv_det,
+        (f * g - d * i) * inv_det,
+        (a * i - c * g) * inv_det,
+        (c * d - a * f) * inv_det,
+        (d * h - e * g) * inv_det,
+        (b * g - a * h) * inv_det,
+        (a * e - b * d) * inv_det,
+    ]
+
+    tx, ty, tz = m[12], m[13], m[14]
+    return r[0:3] + [0.0] + r[3:6] + [0.0] + r[6:9] + [0.0] + [
+        -(tx * r[0] + ty * r[3] + tz * r[6]),
+        -(tx * r[1] + ty * r[4] + tz * r[7]),
+        -(tx * r[2] + ty * r[5] + tz * r[8]),
+        1.0,
+    ]
+
+
+def translation_matrix(translate):
+    m = identity()
+    m[12], m[13], m[14] = translate[0], translate[1], translate[2]
+    return m
+
+
+def scale_matrix(scale):
+    m = identity()
+    m[0], m[5], m[10] = scale[0], scale[1], scale[2]
+    return m
+
+
+def axis_rotation_matrix(axis, angle):
+    c = cos(radians(angle))
+    s = sin(radians(angle))
+    m = identity()
+
+    if axis == "x":
+        m[5], m[6], m[9], m[10] = c, s, -s, c
+    elif axis == "y":
+        m[0], m[2], m[8], m[10] = c, -s, s, c
+    else:
+        m[0], m[1], m[4], m[5] = c, s, -s, c
+
+    return m
+
+
+def euler_to_matrix(rotation, rotate_order="xyz"):
+    if isinstance(rotate_order, int):
+        rotate_order = ROTATE_ORDERS[rotate_order]
+
+    m = identity()
+    for axis in rotate_order:
+        m = multiply(m, axis_rotation_matrix(axis, rotation[AXIS_INDEX[axis]]))
+
+    return m
+
+
+def matrix_to_euler(m, rotate_order="xyz"):
+    if isinstance(rotate_order, int):
+        rotate_order = ROTATE_ORDERS[rotate_order]
+
+    i = AXIS_INDEX[rotate_order[0]]
+    j = AXIS_INDEX[rotate_order[1]]
+    k = AXIS_INDEX[rotate_order[2]]
+    parity = 1.0 if (j - i) % 3 == 1 else -1.0
+
+    # Transpose into the column-vector convention, where R = Rk * Rj * Ri
+    r = [[m[column * 4 + row] for column in range(3)] for row in range(3)]
+
+    sin_b = max(-1.0, min(1.0, -parity * r[k][i]))
+    b = asin(sin_b)
+
+    if abs(sin_b) < 0.9999999:
+        a = atan2(parity * r[k][j], r[k][k])
+        c = atan2(parity * r[j][i], r[i][i])
+    else:
+        a = atan2(-parity * r[j][k], r[j][j])
+        c = 0.0
+
+    result = [0.0, 0.0, 0.0]
+    result[i] = degrees(a)
+    result[j] = degrees(b)
+    result[k] = degrees(c)
+    return result
+
+
+def compose(
+    translate=(0.0, 0.0, 0.0),
+    rotate=(0.0, 0.0, 0.0),
+    rotate_order="xyz",
+    scale=(1.0, 1.0, 1.0),
+    joint_orient=None,
+):
+    m = multiply(scale_matrix(scale), euler_to_matrix(rotate, rotate_order))
+    if joint_orient != None:
+        m = multiply(m, euler_to_matrix(joint_orient, "xyz"))
+
+    return multiply(m, translation_matrix(translate))
+
+
+def get_translation(m):
+    return [m[12], m[13], m[14]]
+
+
+def get_scale(m):
+    return [
+        length(m[0:3]),
+        length(m[4:7]),
+        length(m[8:11]),
+    ]
+
+
+def rotation_part(m):
+    # Upper 3x3 with scale removed, as a 4x4 matrix
+    scale = get_scale(m)
+    result = identity()
+    for row in range(3):
+        for column in range(3):
+            result[row * 4 + column] = m[row * 4 + column] / (scale[row] or 1.0)
+    return result
+
+
+def transform_point(point, m):
+    x, y, z = point
+    return [
+        x * m[0] + y * m[4] + z * m[8] + m[12],
+        x * m[1] + y * m[5] + z * m[9] + m[13],
+        x * m[2] + y * m[6] + z * m[10] + m[14],
+    ]
+
+
+def length(vector):
+    return sqrt(sum(value * value for value in vector))
+
+
+def normalize(vector):
+    vector_length = length(vector)
+    if vector_length < 1e-12:
+        return None
+    return [value / vector_length for value in vector]
+
+
+def dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def cross(a, b):
+    return [
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    ]
+
+
+def subtract(a, b):
+    return [a[0] - b[0], a[1] - b[1], a[2] - b[2]]
+
+
+def axes_to_matrix(x_axis, y_axis, z_axis):
+    m = identity()
+    m[0:3] = x_axis
+    m[4:7] = y_axis
+    m[8:11] = z_axis
+    return m
+
+
+def aim_matrix(aim_vector, up_vector, aim_axis="x", up_axis="y"):
+    # Rotation whose aim_axis points along aim_vector and whose up_axis lies in
+    # the plane of aim_vector and up_vector. Returns None when degenerate.
+    aim = normalize(aim_vector)
+    if aim == None:
+        return None
+
+    up = normalize(subtract(up_vector, [value * dot(up_vector, aim) for value in aim]))
+    if up == None:
+        return None
+
+    axes = [None, None, None]
+    axes[AXIS_INDEX[aim_axis]] = aim
+    axes[AXIS_INDEX[up_axis]] = up
+
+    third = 3 - AXIS_INDEX[aim_axis] - AXIS_INDEX[up_axis]
+    if (AXIS_INDEX[up_axis] - AXIS_INDEX[aim_axis]) % 3 == 1:
+        axes[third] = cross(aim, up)
+    else:
+        axes[third] = cross(up, aim)
+
+    return axes_to_matrix(axes[0], axes[1], axes[2])
+
+
+def solve_joint_orientations(
+    aim_vectors, up_vectors, twists, parent_matrices, rotate_order="xyz"
+):
+    # Joint orients for joints whose X axis aims along aim_vectors[i] with Y in
+    # the plane of up_vectors[i], twisted by twists[i] degrees about X, as seen
+    # from parent_matrices[i]. Matches baking the twist with makeIdentity. Falls
+    # back to no aim when the inputs are degenerate.
+    orientations = []
+    for aim, up, twist, parent_matrix in zip(
+        aim_vectors, up_vectors, twists, parent_matrices
+    ):
+        world_rotation = aim_matrix(aim, up, "x", "y")
+        if world_rotation == None:
+            world_rotation = identity()
+
+        local = multiply(
+            multiply(axis_rotation_matrix("x", twist), world_rotation),
+            inverse(rotation_part(parent_matrix)),
+        )
+        orientations.append(matrix_to_euler(local, rotate_order))
+
+    return orientations
@@ -0,0 +1,48 @@
+import hashlib
+import os
+import sys
+
+# Per-user directory for the caches the tool writes: module manifests and .ma
+# indices. The tool's own directories are often a read-only shared install, so
+# nothing is written next to the files a cache describes.
+#
+#   $RIGGING_TOOL_CACHE, if set
+#   <Maya user app directory>/rigging_tool_cache, in Maya
+#   <platform user cache directory>/rigging_tool, elsewhere
+#
+# Entries are keyed by a hash of the path they were made from.
+
+CACHE_ENVIRONMENT_VARIABLE = "RIGGING_TOOL_CACHE"
+MAYA_CACHE_DIRECTORY_NAME = "rigging_tool_cache"
+CACHE_DIRECTORY_NAME = "rigging_tool"
+
+
+def find_cache_root():
+    root = os.environ.get(CACHE_ENVIRONMENT_VARIABLE)
+    if root:
+        return root
+
+    # Only asks Maya when it is already loaded; the offline tools run without it
+    maya_cmds = sys.modules.get("maya.cmds")
+    if maya_cmds != None and hasattr(maya_cmds, "internalVar"):
+        return os.path.join(
+            maya_cmds.internalVar(userAppDir=True), MAYA_CACHE_DIRECTORY_NAME
+        )
+
+    if sys.platform == "win32":
+        user_cache = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        user_cache = os.path.expanduser("~/Library/Caches")
+    else:
+        user_cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(user_cache, CACHE_DIRECTORY_NAME)
+
+
+def hash_path(path):
+    normalized = os.path.normcase(os.path.abspath(path))
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def find_cache_path(kind, source_path, suffix=""):
+    # <cache root>/<kind>/<hash of source_path><suffix>
+    return os.path.join(find_cache_root(), kind, hash_path(source_path) + suffix)
@@ -1,5 +1,8 @@
 import maya.cmds as cmds
+from array import array
+from contextlib import contextmanager
 from importlib import reload
+import System.module_manifest as module_manifest
 
 def find_all_modules(relative_directory):
     all_py_files = find_all_files(relative_directory, ".py")
@@ -14,19 +17,345 @@ def find_all_modules(relative_directory):
 
 
 def find_all_module_names(relative_directory):
-    valid_modules = find_all_modules(relative_directory)
-    valid_modules_names = []
+    module_infos = find_all_module_info(relative_directory)
 
-    package_folder = relative_directory.partition("/Modules/")[2]
+    valid_modules = [info["file"] for info in module_infos]
+    valid_modules_names = [info["class_name"] for info in module_infos]
 
-    for m in valid_modules:
-        mod = __import__(package_folder + "." + m, {}, {}, [m])
-        reload(mod)
-        
-        valid_modules_names.append(mod.CLASS_NAME)
-        
     return (valid_modules, valid_modules_names)
-        
+
+
+# Cached module metadata, keyed by "package.module". Each entry remembers the
+# (mtime, size) of its file so it is only re-read when the file changes.
+# Metadata comes from module_manifest without importing the module; the
+# module itself is imported by find_module_class.
+module_registry = {}
+module_directory_listing = {}
+
+
+def invalidate_module_registry():
+    module_registry.clear()
+    module_directory_listing.clear()
+
+
+def find_module_package(relative_directory):
+    return relative_directory.strip("/").partition("Modules/")[2]
+
+
+def find_module_directory(relative_directory):
+    import os
+
+    return os.environ["RIGGING_TOOL_ROOT"] + "/" + relative_directory.strip("/")
+
+
+def find_all_module_info(relative_directory):
+    import os
+
+    directory = find_module_directory(relative_directory)
+    directory_mtime = os.stat(directory).st_mtime
+
+    listing = module_directory_listing.get(directory)
+    if listing == None or listing[0] != directory_mtime:
+        listing = (directory_mtime, sorted(find_all_modules(relative_directory)))
+        module_directory_listing[directory] = listing
+
+    infos = [load_module_info(relative_directory, module) for module in listing[1]]
+    module_manifest.save_manifest(directory, listing[1])
+    return infos
+
+
+def find_module_info(relative_directory, module):
+    info = load_module_info(relative_directory, module)
+    module_manifest.save_manifest(find_module_directory(relative_directory))
+    return info
+
+
+def load_module_info(relative_directory, module):
+    import os
+
+    directory = find_module_directory(relative_directory)
+    module_file = directory + "/" + module + ".py"
+
+    file_stat = os.stat(module_file)
+    signature = (file_stat.st_mtime, file_stat.st_size)
+
+    key = find_module_package(relative_directory) + "." + module
+    info = module_registry.get(key)
+    if info != None and info["signature"] == signature:
+        return info
+
+    info = {"file": module, "signature": signature, "module": None}
+
+    metadata = module_manifest.find_module_metadata(directory, module)
+    if metadata == None:
+        # Constants the manifest can't evaluate; read them off the module
+        mod = import_module_file(key, module)
+        metadata = {
+            "class_name": mod.CLASS_NAME,
+            "title": mod.TITLE,
+            "description": mod.DESCRIPTION,
+            "icon": mod.ICON,
+        }
+        info["module"] = mod
+
+    info.update(metadata)
+    module_registry[key] = info
+
+    return info
+
+
+def import_module_file(key, module):
+    import sys
+
+    # Already imported means the file changed since, so pick up the new code
+    was_imported = key in sys.modules
+    mod = __import__(key, {}, {}, [module])
+    if was_imported:
+        reload(mod)
+    return mod
+
+
+def find_module_class(relative_directory, module):
+    info = find_module_info(relative_directory, module)
+    if info["module"] == None:
+        key = find_module_package(relative_directory) + "." + module
+        info["module"] = import_module_file(key, module)
+    return getattr(info["module"], info["class_name"])
+
+
+# Control object templates, imported once per file into a hidden namespace and
+# duplicated for every new control. Keyed by file path, invalidated on (mtime, size).
+# The namespace is saved with scenes that still hold blueprint modules and is
+# removed once they are all locked.
+CONTROL_OBJECT_TEMPLATE_NAMESPACE = "controlObjectTemplates"
+control_object_templates = {}
+
+# Imported nodes that belong to the template file itself, not to its controls
+CONTROL_OBJECT_TEMPLATE_ONLY_TYPES = [
+    "container",
+    "hyperLayout",
+    "lightLinker",
+    "materialInfo",
+    "groupId",
+]
+
+
+def invalidate_control_object_templates():
+    # Deletes the template namespace with everything in it
+    control_object_templates.clear()
+
+    if cmds.namespace(exists=":" + CONTROL_OBJECT_TEMPLATE_NAMESPACE):
+        current_namespace = cmds.namespaceInfo(currentNamespace=True, absoluteName=True)
+        cmds.namespace(setNamespace=":")
+        cmds.namespace(
+            removeNamespace=CONTROL_OBJECT_TEMPLATE_NAMESPACE,
+            deleteNamespaceContent=True,
+        )
+        if current_namespace.lstrip(":").split(":")[0] != (
+            CONTROL_OBJECT_TEMPLATE_NAMESPACE
+        ):
+            cmds.namespace(setNamespace=current_namespace)
+
+
+def find_control_object_template_group():
+    template_grp = CONTROL_OBJECT_TEMPLATE_NAMESPACE + ":templates_grp"
+
+    if not cmds.objExists(template_grp):
+        current_namespace = cmds.namespaceInfo(currentNamespace=True, absoluteName=True)
+        cmds.namespace(setNamespace=":")
+        if not cmds.namespace(exists=CONTROL_OBJECT_TEMPLATE_NAMESPACE):
+            cmds.namespace(add=CONTROL_OBJECT_TEMPLATE_NAMESPACE)
+        cmds.namespace(setNamespace=current_namespace)
+
+        template_grp = cmds.group(empty=True, name=template_grp)
+        cmds.setAttr(template_grp + ".visibility", 0)
+        if cmds.attributeQuery("hiddenInOutliner", node=template_grp, exists=True):
+            cmds.setAttr(template_grp + ".hiddenInOutliner", 1)
+
+    return template_grp
+
+
+def find_control_object_template(relative_file_path):
+    import os
+
+    object_file = os.environ["RIGGING_TOOL_ROOT"] + "/" + relative_file_path.lstrip("/")
+    file_stat = os.stat(object_file)
+    signature = (file_stat.st_mtime, file_stat.st_size)
+
+    template = control_object_templates.get(object_file)
+    if template != None:
+        existing = cmds.ls(template["roots"])
+
+        # A new scene, or an edited .ma file, leaves the cached template stale
+        if template["signature"] == signature and len(existing) == len(
+            template["roots"]
+        ):
+            return template
+
+        existing = cmds.ls(
+            existing + template["network"] + template["shading_engines"]
+        )
+        if existing:
+            cmds.delete(existing)
+
+    template_grp = find_control_object_template_group()
+
+    new_nodes = cmds.file(
+        object_file,
+        i=True,
+        namespace=CONTROL_OBJECT_TEMPLATE_NAMESPACE,
+        mergeNamespacesOnClash=True,
+        returnNewNodes=True,
+    )
+
+    container_name = None
+    for container in cmds.ls(new_nodes, type="container"):
+        container_name = strip_all_namespaces(container)[1]
+        cmds.container(container, edit=True, removeContainer=True)
+
+    # Materials, shading groups and driven key curves are copied with every
+    # control, as each import used to create its own, so they end up in the
+    # control's container
+    dag_nodes = set(cmds.ls(new_nodes, dag=True))
+    shading_engines = cmds.ls(new_nodes, type="shadingEngine")
+    skipped = set(cmds.ls(new_nodes, type=CONTROL_OBJECT_TEMPLATE_ONLY_TYPES))
+    network = [
+        node
+        for node in cmds.ls(new_nodes)
+        if node not in dag_nodes
+        and node not in skipped
+        and node not in shading_engines
+    ]
+
+    roots = []
+    for root in cmds.ls(new_nodes, assemblies=True):
+        roots.append(cmds.parent(root, template_grp)[0])
+
+    dag_nodes = set(
+        cmds.ls(roots, long=True)
+        + (cmds.listRelatives(roots, allDescendents=True, fullPath=True) or [])
+    )
+    template_nodes = dag_nodes.union(network, shading_engines)
+
+    connections = set()
+    for node in network + shading_engines:
+        for is_source in [True, False]:
+            plugs = (
+                cmds.listConnections(
+                    node,
+                    source=not is_source,
+                    destination=is_source,
+                    connections=True,
+                    plugs=True,
+                )
+                or []
+            )
+            for plug, other_plug in zip(plugs[0::2], plugs[1::2]):
+                other_node, _, other_attr = other_plug.partition(".")
+                other_node = (cmds.ls(other_node, long=True) or [other_node])[0]
+                if other_node not in template_nodes:
+                    continue
+                if node in shading_engines and other_node in dag_nodes:
+                    continue  # set membership, copied with cmds.sets
+
+                other_plug = other_node + "." + other_attr
+                if is_source:
+                    connections.add((plug, other_plug))
+                else:
+                    connections.add((other_plug, plug))
+
+    template = {
+        "signature": signature,
+        "roots": roots,
+        "container_name": container_name,
+        "network": network,
+        "shading_engines": shading_engines,
+        "connections": sorted(connections),
+    }
+    control_object_templates[object_file] = template
+
+    return template
+
+
+def template_node_name(node):
+    return strip_all_namespaces(node.rpartition("|")[2])[1]
+
+
+def create_control_object(relative_file_path, prefix, container_name=None):
+    template = find_control_object_template(relative_file_path)
+
+    new_nodes = []
+    new_roots = []
+    copies = {}  # template node -> its copy
+    for root in template["roots"]:
+        template_nodes = cmds.ls(root, long=True) + (
+            cmds.listRelatives(root, allDescendents=True, fullPath=True) or []
+        )
+
+        duplicate = cmds.duplicate(root, renameChildren=True)[0]
+        duplicate = cmds.parent(duplicate, world=True)[0]
+        duplicate_nodes = [cmds.ls(duplicate, long=True)[0]] + (
+            cmds.listRelatives(duplicate, allDescendents=True, fullPath=True) or []
+        )
+
+        # Rename the deepest nodes first so the remaining full paths stay valid
+        order = sorted(
+            range(len(duplicate_nodes)),
+            key=lambda i: duplicate_nodes[i].count("|"),
+            reverse=True,
+        )
+        renamed = [None] * len(duplicate_nodes)
+        for i in order:
+            renamed[i] = cmds.rename(
+                duplicate_nodes[i], prefix + template_node_name(template_nodes[i])
+            )
+
+        new_roots.append(renamed[0])
+        new_nodes.extend(renamed)
+        copies.update(zip(template_nodes, renamed))
+
+    for node in template["network"]:
+        copies[node] = cmds.duplicate(node, name=prefix + template_node_name(node))[0]
+        new_nodes.append(copies[node])
+
+    for shading_engine in template["shading_engines"]:
+        copy = cmds.sets(
+            renderable=True,
+            noSurfaceShader=True,
+            empty=True,
+            name=prefix + template_node_name(shading_engine),
+        )
+        copies[shading_engine] = copy
+        new_nodes.append(copy)
+
+        members = []
+        for member in cmds.sets(shading_engine, q=True) or []:
+            node, dot, component = member.partition(".")
+            node = (cmds.ls(node, long=True) or [node])[0]
+            if node in copies:
+                members.append(copies[node] + dot + component)
+        if members:
+            cmds.sets(members, edit=True, forceElement=copy)
+
+    for source, destination in template["connections"]:
+        source_node, _, source_attr = source.partition(".")
+        destination_node, _, destination_attr = destination.partition(".")
+        cmds.connectAttr(
+            copies[source_node] + "." + source_attr,
+            copies[destination_node] + "." + destination_attr,
+            force=True,
+        )
+
+    if container_name == None:
+        container_name = template["container_name"]
+
+    container = None
+    if container_name != None:
+        container = cmds.container(
+            name=prefix + container_name, addNode=new_nodes, includeShapes=True
+        )
+
+    return (container, new_roots)
 
 
 def find_all_files(relative_directory, file_extension):
@@ -46,14 +375,12 @@ def find_all_files(relative_directory, file_extension):
 
 
 def find_highest_trailing_number(names, basename):
-    import re
-
     highest_value = 0
 
     for n in names:
         if n.find(basename) == 0:
-            suffix = n.partition(basename)[2]
-            if re.match("^[0-9]*$", suffix):
+            suffix = n[len(basename) :]
+            if suffix.isdecimal():
                 numerical_element = int(suffix)
 
                 if numerical_element > highest_value:
@@ -62,6 +389,91 @@ def find_highest_trailing_number(names, basename):
     return highest_value
 
 
+def import_open_maya():
+    # maya.api.OpenMaya, or None where there is only maya.cmds (headless_cmds)
+    try:
+        import maya.api.OpenMaya as om
+    except ImportError:
+        return None
+    return om
+
+
+def find_dag_paths(nodes):
+    # MDagPaths for nodes from one MSelectionList, or None without OpenMaya or
+    # when a name doesn't match exactly one DAG node
+    om = import_open_maya()
+    if om == None:
+        return None
+
+    unique_nodes = list(dict.fromkeys(nodes))
+    selection = om.MSelectionList()
+    try:
+        for node in unique_nodes:
+            selection.add(node)
+        if selection.length() != len(unique_nodes):
+            return None
+        dag_paths = [selection.getDagPath(index) for index in range(len(unique_nodes))]
+    except (RuntimeError, TypeError):
+        return None
+
+    dag_paths = dict(zip(unique_nodes, dag_paths))
+    return [dag_paths[node] for node in nodes]
+
+
+def query_xform(nodes, size, **flags):
+    # One xform query over all nodes. Maya doesn't document how a query over
+    # several objects lays out its result, so it is only used when it holds
+    # size values per node; otherwise each node is queried on its own.
+    values = array("d")
+    if len(nodes) == 0:
+        return values
+
+    result = cmds.xform(nodes, query=True, **flags)
+    if result != None and len(result) == size * len(nodes):
+        values.extend(result)
+        return values
+
+    for node in nodes:
+        values.extend(cmds.xform(node, query=True, **flags))
+    return values
+
+
+def get_world_positions(nodes):
+    # World translations as an (N, 3) array("d"), row-major
+    dag_paths = find_dag_paths(nodes)
+    if dag_paths == None:
+        return query_xform(nodes, 3, worldSpace=True, translation=True)
+
+    om = import_open_maya()
+    positions = array("d")
+    for dag_path in dag_paths:
+        matrix = dag_path.inclusiveMatrix()
+        positions.extend(om.MDistance.internalToUI(matrix[i]) for i in range(12, 15))
+    return positions
+
+
+def get_world_matrices(nodes):
+    # World matrices as an (N, 4, 4) array("d") of transform_math's flat
+    # row-major matrices
+    dag_paths = find_dag_paths(nodes)
+    if dag_paths == None:
+        return query_xform(nodes, 16, worldSpace=True, matrix=True)
+
+    om = import_open_maya()
+    matrices = array("d")
+    for dag_path in dag_paths:
+        matrix = dag_path.inclusiveMatrix()
+        matrices.extend(matrix[i] for i in range(12))
+        matrices.extend(om.MDistance.internalToUI(matrix[i]) for i in range(12, 15))
+        matrices.append(matrix[15])
+    return matrices
+
+
+def split_rows(values, size):
+    # [[...size values], ...] from a flat array
+    return [values[i : i + size].tolist() for i in range(0, len(values), size)]
+
+
 def strip_leading_namespace(nodename):
     if str(nodename).find(":") == -1:
         return None
@@ -79,6 +491,107 @@ def strip_all_namespaces(nodename):
     return [split_string[0], split_string[2]]
 
 
+def find_joint_chain(root_joint, end_joint):
+    # Joints below root_joint down to end_joint, and their translateX rest
+    # lengths as an array. The chain is read off the end joint's DAG path.
+    root_path = cmds.ls(root_joint, long=True)[0].split("|")
+    path = cmds.ls(end_joint, long=True)[0].split("|")
+
+    if path[: len(root_path)] != root_path:
+        # end_joint isn't below root_joint; follow first children like the
+        # original chain walk did
+        return walk_joint_chain(root_joint, end_joint)
+
+    child_joints = cmds.ls(
+        ["|".join(path[:index]) for index in range(len(root_path) + 1, len(path) + 1)]
+    )
+    return child_joints, get_rest_lengths(child_joints)
+
+
+def walk_joint_chain(root_joint, end_joint):
+    child_joints = []
+    parent = root_joint
+    while True:
+        children = cmds.ls(cmds.listRelatives(parent, children=True), type="joint")
+        if len(children) == 0:
+            break
+
+        parent = children[0]
+        child_joints.append(parent)
+        if parent == end_joint:
+            break
+
+    return child_joints, get_rest_lengths(child_joints)
+
+
+def get_rest_lengths(joints):
+    # Every joint's translateX in one query, as an array("d")
+    dag_paths = find_dag_paths(joints)
+    if dag_paths == None:
+        return query_xform(joints, 3, objectSpace=True, translation=True)[0::3]
+
+    om = import_open_maya()
+    return array(
+        "d",
+        [
+            om.MDistance.internalToUI(
+                om.MFnTransform(dag_path).translation(om.MSpace.kTransform).x
+            )
+            for dag_path in dag_paths
+        ],
+    )
+
+
+def connect_stretch(scale_factor, scale_attr, child_joints, rest_lengths, total):
+    # scale = distance / total, then one multiplier per joint: rest * scale
+    cmds.connectAttr(scale_attr, scale_factor + ".input1X")
+    cmds.setAttr(scale_factor + ".input2X", total)
+
+    translation_driver = scale_factor + ".outputX"
+
+    mult_nodes = [
+        cmds.shadingNode("multiplyDivide", asUtility=True, n=joint + "_scaleMultiply")
+        for joint in child_joints
+    ]
+
+    for joint, mult_node, rest_length in zip(child_joints, mult_nodes, rest_lengths):
+        cmds.setAttr(mult_node + ".input1X", rest_length)
+        cmds.connectAttr(translation_driver, mult_node + ".input2X")
+        cmds.connectAttr(mult_node + ".outputX", joint + ".translateX")
+
+    return mult_nodes
+
+
+def connect_packed_stretch(
+    scale_factor, scale_attr, child_joints, rest_lengths, total
+):
+    # translateX = distance / (total / rest), three joints per divide node. The
+    # scale factor node takes the first three; returns the extra nodes created.
+    mult_nodes = []
+    divide_node = scale_factor
+
+    for index, (joint, rest_length) in enumerate(zip(child_joints, rest_lengths)):
+        channel = "XYZ"[index % 3]
+        if index > 0 and channel == "X":
+            divide_node = cmds.shadingNode(
+                "multiplyDivide", asUtility=True, n=joint + "_scaleMultiply"
+            )
+            cmds.setAttr(divide_node + ".operation", 2)  # 2 is divide
+            mult_nodes.append(divide_node)
+
+        if rest_length == 0.0:
+            # Nothing to stretch; hold the joint at zero as rest * scale would
+            cmds.setAttr(divide_node + ".input1" + channel, 0.0)
+            cmds.setAttr(divide_node + ".input2" + channel, 1.0)
+        else:
+            cmds.connectAttr(scale_attr, divide_node + ".input1" + channel)
+            cmds.setAttr(divide_node + ".input2" + channel, total / rest_length)
+
+        cmds.connectAttr(divide_node + ".output" + channel, joint + ".translateX")
+
+    return mult_nodes
+
+
 def basic_stretchy_ik(
     root_joint,
     end_joint,
@@ -86,31 +599,14 @@ def basic_stretchy_ik(
     lock_minimum_length=True,
     pole_vector_object=None,
     scale_correction_attribute=None,
+    pack_channels=False,
 ):
-    from math import fabs
-
+    # pack_channels drives up to three joints from each multiplyDivide, the
+    # scale factor node included, instead of one _scaleMultiply per joint
     contained_nodes = []
 
-    total_original_length = 0.0
-    done = False
-    parent = root_joint
-    child_joints = []
-
-    while not done:
-        children = cmds.listRelatives(parent, children=True)
-        children = cmds.ls(children, type="joint")
-
-        if len(children) == 0:
-            done = True
-        else:
-            child = children[0]
-            child_joints.append(child)
-
-            total_original_length += fabs(cmds.getAttr(child + ".translateX"))
-            parent = child
-
-            if child == end_joint:
-                done = True
+    child_joints, rest_lengths = find_joint_chain(root_joint, end_joint)
+    total_original_length = sum(abs(length) for length in rest_lengths)
 
     # Create RP IK on joint chain
     ik_nodes = cmds.ikHandle(
@@ -208,21 +704,13 @@ def basic_stretchy_ik(
     contained_nodes.append(scale_factor)
 
     cmds.setAttr(scale_factor + ".operation", 2)  # 2 is divide
-    cmds.connectAttr(scale_attr, scale_factor + ".input1X")
-    cmds.setAttr(scale_factor + ".input2X", total_original_length)
-
-    translation_driver = scale_factor + ".outputX"
 
-    # Connect joints to stretchy calculations
-    for joint in child_joints:
-        mult_node = cmds.shadingNode(
-            "multiplyDivide", asUtility=True, n=joint + "_scaleMultiply"
+    connect = connect_packed_stretch if pack_channels else connect_stretch
+    contained_nodes.extend(
+        connect(
+            scale_factor, scale_attr, child_joints, rest_lengths, total_original_length
         )
-        contained_nodes.append(mult_node)
-
-        cmds.setAttr(mult_node + ".input1X", cmds.getAttr(joint + ".translateX"))
-        cmds.connectAttr(translation_driver, mult_node + ".input2X")
-        cmds.connectAttr(mult_node + ".outputX", joint + ".translateX")
+    )
 
     if container != None:
         add_node_to_container(container, contained_nodes, ihb=True)
@@ -239,44 +727,210 @@ def basic_stretchy_ik(
     return return_dict
 
 
-def force_scene_update():
+def find_container_nodes(container):
+    # All nodes in the container, including those of nested containers
+    nodes = []
+    containers = [container]
+
+    while containers:
+        members = cmds.container(containers.pop(), q=True, nodeList=True) or []
+        nodes.extend(members)
+        containers.extend(cmds.ls(members, type="container"))
+
+    return nodes
+
+
+def force_scene_update(container=None):
+    # Dirty and re-evaluate only the given container's (or list of containers')
+    # nodes, so the cost follows the size of the modules rather than the scene.
     cmds.setToolTo("moveSuperContext")
-    nodes = cmds.ls()
 
-    for node in nodes:
-        cmds.select(node, replace=True)
+    if container == None:
+        cmds.dgdirty(allPlugs=True)
+    else:
+        nodes = []
+        for container_name in flatten_node_list(container):
+            nodes.extend(find_container_nodes(container_name))
+        if nodes:
+            cmds.dgdirty(nodes)
+            cmds.dgeval(nodes)
 
     cmds.select(clear=True)
     cmds.setToolTo("selectSuperContext")
 
 
-def add_node_to_container(
-    container, nodes_in, ihb=False, includeShapes=False, force=False
-):
-    nodes = []
+def flatten_node_list(nodes_in):
+    if not isinstance(nodes_in, (list, tuple)):
+        return [nodes_in]
 
-    if isinstance(nodes_in, list):
-        nodes = list(nodes_in)
+    nodes = []
+    for item in nodes_in:
+        nodes.extend(flatten_node_list(item))
+
+    return nodes
+
+
+# While a container batch is open, additions are queued per
+# (container, ihb, includeShapes, force) and flushed in one command each.
+container_batch_depth = 0
+container_batch_additions = {}
+
+
+@contextmanager
+def container_batch():
+    global container_batch_depth
+
+    container_batch_depth += 1
+    try:
+        yield
+    finally:
+        container_batch_depth -= 1
+        if container_batch_depth == 0:
+            flush_container_batch()
+
+
+# Containers unlocked by the running editing session, relocked when the
+# outermost session exits
+editing_session_depth = 0
+editing_session_containers = []
+
+
+@contextmanager
+def editing_session(containers=None, chunk_name="blueprint_edit"):
+    # Re-entrant: nested sessions join the outermost one, so a container is
+    # unlocked once and every command lands in a single undo chunk. Relocks
+    # even when an error is raised; that error is the one that surfaces, a
+    # failed relock is only raised once every container had its try.
+    global editing_session_depth
+
+    if editing_session_depth == 0:
+        cmds.undoInfo(openChunk=True, chunkName=chunk_name)
+    editing_session_depth += 1
+
+    completed = False
+    try:
+        if isinstance(containers, str):
+            containers = [containers]
+        for container in containers or []:
+            if container not in editing_session_containers:
+                cmds.lockNode(container, lock=False, lockUnpublished=False)
+                editing_session_containers.append(container)
+
+        yield
+        completed = True
+    finally:
+        editing_session_depth -= 1
+        if editing_session_depth == 0:
+            containers = list(editing_session_containers)
+            del editing_session_containers[:]
+            relock_errors = []
+            try:
+                for container in containers:
+                    if not cmds.objExists(container):
+                        continue  # deleted during the session
+                    try:
+                        cmds.lockNode(container, lock=True, lockUnpublished=True)
+                    except Exception as error:
+                        relock_errors.append(error)
+            finally:
+                cmds.undoInfo(closeChunk=True)
+
+            if completed and relock_errors:
+                raise relock_errors[0]
+
+
+def rename_session_container(container, new_container=None):
+    # Tells the running session a container it unlocked was renamed, or
+    # deleted when new_container is None
+    if container not in editing_session_containers:
+        return
+
+    index = editing_session_containers.index(container)
+    if new_container == None:
+        del editing_session_containers[index]
     else:
-        nodes = [nodes_in]
-
-    conversion_nodes = []
-    for node in nodes:
-        node_conversion_nodes = cmds.listConnections(
-            node, source=True, destination=True
+        editing_session_containers[index] = new_container
+
+
+def flush_container_batch():
+    additions = list(container_batch_additions.items())
+    container_batch_additions.clear()
+
+    # unitConversion nodes are gathered for every queued node in one query
+    all_nodes = []
+    for key, nodes in additions:
+        all_nodes.extend(nodes)
+    conversion_nodes = find_conversion_nodes(all_nodes)
+
+    claimed = set()
+    for key, nodes in additions:
+        container, ihb, include_shapes, force = key
+
+        node_set = set(nodes)
+        for node in list(nodes):
+            for conversion_node in conversion_nodes.get(node, []):
+                if conversion_node not in claimed and conversion_node not in node_set:
+                    node_set.add(conversion_node)
+                    nodes.append(conversion_node)
+
+        nodes = [node for node in nodes if node not in claimed]
+        claimed.update(nodes)
+
+        if nodes:
+            cmds.container(
+                container,
+                edit=True,
+                addNode=nodes,
+                ihb=ihb,
+                includeShapes=include_shapes,
+                force=force,
+            )
+
+
+def find_conversion_nodes(nodes):
+    # Maps each node to the unitConversion nodes connected to it, using a single
+    # listConnections query for the whole list.
+    conversion_nodes = {}
+    if not nodes:
+        return conversion_nodes
+
+    connections = (
+        cmds.listConnections(
+            nodes,
+            source=True,
+            destination=True,
+            connections=True,
+            type="unitConversion",
         )
-        node_conversion_nodes = cmds.ls(node_conversion_nodes, type="unitConversion")
+        or []
+    )
 
-        conversion_nodes.extend(node_conversion_nodes)
+    for i in range(0, len(connections), 2):
+        node = connections[i].partition(".")[0]
+        conversion_nodes.setdefault(node, []).append(connections[i + 1])
 
-    nodes.extend(conversion_nodes)
+    return conversion_nodes
 
-    # Flatten the list to ensure it's not nested
-    nodes = [
-        item
-        for sublist in nodes
-        for item in (sublist if isinstance(sublist, list) else [sublist])
-    ]
+
+def add_node_to_container(
+    container, nodes_in, ihb=False, includeShapes=False, force=False
+):
+    nodes = list(dict.fromkeys(flatten_node_list(nodes_in)))
+
+    if container_batch_depth > 0:
+        key = (container, ihb, includeShapes, force)
+        queued = container_batch_additions.setdefault(key, [])
+        queued_set = set(queued)
+        queued.extend([node for node in nodes if node not in queued_set])
+        return
+
+    node_set = set(nodes)
+    conversion_nodes = find_conversion_nodes(nodes)
+    for node in list(nodes):
+        for conversion_node in conversion_nodes.get(node, []):
+            if conversion_node not in node_set:
+                node_set.add(conversion_node)
+                nodes.append(conversion_node)
 
     cmds.container(
         container,
@@ -287,14 +941,8 @@ def add_node_to_container(
         force=force,
     )
 
+
 def does_blueprint_user_specified_name_exist(name):
-    cmds.namespace(setNamespace=":")
-    namespaces = cmds.namespaceInfo(listOnlyNamespaces=True)
-    
-    names = []
-    for namespace in namespaces:
-        if namespace.find("__") != -1:
-            names.append(namespace.partition("__")[2])
-            
-    return name in names
-    
\ No newline at end of file
+    import System.module_index as module_index
+
+    return module_index.user_specified_name_exists(name)
@@ -0,0 +1,405 @@
+"""Checks blueprint modules in Maya ASCII scenes without Maya.
+
+Run from the Modules directory over any number of files or directories:
+
+    python -m System.validate_scenes characters/ --jobs 8 --report report.json
+
+Each .ma file is scanned for the nodes and connections this tool creates
+(Class__name:module_container, *_translation_control, hook_pointConstraint,
+HOOK_IN, SETTINGS) and every module namespace is checked for a missing
+container, half-locked state and broken or cyclic hooks. Files are spread
+over a process pool; the report lists every file with its modules and
+issues. Exits 1 if any file has an error.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import System.ma_parser as ma_parser
+
+SCENE_EXTENSION = ".ma"
+
+# Destination plugs of a point constraint's first target parent matrix, as
+# Maya writes them (short names) or as they may be written by hand
+HOOK_CONSTRAINT_PLUGS = ["tg[0].tpm", "target[0].targetParentMatrix"]
+
+BLUEPRINT_NODES = ["hook_pointConstraint", "unhookedTarget"]
+LOCKED_NODES = ["HOOK_IN", "SETTINGS"]
+
+WARNING_CODES = ["unknown_module_class"]
+
+
+def find_scene_files(paths):
+    scene_files = []
+    for path in paths:
+        if os.path.isfile(path):
+            scene_files.append(path)
+            continue
+
+        for directory, _, file_names in os.walk(path):
+            scene_files.extend(
+                os.path.join(directory, file_name)
+                for file_name in file_names
+                if file_name.endswith(SCENE_EXTENSION)
+            )
+
+    return sorted(scene_files)
+
+
+def find_blueprint_class_names():
+    # Class names from the module manifest, so no blueprint module is imported
+    import System.module_manifest as module_manifest
+
+    directory = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Blueprint")
+    if not os.path.isdir(directory):
+        return None
+
+    class_names = set()
+    for file_name in sorted(os.listdir(directory)):
+        module, extension = os.path.splitext(file_name)
+        if extension != ".py" or module == "__init__":
+            continue
+        metadata = module_manifest.find_module_metadata(directory, module)
+        if metadata != None:
+            class_names.add(metadata["class_name"])
+
+    return class_names
+
+
+def short_name(path):
+    return path.rpartition("|")[2]
+
+
+def scan_scene(path):
+    # Returns ({node name: node type}, [(source plug, destination plug)]).
+    # Statements other than createNode and connectAttr are scanned past.
+    nodes = {}
+    connections = []
+
+    statements = ma_parser.iter_statements(path, ["createNode", "connectAttr"])
+    for command, text, _, _ in statements:
+        if command == "createNode":
+            node_type, name, _, _ = ma_parser.parse_create_node(text)
+            if name != None:
+                nodes[name] = node_type
+        else:
+            plugs = ma_parser.parse_connect_attr(text)
+            if plugs != None:
+                connections.append(plugs)
+
+    return nodes, connections
+
+
+def split_module_node(node):
+    # Returns (module namespace, node name) for nodes in a Class__name
+    # namespace, else None. Nested namespaces (references) are kept whole.
+    namespace, _, name = short_name(node).rpartition(":")
+    namespace = namespace.lstrip(":")
+    if find_class_name(namespace) == "":
+        return None
+    return namespace, name
+
+
+def find_class_name(namespace):
+    # "" unless the innermost namespace is Class__name
+    class_name, separator, _ = namespace.rpartition(":")[2].partition("__")
+    if separator == "":
+        return ""
+    return class_name
+
+
+def issue(code, module, message):
+    return {
+        "code": code,
+        "severity": "warning" if code in WARNING_CODES else "error",
+        "module": module,
+        "message": message,
+    }
+
+
+def validate_modules(nodes, connections, class_names=None):
+    # Returns ({namespace: module summary}, [issues])
+    modules = {}
+    for node, node_type in nodes.items():
+        split = split_module_node(node)
+        if split == None:
+            continue
+        modules.setdefault(split[0], {})[split[1]] = node_type
+
+    if class_names != None:
+        # A Class__name namespace of a class no blueprint module defines is
+        # only taken for a module if it has a module container
+        for namespace in list(modules):
+            if find_class_name(namespace) not in class_names:
+                if "module_container" not in modules[namespace]:
+                    del modules[namespace]
+
+    hook_sources = {}
+    for source, destination in connections:
+        node, _, attr = destination.partition(".")
+        split = split_module_node(node)
+        if split == None or split[0] not in modules:
+            continue
+        if split[1] != "hook_pointConstraint":
+            continue
+        if attr in HOOK_CONSTRAINT_PLUGS:
+            hook_sources[split[0]] = short_name(source.partition(".")[0])
+
+    summaries = {}
+    issues = []
+    hook_parents = {}
+
+    for namespace in sorted(modules):
+        module_nodes = modules[namespace]
+        class_name = find_class_name(namespace)
+
+        is_blueprint = any(name in module_nodes for name in BLUEPRINT_NODES) or any(
+            name.endswith("_translation_control") for name in module_nodes
+        )
+        is_locked = any(name in module_nodes for name in LOCKED_NODES)
+
+        state = "empty"
+        if is_blueprint and is_locked:
+            state = "half_locked"
+        elif is_blueprint:
+            state = "blueprint"
+        elif is_locked:
+            state = "locked"
+
+        summary = {"class_name": class_name, "state": state, "hook": None}
+        summaries[namespace] = summary
+
+        if class_names != None and class_name not in class_names:
+            issues.append(
+                issue(
+                    "unknown_module_class",
+                    namespace,
+                    "no blueprint module defines " + class_name,
+                )
+            )
+
+        if module_nodes.get("module_container") != "container":
+            issues.append(
+                issue("missing_module_container", namespace, "no module_container")
+            )
+
+        if state == "half_locked":
+            issues.append(
+                issue(
+                    "half_locked",
+                    namespace,
+                    "has both blueprint controls and locked HOOK_IN/SETTINGS",
+                )
+            )
+        elif state == "empty":
+            issues.append(
+                issue("empty_module", namespace, "no blueprint or locked module nodes")
+            )
+        elif state == "locked":
+            for name in LOCKED_NODES:
+                if name not in module_nodes:
+                    issues.append(
+                        issue("incomplete_lock", namespace, "no " + name + " node")
+                    )
+
+        if state != "blueprint":
+            continue
+
+        if "hook_pointConstraint" not in module_nodes:
+            issues.append(
+                issue("missing_hook_constraint", namespace, "no hook_pointConstraint")
+            )
+            continue
+
+        hook_object = hook_sources.get(namespace)
+        summary["hook"] = hook_object
+        if hook_object == None:
+            issues.append(
+                issue(
+                    "unconnected_hook", namespace, "hook_pointConstraint has no target"
+                )
+            )
+            continue
+
+        if hook_object == namespace + ":unhookedTarget":
+            continue
+
+        split = split_module_node(hook_object)
+        if split != None and split[0] not in modules:
+            split = None
+        if split == None:
+            hook_exists = hook_object in nodes
+        else:
+            hook_exists = split[1] in modules.get(split[0], {})
+
+        if not hook_exists:
+            issues.append(
+                issue("broken_hook", namespace, "hooked to missing node " + hook_object)
+            )
+        elif split == None or not split[1].endswith("_translation_control"):
+            issues.append(
+                issue(
+                    "invalid_hook_target",
+                    namespace,
+                    "hooked to " + hook_object + ", not a module translation control",
+                )
+            )
+        else:
+            hook_parents[namespace] = split[0]
+
+    reported = set()
+    for start in sorted(hook_parents):
+        path = []
+        namespace = start
+        while namespace in hook_parents and namespace not in path:
+            path.append(namespace)
+            namespace = hook_parents[namespace]
+
+        if namespace in path:
+            cycle = path[path.index(namespace) :]
+            if not reported.intersection(cycle):
+                reported.update(cycle)
+                issues.append(
+                    issue(
+                        "hook_cycle",
+                        cycle[0],
+                        "hook cycle: " + " -> ".join(cycle + cycle[:1]),
+                    )
+                )
+
+    return summaries, issues
+
+
+def validate_scene(path, class_names=None):
+    start = time.perf_counter()
+    try:
+        nodes, connections = scan_scene(path)
+    except OSError as error:
+        modules = {}
+        issues = [issue("unreadable", None, str(error))]
+    else:
+        modules, issues = validate_modules(nodes, connections, class_names)
+
+    return {
+        "path": path,
+        "modules": modules,
+        "issues": issues,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+worker_state = {"class_names": None}
+
+
+def initialize_worker(class_names):
+    worker_state["class_names"] = class_names
+
+
+def validate_scene_in_worker(path):
+    return validate_scene(path, worker_state["class_names"])
+
+
+def validate_scenes(paths, jobs=None, class_names=None, chunk_size=16):
+    # Returns results in path order. jobs=1 validates in this process.
+    scene_files = find_scene_files(paths)
+    if jobs == 1 or len(scene_files) <= 1:
+        return [validate_scene(path, class_names) for path in scene_files]
+
+    with multiprocessing.Pool(
+        jobs, initializer=initialize_worker, initargs=(class_names,)
+    ) as pool:
+        results = list(
+            pool.imap_unordered(validate_scene_in_worker, scene_files, chunk_size)
+        )
+
+    results.sort(key=lambda result: result["path"])
+    return results
+
+
+def build_report(results, seconds):
+    issue_counts = {}
+    for result in results:
+        for scene_issue in result["issues"]:
+            code = scene_issue["code"]
+            issue_counts[code] = issue_counts.get(code, 0) + 1
+
+    files_with_errors = [
+        result
+        for result in results
+        if any(scene_issue["severity"] == "error" for scene_issue in result["issues"])
+    ]
+
+    return {
+        "files": len(results),
+        "files_with_errors": len(files_with_errors),
+        "modules": sum(len(result["modules"]) for result in results),
+        "issue_counts": issue_counts,
+        "seconds": seconds,
+        "results": results,
+    }
+
+
+def format_report(report):
+    lines = []
+    for result in report["results"]:
+        for scene_issue in result["issues"]:
+            lines.append(
+                "%s: %s %s [%s] %s"
+                % (
+                    result["path"],
+                    scene_issue["severity"],
+                    scene_issue["module"] or "-",
+                    scene_issue["code"],
+                    scene_issue["message"],
+                )
+            )
+
+    lines.append(
+        "%d files, %d modules, %d with errors, %.1fs"
+        % (
+            report["files"],
+            report["modules"],
+            report["files_with_errors"],
+            report["seconds"],
+        )
+    )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help=".ma files or directories")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--report", help="write the JSON report here")
+    parser.add_argument(
+        "--quiet", action="store_true", help="print only the summary line"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = validate_scenes(
+        args.paths, args.jobs, find_blueprint_class_names(), args.chunk_size
+    )
+    report = build_report(results, time.perf_counter() - start)
+
+    output = format_report(report)
+    if args.quiet:
+        output = output.splitlines()[-1]
+    print(output)
+
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+
+    if report["files_with_errors"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
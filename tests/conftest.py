@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+MODULES_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Modules"
+)
+if MODULES_DIRECTORY not in sys.path:
+    sys.path.insert(0, MODULES_DIRECTORY)
+
+
+@pytest.fixture(autouse=True)
+def user_cache_directory(tmp_path_factory, monkeypatch):
+    # Caches the tool writes (see System.user_cache) stay out of the home
+    # directory
+    cache = tmp_path_factory.mktemp("user_cache")
+    monkeypatch.setenv("RIGGING_TOOL_CACHE", str(cache))
+    return cache
+
+
+@pytest.fixture
+def cmds():
+    # A fresh headless scene (see System.headless_cmds)
+    import System.headless_cmds as headless_cmds
+
+    headless_cmds.install()
+
+    import System.module_index as module_index
+    import System.utils as utils
+
+    headless_cmds.file(new=True, force=True)
+    module_index.invalidate_module_index()
+    utils.control_object_templates.clear()
+    return headless_cmds
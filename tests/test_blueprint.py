@@ -0,0 +1,150 @@
+import math
+
+import pytest
+
+
+def install_chain(cmds, count):
+    # Modules hooked end to root, each root pulled away from its hook
+    import System.bulk_install as bulk_install
+
+    specs = []
+    for index in range(count):
+        hook_object = None
+        if index > 0:
+            hook_object = "Single_Joint_Segment__m%d:end_joint_translation_control" % (
+                index - 1
+            )
+        specs.append(
+            {
+                "module": "single_joint_segment",
+                "user_specified_name": "m%d" % index,
+                "hook_object": hook_object,
+                "joint_positions": [[index * 5, 1, 0], [index * 5 + 3, 2, 0]],
+            }
+        )
+    return bulk_install.install_modules(specs)
+
+
+def test_snap_modules_roots_to_hooks(cmds, monkeypatch):
+    import System.blueprint as blueprint
+    import System.utils as utils
+
+    modules = install_chain(cmds, 4)
+
+    queries = []
+    get_world_positions = utils.get_world_positions
+
+    def counting_get_world_positions(nodes):
+        queries.append(list(nodes))
+        return get_world_positions(nodes)
+
+    monkeypatch.setattr(utils, "get_world_positions", counting_get_world_positions)
+    blueprint.snap_modules_roots_to_hooks(modules)
+
+    assert len(queries) == 1
+    for index in range(1, 4):
+        root = "Single_Joint_Segment__m%d:root_joint_translation_control" % index
+        hook = "Single_Joint_Segment__m%d:end_joint_translation_control" % (index - 1)
+        assert cmds.xform(root, q=True, ws=True, t=True) == pytest.approx(
+            cmds.xform(hook, q=True, ws=True, t=True)
+        )
+
+    # An unhooked module stays where it is
+    root = "Single_Joint_Segment__m0:root_joint_translation_control"
+    assert cmds.xform(root, q=True, ws=True, t=True) == pytest.approx([0, 1, 0])
+
+
+def test_solve_lock_orientations(cmds, monkeypatch):
+    # Inputs from several modules are solved in one call; modules that return
+    # orientation values keep them
+    import System.blueprint as blueprint
+    import System.transform_math as transform_math
+
+    calls = []
+    solve = transform_math.solve_joint_orientations
+
+    def counting_solve(*args):
+        calls.append(len(args[0]))
+        return solve(*args)
+
+    monkeypatch.setattr(transform_math, "solve_joint_orientations", counting_solve)
+
+    parent = transform_math.identity()
+    inputs = [
+        blueprint.OrientationInputs([[1, 0, 0]], [[0, 1, 0]], [90.0], [parent]),
+        blueprint.OrientationInputs(
+            [[0, 1, 0], [0, 0, 1]], [[-1, 0, 0], [0, 1, 0]], [0.0, 0.0], [parent] * 2
+        ),
+    ]
+    module_infos = [
+        ([[0, 0, 0]], (inputs[0], None), [0], None, None, False),
+        ([[0, 0, 0]], ([[1.0, 2.0, 3.0]], None), [0], None, None, False),
+        ([[0, 0, 0], [1, 0, 0]], (inputs[1], None), [0, 0], None, None, False),
+    ]
+
+    records = blueprint.solve_lock_orientations(module_infos)
+    assert calls == [3]
+    assert [type(record) for record in records] == [blueprint.LockRecord] * 3
+    assert list(records[0].joint_orientations[0]) == pytest.approx([90, 0, 0])
+    assert list(records[1].joint_orientations[0]) == [1.0, 2.0, 3.0]
+    assert list(records[2].joint_orientations[0]) == pytest.approx(
+        [0, 0, 90, 0, -90, 0]
+    )
+
+
+def test_make_lock_record(cmds):
+    # The lock_phase_1 6-tuple, field for field, with vectors flattened
+    import System.blueprint as blueprint
+
+    record = blueprint.make_lock_record(
+        (
+            [[0, 0, 0], [1, 2, 3]],
+            ([[10, 20, 30], [40, 50, 60]], None),
+            [1, 3.0],
+            [[0, 0, -50], [0, 0, 0]],
+            "hook_grp",
+            True,
+        )
+    )
+
+    assert record.joint_positions.typecode == "d"
+    assert list(record.joint_positions) == [0, 0, 0, 1, 2, 3]
+    assert record.joint_count == 2
+    assert record.joint_position(1) == [1, 2, 3]
+    assert list(record.joint_orientations[0]) == [10, 20, 30, 40, 50, 60]
+    assert record.joint_orientations[1] == None
+    assert record.joint_rotation_orders.typecode == "i"
+    assert list(record.joint_rotation_orders) == [1, 3]
+    assert list(record.joint_preferred_angles) == [0, 0, -50, 0, 0, 0]
+    assert record[4:] == ("hook_grp", True)
+    assert blueprint.make_lock_record(record) is record
+
+    # Axis info, solver inputs and missing preferred angles are kept as they are
+    axis_info = [[1, 0, 0], [0, 1, 0]]
+    inputs = blueprint.OrientationInputs([], [], [], [])
+    for joint_orientations in [(None, axis_info), (inputs, None)]:
+        record = blueprint.make_lock_record(
+            ([[0, 0, 0]], joint_orientations, [0], None, None, False)
+        )
+        assert record.joint_orientations == joint_orientations
+        assert record.joint_preferred_angles == None
+
+
+def test_lock_phase_1_record(cmds):
+    import System.blueprint as blueprint
+
+    module = install_chain(cmds, 2)[1]
+    cmds.setAttr("Single_Joint_Segment__m1:root_joint.rotateOrder", 2)
+
+    record = blueprint.solve_lock_orientations([module.lock_phase_1()])[0]
+    assert record.joint_count == 2
+    assert record.joint_position(0) == pytest.approx([5, 1, 0])
+    assert record.joint_position(1) == pytest.approx([8, 2, 0])
+    # Only the root joint is oriented, aimed up the 3 x 1 slope to the end
+    assert list(record.joint_orientations[0]) == pytest.approx(
+        [0, 0, math.degrees(math.atan2(1, 3))]
+    )
+    assert list(record.joint_rotation_orders) == [2]
+    assert record.hook_object == (
+        "Single_Joint_Segment__m0:end_joint_translation_control"
+    )
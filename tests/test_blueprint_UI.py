@@ -0,0 +1,176 @@
+def select_module(cmds, namespace):
+    cmds.select(namespace + ":root_joint_translation_control")
+    cmds.emit_event("SelectionChanged")
+    cmds.process_idle_events()
+
+
+def install(name):
+    import System.bulk_install as bulk_install
+
+    return bulk_install.install_modules(
+        [{"module": "single_joint_segment", "user_specified_name": name}]
+    )[0]
+
+
+def open_ui(cmds):
+    import System.blueprint_UI as blueprint_UI
+
+    ui = blueprint_UI.Blueprint_UI()
+    cmds.process_idle_events()
+    return ui
+
+
+def test_panels_are_reused(cmds):
+    ui = open_ui(cmds)
+    install("a")
+    install("b")
+
+    select_module(cmds, "Single_Joint_Segment__a")
+    panel, module_instance, _ = ui.module_panels["Single_Joint_Segment__a"]
+    select_module(cmds, "Single_Joint_Segment__b")
+    select_module(cmds, "Single_Joint_Segment__a")
+
+    assert ui.module_panels["Single_Joint_Segment__a"][0] == panel
+    assert ui.module_instance is module_instance
+
+
+def test_panels_of_modules_deleted_outside_the_ui_are_dropped(cmds):
+    ui = open_ui(cmds)
+    module = install("a")
+    install("b")
+    install("c")
+
+    select_module(cmds, "Single_Joint_Segment__a")
+    panel = ui.module_panels["Single_Joint_Segment__a"][0]
+    select_module(cmds, "Single_Joint_Segment__b")
+
+    # Deleted by a script
+    module.delete()
+    select_module(cmds, "Single_Joint_Segment__c")
+    assert list(ui.module_panels) == [
+        "Single_Joint_Segment__b",
+        "Single_Joint_Segment__c",
+    ]
+    assert not cmds.columnLayout(panel, exists=True)
+
+
+def test_panels_of_reinstalled_modules_are_rebuilt(cmds):
+    ui = open_ui(cmds)
+    module = install("a")
+    install("b")
+
+    select_module(cmds, "Single_Joint_Segment__a")
+    panel, module_instance, _ = ui.module_panels["Single_Joint_Segment__a"]
+    select_module(cmds, "Single_Joint_Segment__b")
+
+    # Same namespace, but not the module the panel was built for
+    module.delete()
+    install("a")
+    select_module(cmds, "Single_Joint_Segment__a")
+
+    assert ui.module_panels["Single_Joint_Segment__a"][0] != panel
+    assert ui.module_instance is not module_instance
+    assert not cmds.columnLayout(panel, exists=True)
+
+
+def count_method_calls(monkeypatch, instance, name):
+    calls = []
+    method = getattr(instance, name)
+
+    def counting(*args):
+        calls.append(args)
+        return method(*args)
+
+    monkeypatch.setattr(instance, name, counting)
+    return calls
+
+
+def test_selection_bursts_are_one_update(cmds, monkeypatch):
+    ui = open_ui(cmds)
+    install("a")
+    updates = count_method_calls(monkeypatch, ui, "modify_selected")
+    rebuilds = count_method_calls(monkeypatch, ui, "create_specific_controls")
+
+    # A marquee drag fires SelectionChanged for every change
+    for node in ["root_joint_translation_control", "end_joint_translation_control"]:
+        cmds.select("Single_Joint_Segment__a:" + node)
+        cmds.emit_event("SelectionChanged")
+        cmds.emit_event("SelectionChanged")
+    assert updates == []
+
+    cmds.process_idle_events()
+    assert len(updates) == 1
+    assert len(rebuilds) == 1
+    assert ui.selected_module_namespace == "Single_Joint_Segment__a"
+    assert cmds.textField(ui.UI_elements["module_name"], q=True, text=True) == "a"
+
+    # Another node of the same module leaves the controls alone
+    select_module(cmds, "Single_Joint_Segment__a")
+    assert len(updates) == 2
+    assert len(rebuilds) == 1
+
+    cmds.select(clear=True)
+    cmds.emit_event("SelectionChanged")
+    cmds.process_idle_events()
+    assert len(rebuilds) == 2
+    assert ui.selected_module_namespace == None
+    assert not cmds.button(ui.UI_elements["delete_module_btn"], q=True, enable=True)
+
+
+def module_infos(count):
+    return [
+        {
+            "file": "module_%d" % index,
+            "title": "Module %d" % index,
+            "description": "Arm segment" if index % 10 == 3 else "Leg segment",
+            "icon": "/icons/module_%d.xpm" % index,
+        }
+        for index in range(count)
+    ]
+
+
+def test_module_list_is_built_a_page_at_a_time(cmds, monkeypatch):
+    import System.blueprint_UI as blueprint_UI
+    import System.utils as utils
+
+    monkeypatch.setattr(utils, "find_all_module_info", lambda path: module_infos(45))
+    ui = open_ui(cmds)
+
+    def shown_rows():
+        return (
+            cmds.columnLayout(
+                ui.UI_elements["module_rows_column"], q=True, childArray=True
+            )
+            or []
+        )
+
+    def more_shown():
+        return cmds.button(ui.UI_elements["more_modules_btn"], q=True, manage=True)
+
+    # Icons are set once the first page is up, later rows have none yet
+    assert len(shown_rows()) == blueprint_UI.MODULE_LIST_PAGE_SIZE
+    assert more_shown()
+    button = ui.UI_elements["module_button_module_19"]
+    assert cmds.symbolButton(button, q=True, image=True) == "/icons/module_19.xpm"
+    assert "module_button_module_20" not in ui.UI_elements
+
+    ui.show_more_modules()
+    ui.show_more_modules()
+    assert len(shown_rows()) == 45
+    assert not more_shown()
+    assert ui.pending_icons != []
+    cmds.process_idle_events()
+    assert ui.pending_icons == []
+
+    # Every term has to match the file, title or description
+    cmds.textField(ui.UI_elements["module_filter"], edit=True, text="arm 3")
+    ui.filter_module_list()
+    assert [info["file"] for info in ui.module_matches] == [
+        "module_3",
+        "module_13",
+        "module_23",
+        "module_33",
+        "module_43",
+    ]
+    assert len(shown_rows()) == 5
+    assert not more_shown()
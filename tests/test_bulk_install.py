@@ -0,0 +1,93 @@
+import pytest
+
+
+def spec(name, hook_module=None, **extra):
+    hook_object = None
+    if hook_module != None:
+        hook_object = "Single_Joint_Segment__%s:end_joint_translation_control" % (
+            hook_module
+        )
+    result = {
+        "module": "single_joint_segment",
+        "user_specified_name": name,
+        "hook_object": hook_object,
+    }
+    result.update(extra)
+    return result
+
+
+def ordered_names(specs):
+    import System.bulk_install as bulk_install
+
+    return [name for _, _, name in bulk_install.order_module_specs(specs)]
+
+
+def test_order_follows_hooks(cmds):
+    specs = [
+        spec("hand", "forearm"),
+        spec("forearm", "upperarm"),
+        spec("spine"),
+        spec("upperarm", "spine"),
+        spec("head", "spine"),
+    ]
+    assert ordered_names(specs) == ["spine", "upperarm", "forearm", "hand", "head"]
+
+
+def test_hook_cycle(cmds):
+    with pytest.raises(ValueError, match="Hook cycle"):
+        ordered_names([spec("a", "b"), spec("b", "c"), spec("c", "a")])
+
+    # A module hooked to itself is not a cycle
+    assert ordered_names([spec("a", "a")]) == ["a"]
+
+
+def test_name_clashes(cmds):
+    import System.bulk_install as bulk_install
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        ordered_names([spec("arm"), spec("arm")])
+
+    bulk_install.install_modules([spec("arm")])
+    with pytest.raises(ValueError, match="already exists"):
+        ordered_names([spec("arm")])
+
+
+def test_allocated_names_skip_given_names(cmds):
+    specs = [spec(None), spec("instance_1"), spec(None)]
+    assert ordered_names(specs) == ["instance_2", "instance_1", "instance_3"]
+
+
+def test_joint_positions_count(cmds):
+    with pytest.raises(ValueError, match="takes 2 joint positions, got 1"):
+        ordered_names([spec("arm", joint_positions=[[0, 0, 0]])])
+
+
+def test_bad_batch_leaves_scene_untouched(cmds):
+    import System.bulk_install as bulk_install
+
+    nodes = set(cmds.ls())
+    with pytest.raises(ValueError):
+        bulk_install.install_modules([spec("a"), spec("b", "a"), spec("a")])
+    assert set(cmds.ls()) == nodes
+
+
+def test_install_modules(cmds):
+    import System.bulk_install as bulk_install
+
+    modules = bulk_install.install_modules(
+        [
+            spec("arm", "spine", joint_positions=[[0, 4, 0], [3, 4, 0]]),
+            spec("spine", joint_positions=[[0, 0, 0], [0, 4, 0]]),
+        ]
+    )
+    assert [module.user_specified_name for module in modules] == ["spine", "arm"]
+    for module in modules:
+        assert cmds.lockNode(module.container_name, query=True, lock=True) == [True]
+
+    arm_root = cmds.xform(
+        "Single_Joint_Segment__arm:root_joint",
+        query=True,
+        worldSpace=True,
+        translation=True,
+    )
+    assert arm_root == pytest.approx([0, 4, 0])
@@ -0,0 +1,61 @@
+import pytest
+
+
+def make_containers(cmds, count):
+    containers = []
+    for index in range(count):
+        container = cmds.container(name="c%d" % index)
+        cmds.lockNode(container, lock=True, lockUnpublished=True)
+        containers.append(container)
+    return containers
+
+
+def is_locked(cmds, container):
+    return cmds.lockNode(container, query=True, lock=True) == [True]
+
+
+def test_relocks_after_error(cmds):
+    import System.utils as utils
+
+    containers = make_containers(cmds, 3)
+
+    with pytest.raises(KeyError):
+        with utils.editing_session(containers):
+            assert not is_locked(cmds, containers[1])
+            cmds.delete(containers[1])
+            raise KeyError("original")
+
+    assert is_locked(cmds, containers[0])
+    assert is_locked(cmds, containers[2])
+    assert cmds.scene.undo_chunks == 0
+    assert utils.editing_session_depth == 0
+    assert utils.editing_session_containers == []
+
+
+def test_failed_relock_does_not_stop_the_others(cmds, monkeypatch):
+    import System.utils as utils
+
+    containers = make_containers(cmds, 3)
+    lock_node = cmds.lockNode
+
+    def failing_lock_node(node, **kwargs):
+        if node == containers[0] and kwargs.get("lock"):
+            raise RuntimeError("relock failed")
+        return lock_node(node, **kwargs)
+
+    monkeypatch.setattr(cmds, "lockNode", failing_lock_node)
+
+    # The session's own error surfaces over the failed relock
+    with pytest.raises(KeyError):
+        with utils.editing_session(containers):
+            raise KeyError("original")
+    assert is_locked(cmds, containers[1])
+    assert is_locked(cmds, containers[2])
+
+    # Without one, the failed relock is raised after the others are locked
+    with pytest.raises(RuntimeError, match="relock failed"):
+        with utils.editing_session(containers):
+            pass
+    assert is_locked(cmds, containers[1])
+    assert is_locked(cmds, containers[2])
+    assert utils.editing_session_depth == 0
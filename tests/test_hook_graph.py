@@ -0,0 +1,118 @@
+import pytest
+
+
+def install(specs):
+    import System.bulk_install as bulk_install
+
+    modules = bulk_install.install_modules(
+        [
+            {
+                "module": "single_joint_segment",
+                "user_specified_name": name,
+                "hook_object": hook_control(hook_module),
+            }
+            for name, hook_module in specs
+        ]
+    )
+    return dict((module.user_specified_name, module) for module in modules)
+
+
+def hook_control(name):
+    if name == None:
+        return None
+    return "Single_Joint_Segment__%s:end_joint_translation_control" % name
+
+
+def namespaces(*names):
+    return ["Single_Joint_Segment__" + name for name in names]
+
+
+def count_hook_queries(monkeypatch):
+    import System.hook_graph as hook_graph
+
+    queries = []
+    query_hook_object = hook_graph.query_hook_object
+
+    def counting_query_hook_object(namespace):
+        queries.append(namespace)
+        return query_hook_object(namespace)
+
+    monkeypatch.setattr(hook_graph, "query_hook_object", counting_query_hook_object)
+    return queries
+
+
+def test_hook_order(cmds):
+    import System.hook_graph as hook_graph
+
+    # Installed children first, so the order has to come from the hooks
+    modules = install([("hand", None), ("finger", "hand")])
+    modules.update(install([("spine", None), ("arm", "spine"), ("head", "spine")]))
+    modules["hand"].rehook(hook_control("arm"))
+    install([("loose", None)])
+
+    ordered = hook_graph.hook_order()
+    parents = hook_graph.get_hook_graph()
+    assert sorted(ordered) == sorted(parents)
+    for namespace in ordered:
+        if parents[namespace] != None:
+            assert ordered.index(parents[namespace]) < ordered.index(namespace)
+
+    # Only the given modules, each after its hook module if that is given too
+    assert hook_graph.hook_order(namespaces("finger", "head", "arm", "hand")) == (
+        namespaces("arm", "hand", "finger", "head")
+    )
+    assert hook_graph.find_hook_cycle() == None
+    assert sorted(hook_graph.find_hooked_modules(namespaces("spine")[0])) == (
+        namespaces("arm", "head")
+    )
+
+
+def test_hook_cycle(cmds):
+    import System.hook_graph as hook_graph
+
+    modules = install([("a", None), ("b", "a"), ("c", "b"), ("d", "c")])
+    modules["a"].rehook(hook_control("c"))
+
+    cycle = hook_graph.find_hook_cycle()
+    assert sorted(cycle) == namespaces("a", "b", "c")
+    with pytest.raises(ValueError, match="Hook cycle"):
+        hook_graph.hook_order()
+
+    # A module hooked to itself is unhooked, not a cycle
+    modules["a"].rehook(hook_control("a"))
+    assert hook_graph.find_hook_cycle() == None
+    assert hook_graph.hook_order() == namespaces("a", "b", "c", "d")
+
+
+def test_graph_is_updated_in_place(cmds, monkeypatch):
+    import System.hook_graph as hook_graph
+    import System.module_index as module_index
+
+    modules = install([("a", None), ("b", "a")])
+    hook_graph.get_hook_graph()
+    generation = module_index.index_state["generation"]
+    queries = count_hook_queries(monkeypatch)
+
+    modules.update(install([("c", "b")]))
+    modules["b"].rename_module_instance("renamed")
+    assert hook_graph.get_hook_graph() == {
+        "Single_Joint_Segment__a": None,
+        "Single_Joint_Segment__renamed": "Single_Joint_Segment__a",
+        "Single_Joint_Segment__c": "Single_Joint_Segment__renamed",
+    }
+    assert hook_graph.find_hook_object("Single_Joint_Segment__c") == hook_control(
+        "renamed"
+    )
+
+    modules["a"].delete()
+    assert hook_graph.get_hook_graph()["Single_Joint_Segment__renamed"] == None
+    assert queries == []
+    assert module_index.index_state["generation"] == generation
+
+    # Undo changes hooks behind the graph's back, so it is queried again
+    cmds.emit_event("Undo")
+    assert hook_graph.get_hook_graph() == {
+        "Single_Joint_Segment__renamed": None,
+        "Single_Joint_Segment__c": "Single_Joint_Segment__renamed",
+    }
+    assert sorted(queries) == namespaces("c", "renamed")
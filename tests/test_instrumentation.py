@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def instrumentation():
+    import System.instrumentation as instrumentation
+
+    instrumentation.reset()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_calls_are_attributed_to_the_outer_operation(cmds, instrumentation, tmp_path):
+    import System.blueprint as blueprint
+    import System.utils as utils
+
+    module_class = utils.find_module_class("/Modules/Blueprint", "single_joint_segment")
+    module = module_class("a", None)
+    install = module_class.install
+
+    instrumentation.enable(trace=True)
+    assert utils.cmds is not cmds and blueprint.cmds is not cmds
+    module.install()
+    cmds.group(empty=True, name="outside")
+    utils.cmds.ls(type="joint")
+    instrumentation.disable()
+
+    # Nested Blueprint methods are counted under install, not as operations
+    operations = set(operation for operation, name in instrumentation.method_stats)
+    assert operations == set(["install"])
+    assert instrumentation.method_stats[("install", "install")][0] == 1
+    assert instrumentation.command_stats[("other", "ls")][0] == 1
+    install_calls = sum(
+        entry[0]
+        for (operation, name), entry in instrumentation.command_stats.items()
+        if operation == "install"
+    )
+    assert install_calls == instrumentation.total_calls() - 1
+    assert instrumentation.summary()[0][3] >= instrumentation.summary()[-1][3]
+    assert "install" in instrumentation.format_table(limit=5)
+
+    # Calls straight through maya.cmds aren't seen, and disable() restores
+    # the originals
+    assert ("other", "group") not in instrumentation.command_stats
+    assert utils.cmds is cmds and blueprint.cmds is cmds
+    assert module_class.install is install
+
+    trace_path = str(tmp_path / "trace.json")
+    instrumentation.write_chrome_trace(trace_path)
+    with open(trace_path) as trace_file:
+        events = json.load(trace_file)["traceEvents"]
+    assert len(events) == install_calls + 1 + sum(
+        entry[0] for entry in instrumentation.method_stats.values()
+    )
+    assert set(event["args"]["operation"] for event in events) == set(
+        ["install", "other"]
+    )
+
+
+def test_nothing_is_recorded_when_disabled(cmds, instrumentation):
+    import System.utils as utils
+
+    module_class = utils.find_module_class("/Modules/Blueprint", "single_joint_segment")
+    module_class("a", None).install()
+
+    assert instrumentation.command_stats == {}
+    assert instrumentation.method_stats == {}
+    assert instrumentation.total_calls() == 0
@@ -0,0 +1,225 @@
+import random
+
+import pytest
+
+
+def install_modules(cmds, count, seed=5):
+    import System.utils as utils
+
+    module_class = utils.find_module_class("/Modules/Blueprint", "single_joint_segment")
+    rng = random.Random(seed)
+    for index in range(count):
+        module = module_class("m%d" % index, None)
+        for joint in module.joint_info:
+            joint[1] = [rng.uniform(-5, 5) for _ in range(3)]
+        module.install()
+        cmds.setAttr(
+            module.get_orientation_control(module.module_namespace + ":root_joint")
+            + ".rotateX",
+            rng.uniform(-180, 180),
+        )
+
+
+def lock_joint_orients(cmds, monkeypatch, batched):
+    import System.blueprint as blueprint
+    import System.blueprint_UI as blueprint_UI
+    import System.transform_math as transform_math
+
+    solve = transform_math.solve_joint_orientations
+    solved_counts = []
+
+    def counting_solve(*args):
+        solved_counts.append(len(args[0]))
+        return solve(*args)
+
+    monkeypatch.setattr(transform_math, "solve_joint_orientations", counting_solve)
+    if not batched:
+        # One solve per module
+        solve_lock_orientations = blueprint.solve_lock_orientations
+        monkeypatch.setattr(
+            blueprint,
+            "solve_lock_orientations",
+            lambda module_infos: [
+                solve_lock_orientations([module_info])[0]
+                for module_info in module_infos
+            ],
+        )
+
+    blueprint_UI.lock_blueprint_modules()
+    orients = dict(
+        (joint, cmds.getAttr(joint + ".jointOrient")[0])
+        for joint in cmds.ls(type="joint")
+    )
+    return solved_counts, orients
+
+
+def test_lock_solves_all_orientations_in_one_call(cmds, monkeypatch):
+    install_modules(cmds, 6)
+    batched_counts, batched = lock_joint_orients(cmds, monkeypatch, True)
+
+    cmds.file(new=True, force=True)
+    monkeypatch.undo()
+    install_modules(cmds, 6)
+    counts, expected = lock_joint_orients(cmds, monkeypatch, False)
+
+    assert batched_counts == [6]
+    assert counts == [1] * 6
+    assert sorted(batched) == sorted(expected)
+    for joint, orient in expected.items():
+        assert batched[joint] == pytest.approx(orient)
+
+
+def test_solver_matches_the_legacy_orientation(cmds):
+    # The scene-mutating orientation_control_joint_get_orientation that the
+    # solver replaced, run on the same modules
+    import System.utils as utils
+
+    install_modules(cmds, 6, seed=11)
+    module_class = utils.find_module_class("/Modules/Blueprint", "single_joint_segment")
+
+    for index in range(6):
+        module = module_class("m%d" % index, None)
+        joints = module.get_joints()
+        clean_parent = module.module_namespace + ":joints_grp"
+
+        solved = module.orientation_control_joint_get_orientations(
+            [(joints[0], joints[1])], clean_parent
+        )[0]
+        legacy, temp_joint = module.orientation_control_joint_get_orientation(
+            joints[0], clean_parent
+        )
+        cmds.delete(temp_joint)
+
+        assert solved == pytest.approx(list(legacy), abs=1e-6)
+
+
+def test_lock_removes_control_object_templates(cmds):
+    import System.blueprint_UI as blueprint_UI
+    import System.utils as utils
+
+    install_modules(cmds, 2)
+    assert cmds.namespace(exists=utils.CONTROL_OBJECT_TEMPLATE_NAMESPACE)
+
+    blueprint_UI.lock_blueprint_modules()
+    assert not cmds.namespace(exists=utils.CONTROL_OBJECT_TEMPLATE_NAMESPACE)
+
+
+def test_control_objects_get_their_own_materials(cmds):
+    install_modules(cmds, 2)
+
+    materials = []
+    for namespace in ["Single_Joint_Segment__m0", "Single_Joint_Segment__m1"]:
+        container = namespace + ":root_joint_translation_control_container"
+        shading_engine = namespace + ":root_joint_m_translation_control_SG"
+        material = namespace + ":root_joint_m_translation_control"
+
+        nodes = cmds.container(container, q=True, nodeList=True)
+        assert shading_engine in nodes and material in nodes
+        assert cmds.sets(shading_engine, q=True) == [
+            namespace + ":root_joint_translation_controlShape"
+        ]
+        assert cmds.listConnections(shading_engine + ".surfaceShader") == [material]
+        materials.append(material)
+
+    assert materials[0] != materials[1]
+
+
+def evaluate(cmds, plug):
+    # Enough of Maya's evaluation for the creation pose networks: follows
+    # connections through plusMinusAverage (sum) and multiplyDivide (multiply)
+    node, _, attr = plug.partition(".")
+    connections = (
+        cmds.listConnections(
+            node, source=True, destination=False, connections=True, plugs=True
+        )
+        or []
+    )
+    sources = dict(zip(connections[0::2], connections[1::2]))
+    if plug in sources:
+        return evaluate(cmds, sources[plug])
+
+    if cmds.ls(node, type="plusMinusAverage") and attr.startswith("output"):
+        inputs = "input1D[" if attr == "output1D" else "input3D["
+        values = [
+            evaluate(cmds, source_plug)
+            for destination, source_plug in sorted(sources.items())
+            if destination.startswith(node + "." + inputs)
+        ]
+        if attr == "output1D":
+            return sum(values)
+        return [sum(value[axis] for value in values) for axis in range(3)]
+
+    if cmds.ls(node, type="multiplyDivide") and attr.startswith("output"):
+        if attr == "output":
+            return [evaluate(cmds, node + ".output" + axis) for axis in "XYZ"]
+        axis = attr[-1]
+        return evaluate(cmds, node + ".input1" + axis) * evaluate(
+            cmds, node + ".input2" + axis
+        )
+
+    value = cmds.getAttr(plug)
+    if isinstance(value, list):
+        return list(value[0])
+    return value
+
+
+def locked_joint_values(cmds, compact_creation_pose, weight=1):
+    import System.blueprint_UI as blueprint_UI
+
+    install_modules(cmds, 4, seed=3)
+    blueprint_UI.lock_blueprint_modules(compact_creation_pose)
+
+    values = {}
+    for joint in cmds.ls(type="joint"):
+        if ":blueprint_" not in joint:
+            continue
+        namespace = joint.partition(":")[0]
+        cmds.setAttr(namespace + ":SETTINGS.creationPoseWeight", weight)
+        values[joint] = [
+            evaluate(cmds, joint + "." + attr)
+            for attr in ["translate", "translateX", "rotate", "jointOrient"]
+        ] + [cmds.getAttr(joint + ".rotateOrder")]
+
+    utility_nodes = cmds.ls(type="plusMinusAverage") + cmds.ls(type="multiplyDivide")
+    return values, len(utility_nodes)
+
+
+@pytest.mark.parametrize("weight", [1, 0.25])
+def test_compact_creation_pose_gives_the_same_joints(cmds, weight):
+    compact, compact_node_count = locked_joint_values(cmds, True, weight)
+    cmds.file(new=True, force=True)
+    expected, node_count = locked_joint_values(cmds, False, weight)
+
+    assert compact_node_count < node_count
+    assert len(expected) == 8
+    # translateX is the rest length scaled by the creation pose weight
+    end_joint = expected["Single_Joint_Segment__m0:blueprint_end_joint"]
+    assert end_joint[1] == pytest.approx(weight * end_joint[0][0])
+    assert end_joint[1] != 0
+    assert sorted(compact) == sorted(expected)
+    for joint, joint_values in expected.items():
+        for value, expected_value in zip(compact[joint], joint_values):
+            assert value == pytest.approx(expected_value)
+
+
+def test_compact_creation_pose_packs_translations(cmds):
+    # Three rest translateX values to a multiplyDivide
+    import System.utils as utils
+
+    module_class = utils.find_module_class("/Modules/Blueprint", "single_joint_segment")
+    module = module_class("a", None)
+
+    cmds.select(clear=True)
+    joints = [cmds.joint(name="j%d" % index, p=(index, 0, 0)) for index in range(5)]
+    setting_locator = cmds.spaceLocator(name="SETTINGS")[0]
+    cmds.addAttr(setting_locator, at="float", ln="creationPoseWeight", defaultValue=1)
+    local_tx = [0.0, 1.5, 2.5, 3.5, 4.5]
+
+    utility_nodes = module.create_compact_creation_pose_network(
+        joints, local_tx, setting_locator
+    )
+    assert len(cmds.ls(utility_nodes, type="multiplyDivide")) == 2
+    assert len(cmds.ls(utility_nodes, type="plusMinusAverage")) == 5
+    for joint, tx in zip(joints[1:], local_tx[1:]):
+        assert evaluate(cmds, joint + ".translateX") == tx
+    assert evaluate(cmds, "j0.rotate") == [0, 0, 0]
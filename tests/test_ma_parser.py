@@ -0,0 +1,183 @@
+import os
+
+import System.ma_parser as ma_parser
+
+SCENE = r"""//Maya ASCII 2022 scene
+//Name: sample.ma
+requires maya "2022";
+createNode transform -n "ctrl";
+	setAttr ".t" -type "double3" 1 2 3 ;
+	setAttr -l on ".v";
+createNode nurbsSurface -n "ctrlShape" -p "ctrl";
+	setAttr -k off ".v";
+	setAttr ".cc" -type "nurbsSurface"
+		1 1 0 0 0
+		2 0 1
+		2 0 1
+		4
+		0 0 0
+		1 0 0
+		0 1 0
+		1 1 0
+		;
+	addAttr -ci true -sn "nts" -ln "notes" -dt "string";
+	setAttr ".nts" -type "string" "a; \"quoted\" note";
+createNode container -n "box"; createNode lambert -n "mat";
+select -ne :time1;
+	setAttr ".o" 1;
+createNode container -n "module_container";
+	setAttr ".aal" -type "attributeAlias" {"ctrl_t","borderConnections[0]","ctrl_v","borderConnections[1]"} ;
+createNode lightLinker -s -n "lightLinker1";
+connectAttr "ctrl.t" "module_container.bc[0]";
+connectAttr "mat.oc" "box.ic";
+// Last modified
+"""
+
+
+def write_scene(directory, text=SCENE):
+    path = directory / "sample.ma"
+    path.write_bytes(text.encode("latin-1"))
+    return str(path)
+
+
+def test_iter_statements_offsets(tmp_path):
+    path = write_scene(tmp_path)
+    statements = list(ma_parser.iter_statements(path))
+
+    commands = [command for command, text, offset, length in statements]
+    assert commands.count("createNode") == 6
+    assert commands[:3] == ["requires", "createNode", "setAttr"]
+
+    # Offset and length cover the statement and its ";"
+    for command, text, offset, length in statements:
+        statement = ma_parser.read_statement(path, {"offset": offset, "length": length})
+        assert statement.startswith(command)
+        assert statement.endswith(";")
+
+    # Two statements on one line, and a ";" inside a string
+    texts = [text for command, text, offset, length in statements]
+    assert 'createNode container -n "box"' in texts
+    assert 'createNode lambert -n "mat"' in texts
+    assert 'setAttr ".nts" -type "string" "a; \\"quoted\\" note"' in texts
+
+
+def test_iter_statements_filters_commands(tmp_path):
+    path = write_scene(tmp_path)
+    statements = list(ma_parser.iter_statements(path, ["connectAttr"]))
+    assert [text for command, text, offset, length in statements] == [
+        'connectAttr "ctrl.t" "module_container.bc[0]"',
+        'connectAttr "mat.oc" "box.ic"',
+    ]
+
+
+def test_parse_helpers():
+    assert ma_parser.parse_create_node(
+        'createNode nurbsSurface -n "ctrlShape" -p "ctrl"'
+    ) == ("nurbsSurface", "ctrlShape", "ctrl", False)
+    assert ma_parser.parse_create_node('createNode lightLinker -s -n "l"') == (
+        "lightLinker",
+        "l",
+        None,
+        True,
+    )
+    assert ma_parser.parse_connect_attr('connectAttr "a.t" "b.t"') == ("a.t", "b.t")
+    assert ma_parser.parse_connect_attr('connectAttr "a.t"') == None
+    assert ma_parser.parse_set_attr('setAttr ".t" -type "double3" 1 2 3') == (
+        ".t",
+        "double3",
+        False,
+    )
+    assert ma_parser.parse_set_attr('setAttr -l on ".v"') == (".v", None, True)
+    assert ma_parser.parse_set_attr("setAttr -s 4") == None
+    assert ma_parser.parse_add_attr(
+        'addAttr -ci true -sn "nts" -ln "notes" -dt "string"'
+    ) == ("notes", "nts", "string")
+
+
+def test_parse_maya_ascii(tmp_path):
+    path = write_scene(tmp_path)
+    index = ma_parser.parse_maya_ascii(path)
+
+    assert index["hash"] == ma_parser.hash_file(path)
+    assert ma_parser.find_nodes(index, "container") == ["box", "module_container"]
+    assert index["nodes"][1] == {
+        "name": "ctrlShape",
+        "type": "nurbsSurface",
+        "parent": "ctrl",
+        "shared": False,
+    }
+    assert index["add_attrs"] == [
+        {
+            "node": "ctrlShape",
+            "long_name": "notes",
+            "short_name": "nts",
+            "type": "string",
+        }
+    ]
+    assert index["connections"] == [
+        ("ctrl.t", "module_container.bc[0]"),
+        ("mat.oc", "box.ic"),
+    ]
+
+    # select -ne makes the next setAttr edit :time1
+    set_attrs = [(entry["node"], entry["attr"]) for entry in index["set_attrs"]]
+    assert (":time1", ".o") in set_attrs
+    assert ("ctrl", ".v") in set_attrs
+
+    shape = [entry for entry in index["set_attrs"] if entry["attr"] == ".cc"][0]
+    tokens = ma_parser.read_set_attr_value(path, shape)
+    assert tokens[:5] == ["1", "1", "0", "0", "0"]
+    assert len(tokens) == 5 + 3 + 3 + 1 + 12
+
+
+def test_load_index_cache(tmp_path, user_cache_directory):
+    path = write_scene(tmp_path)
+    index = ma_parser.load_index(path)
+
+    # Cached in the user cache, nothing is written next to the scene
+    index_path = ma_parser.find_index_path(path, index["hash"])
+    assert os.path.exists(index_path)
+    assert index_path.startswith(str(user_cache_directory))
+    assert os.listdir(tmp_path) == ["sample.ma"]
+    assert ma_parser.read_index(index_path, index["hash"]) == index
+    assert ma_parser.load_index(path) == index
+
+    # Editing the file replaces its cached index
+    write_scene(tmp_path, SCENE.replace('"mat"', '"other_mat"'))
+    edited = ma_parser.load_index(path)
+    assert edited["hash"] != index["hash"]
+    assert "other_mat" in ma_parser.find_nodes(edited)
+    assert os.listdir(os.path.dirname(index_path)) == [
+        os.path.basename(ma_parser.find_index_path(path, edited["hash"]))
+    ]
+
+
+def test_find_published_attributes(tmp_path):
+    path = write_scene(tmp_path)
+    index = ma_parser.load_index(path)
+    assert ma_parser.find_published_attributes(path, index) == [
+        ("module_container", "ctrl_t", "ctrl.t"),
+        ("module_container", "ctrl_v", None),
+    ]
+
+
+def test_index_caches_are_per_source_path(tmp_path):
+    # Same file name and contents in two directories: stale index cleanup of
+    # one doesn't touch the other
+    first = tmp_path / "a"
+    second = tmp_path / "b"
+    first.mkdir()
+    second.mkdir()
+    first_path = write_scene(first)
+    second_path = write_scene(second)
+
+    first_index = ma_parser.load_index(first_path)
+    ma_parser.load_index(second_path)
+    write_scene(second, SCENE.replace('"mat"', '"other_mat"'))
+    ma_parser.load_index(second_path)
+
+    first_index_path = ma_parser.find_index_path(first_path, first_index["hash"])
+    assert first_index_path != ma_parser.find_index_path(
+        second_path, first_index["hash"]
+    )
+    assert os.path.exists(first_index_path)
@@ -0,0 +1,179 @@
+from importlib import reload
+
+
+def index_jobs(cmds):
+    return [
+        job_number
+        for job_number, job in cmds.scene.script_jobs.items()
+        if job["event"][1].__name__ == "invalidate_module_index"
+    ]
+
+
+def test_reload_replaces_script_jobs(cmds):
+    import System.hook_graph as hook_graph
+    import System.module_index as module_index
+
+    module_index.get_module_index()
+    hook_graph.get_hook_graph()
+    jobs = index_jobs(cmds)
+    assert len(jobs) == len(module_index.INVALIDATING_EVENTS)
+
+    reload(module_index)
+    assert not any(job in cmds.scene.script_jobs for job in jobs)
+    assert not hook_graph.is_current()
+
+    module_index.get_module_index()
+    assert len(index_jobs(cmds)) == len(module_index.INVALIDATING_EVENTS)
+    assert not hook_graph.is_current()
+    hook_graph.get_hook_graph()
+    assert hook_graph.is_current()
+
+    cmds.emit_event("Undo")
+    assert not module_index.index_state["built"]
+
+
+def install_module(name):
+    import System.utils as utils
+
+    module_class = utils.find_module_class("/Modules/Blueprint", "single_joint_segment")
+    module = module_class(name, None)
+    module.install()
+    return module
+
+
+def count_scans(monkeypatch, cmds):
+    scans = []
+    namespace_info = cmds.namespaceInfo
+
+    def counting_namespace_info(*args, **kwargs):
+        if kwargs.get("listOnlyNamespaces"):
+            scans.append(args)
+        return namespace_info(*args, **kwargs)
+
+    monkeypatch.setattr(cmds, "namespaceInfo", counting_namespace_info)
+    return scans
+
+
+def remove_namespace(cmds, namespace):
+    cmds.lockNode(namespace + ":module_container", lock=False, lockUnpublished=False)
+    cmds.namespace(removeNamespace=namespace, deleteNamespaceContent=True)
+
+
+def test_index_is_kept_current_without_rescanning(cmds, monkeypatch):
+    import System.module_index as module_index
+
+    module_index.get_module_index()
+    generation = module_index.index_state["generation"]
+    scans = count_scans(monkeypatch, cmds)
+
+    a = install_module("a")
+    b = install_module("b")
+    b.rename_module_instance("c")
+    a.delete()
+
+    assert list(module_index.get_module_index()) == ["Single_Joint_Segment__c"]
+    assert module_index.find_module("Single_Joint_Segment__c") == {
+        "file": "single_joint_segment",
+        "class_name": "Single_Joint_Segment",
+        "user_specified_name": "c",
+        "namespace": "Single_Joint_Segment__c",
+        "container": "Single_Joint_Segment__c:module_container",
+    }
+    assert module_index.find_user_specified_names() == ["c"]
+    assert scans == []
+    assert module_index.index_state["generation"] == generation
+
+
+def test_index_is_rebuilt_after_scene_events(cmds):
+    import System.module_index as module_index
+
+    install_module("a")
+    module_index.get_module_index()
+    generation = module_index.index_state["generation"]
+
+    # Undo/redo or a new/opened scene change the modules behind the index's
+    # back; the next lookup scans the scene again
+    for event in module_index.INVALIDATING_EVENTS:
+        cmds.emit_event(event)
+        assert not module_index.index_state["built"]
+        assert module_index.find_user_specified_names() == ["a"]
+        generation += 1
+        assert module_index.index_state["generation"] == generation
+
+    cmds.file(new=True, force=True)
+    assert module_index.find_modules() == []
+
+
+def test_stale_index_is_detected(cmds, monkeypatch):
+    import System.module_index as module_index
+
+    install_module("a")
+    install_module("b")
+    assert module_index.is_module_index_consistent()
+
+    # A module deleted without going through Blueprint.delete
+    remove_namespace(cmds, "Single_Joint_Segment__a")
+    scans = count_scans(monkeypatch, cmds)
+    assert not module_index.is_module_index_consistent()
+    assert len(scans) == 2  # the check, then the rebuild
+    assert module_index.find_user_specified_names() == ["b"]
+    assert module_index.is_module_index_consistent()
+
+    # A name lookup notices the missing namespace by itself
+    remove_namespace(cmds, "Single_Joint_Segment__b")
+    assert not module_index.user_specified_name_exists("b")
+    assert module_index.find_modules() == []
+
+
+def test_allocate_user_specified_names(cmds, monkeypatch):
+    import System.module_index as module_index
+    import System.utils as utils
+
+    install_module("instance_")
+    install_module("instance_5")
+    install_module("instance_x2")
+
+    find_highest = utils.find_highest_trailing_number
+    scans = []
+
+    def counting_find_highest(names, basename):
+        scans.append(basename)
+        return find_highest(names, basename)
+
+    monkeypatch.setattr(utils, "find_highest_trailing_number", counting_find_highest)
+
+    # The first request for a basename scans the names once, a block is
+    # reserved in one call
+    assert module_index.allocate_user_specified_names("instance_") == ["instance_6"]
+    assert module_index.allocate_user_specified_names("instance_", 3) == [
+        "instance_7",
+        "instance_8",
+        "instance_9",
+    ]
+    assert scans == ["instance_"]
+
+    # Installs and renames move the mark without another scan
+    install_module("instance_12")
+    assert module_index.allocate_user_specified_names("instance_") == ["instance_13"]
+    install_module("other").rename_module_instance("instance_20")
+    assert module_index.allocate_user_specified_names("instance_") == ["instance_21"]
+    assert scans == ["instance_"]
+
+    # After an external change the mark is taken from the scene again;
+    # reserved names that were never installed are free once more
+    cmds.emit_event("Undo")
+    assert module_index.allocate_user_specified_names("instance_", 2) == [
+        "instance_21",
+        "instance_22",
+    ]
+    assert scans == ["instance_", "instance_"]
+
+
+def test_allocate_skips_names_taken_behind_the_mark(cmds):
+    import System.module_index as module_index
+
+    module_index.allocate_user_specified_names("a")
+    module_index.add_entry("single_joint_segment", "Single_Joint_Segment", "a2")
+    module_index.high_water_marks["a"] = 1
+
+    assert module_index.allocate_user_specified_names("a") == ["a3"]
@@ -0,0 +1,100 @@
+import ast
+import os
+
+import pytest
+
+import System.module_manifest as module_manifest
+
+MODULE_SOURCE = """
+import os
+
+CLASS_NAME = "Single_Joint_Segment"
+TITLE = "Single " + "Joint Segment"
+DESCRIPTION = f"Creates {'2'} joints"
+ICON = os.environ["RIGGING_TOOL_ROOT"] + "/Icons/_singleJointSeg.xpm"
+"""
+
+
+def test_extract_metadata():
+    assert module_manifest.extract_metadata(MODULE_SOURCE) == {
+        "class_name": "Single_Joint_Segment",
+        "title": "Single Joint Segment",
+        "description": "Creates 2 joints",
+        "icon": "${RIGGING_TOOL_ROOT}/Icons/_singleJointSeg.xpm",
+    }
+
+
+def test_extract_metadata_environ_lookups():
+    source = MODULE_SOURCE.replace(
+        'os.environ["RIGGING_TOOL_ROOT"]', 'os.path.join(os.getenv("ROOT"), "i")'
+    )
+    metadata = module_manifest.extract_metadata(source)
+    assert (
+        metadata["icon"] == os.path.join("${ROOT}", "i") + "/Icons/_singleJointSeg.xpm"
+    )
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        MODULE_SOURCE.replace('"Single_Joint_Segment"', "make_name()"),
+        MODULE_SOURCE.replace('TITLE = "Single " + "Joint Segment"', ""),
+        MODULE_SOURCE + "\nif (:\n",
+    ],
+)
+def test_extract_metadata_dynamic_or_missing(source):
+    assert module_manifest.extract_metadata(source) == None
+
+
+class LegacyStr(ast.AST):
+    _fields = ("s",)
+
+
+class LegacyIndex(ast.AST):
+    _fields = ("value",)
+
+
+def test_static_value_legacy_nodes(monkeypatch):
+    # The node types Python 3.7 produces for "a" + "b" and os.environ["X"]
+    monkeypatch.setattr(module_manifest, "LEGACY_STRING_NODE", LegacyStr)
+    monkeypatch.setattr(module_manifest, "LEGACY_INDEX_NODE", LegacyIndex)
+
+    concatenation = ast.BinOp(LegacyStr(s="a"), ast.Add(), LegacyStr(s="b"))
+    assert module_manifest.static_value(concatenation) == "ab"
+
+    environ = ast.Attribute(ast.Name("os", ast.Load()), "environ", ast.Load())
+    lookup = ast.Subscript(environ, LegacyIndex(LegacyStr(s="X")), ast.Load())
+    assert module_manifest.static_value(lookup) == "${X}"
+
+
+def test_find_module_metadata_uses_manifest(
+    tmp_path, user_cache_directory, monkeypatch
+):
+    monkeypatch.setenv("RIGGING_TOOL_ROOT", "/tool")
+    monkeypatch.setattr(module_manifest, "manifests", {})
+    (tmp_path / "segment.py").write_text(MODULE_SOURCE)
+
+    metadata = module_manifest.find_module_metadata(str(tmp_path), "segment")
+    assert metadata["icon"] == "/tool/Icons/_singleJointSeg.xpm"
+
+    # The manifest goes to the user cache, not the module directory
+    module_manifest.save_manifest(str(tmp_path), ["segment"])
+    manifest_path = module_manifest.find_manifest_path(str(tmp_path))
+    assert os.path.exists(manifest_path)
+    assert manifest_path.startswith(str(user_cache_directory))
+    assert os.listdir(tmp_path) == ["segment.py"]
+
+    # A new session reads the entry back without parsing the module
+    monkeypatch.setattr(module_manifest, "manifests", {})
+    monkeypatch.setattr(module_manifest, "extract_metadata", pytest.fail, raising=True)
+    assert module_manifest.find_module_metadata(str(tmp_path), "segment") == metadata
+
+
+def test_find_module_metadata_reparses_changed_module(tmp_path, monkeypatch):
+    monkeypatch.setattr(module_manifest, "manifests", {})
+    (tmp_path / "segment.py").write_text(MODULE_SOURCE)
+    module_manifest.find_module_metadata(str(tmp_path), "segment")
+
+    (tmp_path / "segment.py").write_text(MODULE_SOURCE.replace("Single_", "Double_"))
+    metadata = module_manifest.find_module_metadata(str(tmp_path), "segment")
+    assert metadata["class_name"] == "Double_Joint_Segment"
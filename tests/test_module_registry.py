@@ -0,0 +1,102 @@
+import os
+import sys
+
+import pytest
+
+MODULE_SOURCE = """
+CLASS_NAME = "Test_Module"
+TITLE = "Test Module"
+DESCRIPTION = "version %d"
+ICON = "icon.xpm"
+
+
+class Test_Module:
+    version = %d
+"""
+
+
+@pytest.fixture
+def module_directory(cmds, tmp_path, monkeypatch):
+    # <root>/Modules/RegistryTest, importable as RegistryTest.*
+    import System.utils as utils
+
+    package = tmp_path / "Modules" / "RegistryTest"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    monkeypatch.setenv("RIGGING_TOOL_ROOT", str(tmp_path))
+    monkeypatch.syspath_prepend(str(tmp_path / "Modules"))
+    utils.invalidate_module_registry()
+    yield package
+    utils.invalidate_module_registry()
+    for name in list(sys.modules):
+        if name.split(".")[0] == "RegistryTest":
+            del sys.modules[name]
+
+
+def write_module(directory, name, version, mtime):
+    path = directory / (name + ".py")
+    path.write_text(MODULE_SOURCE % (version, version))
+    os.utime(path, (mtime, mtime))
+    os.utime(directory, (mtime, mtime))
+
+
+def test_module_info_is_cached_until_the_file_changes(module_directory, monkeypatch):
+    import System.module_manifest as module_manifest
+    import System.utils as utils
+
+    write_module(module_directory, "test_module", 1, 1000)
+    infos = utils.find_all_module_info("/Modules/RegistryTest")
+    assert [(info["file"], info["class_name"]) for info in infos] == [
+        ("test_module", "Test_Module")
+    ]
+    assert infos[0]["description"] == "version 1"
+
+    # Unchanged files aren't read again
+    reads = []
+    find_module_metadata = module_manifest.find_module_metadata
+
+    def counting_find_module_metadata(directory, module):
+        reads.append(module)
+        return find_module_metadata(directory, module)
+
+    monkeypatch.setattr(
+        module_manifest, "find_module_metadata", counting_find_module_metadata
+    )
+    assert utils.find_all_module_names("/Modules/RegistryTest") == (
+        ["test_module"],
+        ["Test_Module"],
+    )
+    assert reads == []
+
+    # A changed file, or a new one, is
+    write_module(module_directory, "test_module", 22, 2000)
+    write_module(module_directory, "other_module", 3, 2000)
+    infos = utils.find_all_module_info("/Modules/RegistryTest")
+    assert [info["description"] for info in infos] == ["version 3", "version 22"]
+    assert sorted(reads) == ["other_module", "test_module"]
+
+
+def test_find_module_class_reloads_changed_modules(module_directory):
+    import System.utils as utils
+
+    write_module(module_directory, "test_module", 1, 1000)
+    module_class = utils.find_module_class("/Modules/RegistryTest", "test_module")
+    assert module_class.version == 1
+    assert utils.find_module_class("/Modules/RegistryTest", "test_module") is (
+        module_class
+    )
+
+    write_module(module_directory, "test_module", 22, 2000)
+    assert utils.find_module_class("/Modules/RegistryTest", "test_module").version == 22
+
+
+def test_invalidate_module_registry(module_directory):
+    import System.utils as utils
+
+    write_module(module_directory, "test_module", 1, 1000)
+    utils.find_all_module_info("/Modules/RegistryTest")
+    assert utils.module_registry
+
+    utils.invalidate_module_registry()
+    assert utils.module_registry == {}
+    assert utils.module_directory_listing == {}
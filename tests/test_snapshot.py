@@ -0,0 +1,88 @@
+import math
+
+import pytest
+
+
+def install_chain(cmds, count):
+    import System.bulk_install as bulk_install
+
+    specs = []
+    for index in range(count):
+        hook_object = None
+        if index > 0:
+            hook_object = "Single_Joint_Segment__m%d:end_joint_translation_control" % (
+                index - 1
+            )
+        specs.append(
+            {
+                "module": "single_joint_segment",
+                "user_specified_name": "m%d" % index,
+                "hook_object": hook_object,
+                "joint_positions": [[index, 0, 0], [index, 4, 1]],
+            }
+        )
+    return bulk_install.install_modules(specs)
+
+
+def assert_same_specs(specs, expected):
+    assert len(specs) == len(expected)
+    for spec, expected_spec in zip(specs, expected):
+        for key in ["module", "user_specified_name", "hook_object", "root_constrained"]:
+            assert spec[key] == expected_spec[key]
+        assert spec["rotation_orders"] == expected_spec["rotation_orders"]
+        assert spec["joint_positions"] == [
+            pytest.approx(position) for position in expected_spec["joint_positions"]
+        ]
+        assert [math.isnan(value) or value for value in spec["orientations"]] == [
+            math.isnan(value) or value for value in expected_spec["orientations"]
+        ]
+
+
+def test_save_load_round_trip(cmds, tmp_path):
+    import System.snapshot as snapshot
+
+    modules = install_chain(cmds, 3)
+    cmds.setAttr("Single_Joint_Segment__m1:root_joint_orientation_control.rotateX", 33)
+    cmds.setAttr("Single_Joint_Segment__m1:root_joint.rotateOrder", 3)
+    modules[2].constrain_root_to_hook()
+
+    path = str(tmp_path / "layout.bps")
+    assert snapshot.save_snapshot(path) == 3
+    specs = snapshot.read_snapshot(path)
+
+    assert [spec["hook_object"] for spec in specs] == [
+        None,
+        "Single_Joint_Segment__m0:end_joint_translation_control",
+        "Single_Joint_Segment__m1:end_joint_translation_control",
+    ]
+    assert specs[1]["orientations"][0] == 33
+    assert math.isnan(specs[1]["orientations"][1])  # the end joint has none
+    assert specs[1]["rotation_orders"] == [3, 0]
+    assert specs[2]["joint_positions"][1] == pytest.approx([2, 4, 1])
+    assert [spec["root_constrained"] for spec in specs] == [False, False, True]
+
+    cmds.file(new=True, force=True)
+    loaded = snapshot.load_snapshot(path)
+
+    assert [module.user_specified_name for module in loaded] == ["m0", "m1", "m2"]
+    assert (
+        cmds.getAttr("Single_Joint_Segment__m1:root_joint_orientation_control.rotateX")
+        == 33
+    )
+    assert cmds.getAttr("Single_Joint_Segment__m1:root_joint.rotateOrder") == 3
+    assert loaded[2].is_root_constrained()
+    assert not loaded[1].is_root_constrained()
+
+    # Saving the loaded scene gives the same snapshot back
+    resaved_path = str(tmp_path / "resaved.bps")
+    snapshot.save_snapshot(resaved_path)
+    assert_same_specs(snapshot.read_snapshot(resaved_path), specs)
+
+
+def test_read_rejects_other_files(tmp_path):
+    import System.snapshot as snapshot
+
+    path = tmp_path / "scene.ma"
+    path.write_bytes(b"//Maya ASCII 2022 scene\n")
+    with pytest.raises(ValueError, match="Not a blueprint snapshot"):
+        snapshot.read_snapshot(str(path))
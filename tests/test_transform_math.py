@@ -0,0 +1,96 @@
+import math
+
+import pytest
+
+import System.transform_math as transform_math
+
+
+def rotation_rows(rotation):
+    # Rows of Rx * Ry * Rz, Maya's xyz rotate order for row vectors, written
+    # out by hand so the expected values don't come from transform_math
+    x, y, z = [math.radians(value) for value in rotation]
+    rx = [[1, 0, 0], [0, math.cos(x), math.sin(x)], [0, -math.sin(x), math.cos(x)]]
+    ry = [[math.cos(y), 0, -math.sin(y)], [0, 1, 0], [math.sin(y), 0, math.cos(y)]]
+    rz = [[math.cos(z), math.sin(z), 0], [-math.sin(z), math.cos(z), 0], [0, 0, 1]]
+    return multiply_rows(multiply_rows(rx, ry), rz)
+
+
+def multiply_rows(a, b):
+    return [
+        [sum(a[i][k] * b[k][j] for k in range(3)) for j in range(3)] for i in range(3)
+    ]
+
+
+def as_matrix(rows):
+    return rows[0] + [0.0] + rows[1] + [0.0] + rows[2] + [0.0] + [0.0, 0.0, 0.0, 1.0]
+
+
+IDENTITY = as_matrix(rotation_rows([0, 0, 0]))
+
+
+# (joint orient, parent rotation, twist). The joint's aim and up vectors are
+# the X and Y rows of its world rotation before the twist, as Maya's joint
+# tools leave them, and the expected jointOrient includes the twist about X.
+ORIENTATION_CASES = [
+    ([0, 0, 0], [0, 0, 0], 0),
+    ([0, 0, 90], [0, 0, 0], 0),
+    ([0, 90, 0], [0, 0, 0], 0),
+    ([0, 0, 0], [0, 0, 0], 30),
+    ([10, 20, 30], [0, 0, 0], 0),
+    ([0, -35, 120], [0, 0, 0], -45),
+    ([0, 0, 0], [0, 0, 90], 0),
+    ([0, 25, 60], [15, -30, 45], 0),
+]
+
+
+@pytest.mark.parametrize("orient, parent_rotation, twist", ORIENTATION_CASES)
+def test_solve_joint_orientations(orient, parent_rotation, twist):
+    parent_rows = rotation_rows(parent_rotation)
+    world_rows = multiply_rows(rotation_rows([0] + orient[1:]), parent_rows)
+
+    solved = transform_math.solve_joint_orientations(
+        [world_rows[0]], [world_rows[1]], [orient[0] + twist], [as_matrix(parent_rows)]
+    )
+
+    expected = [orient[0] + twist] + orient[1:]
+    assert solved[0] == pytest.approx(expected, abs=1e-9)
+
+
+def test_solve_joint_orientations_batches_joints():
+    cases = [
+        ([1, 0, 0], [0, 1, 0], 0.0, [0, 0, 0]),
+        ([0, 1, 0], [-1, 0, 0], 0.0, [0, 0, 90]),
+        ([0, 0, -1], [0, 1, 0], 15.0, [15, 90, 0]),
+    ]
+    solved = transform_math.solve_joint_orientations(
+        [case[0] for case in cases],
+        [case[1] for case in cases],
+        [case[2] for case in cases],
+        [IDENTITY] * len(cases),
+    )
+
+    for orientation, case in zip(solved, cases):
+        assert orientation == pytest.approx(case[3], abs=1e-9)
+
+
+def test_solve_joint_orientations_degenerate_aim():
+    # A zero length segment keeps the parent's orientation
+    parent_rows = rotation_rows([0, 0, 90])
+    solved = transform_math.solve_joint_orientations(
+        [[0, 0, 0]], [[0, 1, 0]], [0.0], [as_matrix(parent_rows)]
+    )
+    assert solved[0] == pytest.approx([0, 0, -90], abs=1e-9)
+
+
+def test_matrix_to_euler_round_trip():
+    for rotate_order in transform_math.ROTATE_ORDERS:
+        rotation = [12.5, -40.0, 75.0]
+        matrix = transform_math.euler_to_matrix(rotation, rotate_order)
+        assert transform_math.matrix_to_euler(matrix, rotate_order) == pytest.approx(
+            rotation, abs=1e-9
+        )
+
+
+def test_euler_to_matrix_matches_maya_xyz():
+    matrix = transform_math.euler_to_matrix([10, 20, 30], "xyz")
+    assert matrix == pytest.approx(as_matrix(rotation_rows([10, 20, 30])), abs=1e-12)
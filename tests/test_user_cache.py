@@ -0,0 +1,32 @@
+import os
+import sys
+import types
+
+import System.user_cache as user_cache
+
+
+def test_cache_paths_are_keyed_by_source_path(user_cache_directory, tmp_path):
+    first = user_cache.find_cache_path("kind", str(tmp_path / "a"), ".json")
+    second = user_cache.find_cache_path("kind", str(tmp_path / "b"), ".json")
+
+    assert os.path.dirname(first) == str(user_cache_directory / "kind")
+    assert first.endswith(".json")
+    assert first != second
+    assert first == user_cache.find_cache_path(
+        "kind", str(tmp_path / "x" / ".." / "a"), ".json"
+    )
+
+
+def test_cache_root_in_maya(monkeypatch):
+    monkeypatch.delenv(user_cache.CACHE_ENVIRONMENT_VARIABLE)
+
+    maya_cmds = types.ModuleType("maya.cmds")
+    maya_cmds.internalVar = lambda userAppDir: "/home/me/maya/"
+    monkeypatch.setitem(sys.modules, "maya.cmds", maya_cmds)
+    assert user_cache.find_cache_root() == "/home/me/maya/rigging_tool_cache"
+
+    # Without Maya, the platform's user cache directory
+    monkeypatch.delitem(sys.modules, "maya.cmds")
+    monkeypatch.setattr(sys, "platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", "/home/me/.cache")
+    assert user_cache.find_cache_root() == "/home/me/.cache/rigging_tool"
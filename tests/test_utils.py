@@ -0,0 +1,328 @@
+import pytest
+
+
+def build_chain(cmds, names_and_positions):
+    cmds.select(clear=True)
+    return [cmds.joint(n=name, p=position) for name, position in names_and_positions]
+
+
+def test_find_joint_chain(cmds):
+    import System.utils as utils
+
+    build_chain(cmds, [("a", (0, 0, 0)), ("b", (2, 0, 0)), ("c", (5, 0, 0))])
+
+    joints, rest_lengths = utils.find_joint_chain("a", "c")
+    assert joints == ["b", "c"]
+    assert list(rest_lengths) == [2.0, 3.0]
+
+    joints, rest_lengths = utils.find_joint_chain("a", "b")
+    assert joints == ["b"]
+    assert list(rest_lengths) == [2.0]
+
+
+def test_find_joint_chain_end_not_below_root(cmds):
+    # Walks the root's first children, as the original chain walk did
+    import System.utils as utils
+
+    build_chain(cmds, [("a", (0, 0, 0)), ("b", (2, 0, 0)), ("c", (5, 0, 0))])
+    build_chain(cmds, [("x", (0, 1, 0)), ("y", (0, 4, 0))])
+
+    joints, rest_lengths = utils.find_joint_chain("a", "y")
+    assert joints == ["b", "c"]
+    assert list(rest_lengths) == [2.0, 3.0]
+
+
+def count_calls(monkeypatch, module, name):
+    calls = []
+    function = getattr(module, name)
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, counting)
+    return calls
+
+
+def test_world_queries_are_batched(cmds, monkeypatch):
+    import System.utils as utils
+
+    build_chain(cmds, [("a", (0, 0, 0)), ("b", (2, 0, 0)), ("c", (5, 1, 0))])
+    cmds.setAttr("a.rotateZ", 90)
+
+    expected_positions = []
+    expected_matrices = []
+    for node in ["c", "a", "c"]:
+        expected_positions += cmds.xform(node, q=True, ws=True, t=True)
+        expected_matrices += cmds.xform(node, q=True, ws=True, m=True)
+
+    calls = count_calls(monkeypatch, cmds, "xform")
+    positions = utils.get_world_positions(["c", "a", "c"])
+    matrices = utils.get_world_matrices(["c", "a", "c"])
+
+    assert len(calls) == 2
+    assert positions.typecode == "d" and matrices.typecode == "d"
+    assert list(positions) == expected_positions
+    assert list(matrices) == expected_matrices
+    assert utils.split_rows(positions, 3)[1] == [0.0, 0.0, 0.0]
+    assert len(utils.get_world_positions([])) == 0
+
+
+def test_world_queries_fall_back_per_node(cmds, monkeypatch):
+    # A combined result of the wrong length is not read back
+    import System.utils as utils
+
+    build_chain(cmds, [("a", (0, 0, 0)), ("b", (2, 0, 0))])
+    xform = cmds.xform
+
+    def single_result_xform(nodes, **kwargs):
+        if isinstance(nodes, list):
+            return xform(nodes[0], **kwargs)
+        return xform(nodes, **kwargs)
+
+    monkeypatch.setattr(cmds, "xform", single_result_xform)
+    assert list(utils.get_world_positions(["a", "b"])) == [0, 0, 0, 2, 0, 0]
+
+
+class FakeOpenMaya:
+    # Just enough maya.api.OpenMaya for find_dag_paths, reading headless nodes
+    def __init__(self, cmds):
+        fake = self
+        xform = cmds.xform
+
+        class MDagPath:
+            def __init__(self, node):
+                self.node = node
+
+            def inclusiveMatrix(self):
+                return xform(self.node, q=True, ws=True, m=True)
+
+        class MSelectionList:
+            def __init__(self):
+                self.nodes = []
+
+            def add(self, node):
+                fake.added.append(node)
+                if not cmds.objExists(node):
+                    raise RuntimeError(node)
+                long_name = cmds.ls(node, long=True)[0]
+                if long_name not in self.nodes:
+                    self.nodes.append(long_name)
+
+            def length(self):
+                return len(self.nodes)
+
+            def getDagPath(self, index):
+                return MDagPath(self.nodes[index])
+
+        class MDistance:
+            @staticmethod
+            def internalToUI(value):
+                return value
+
+        class MVector:
+            def __init__(self, values):
+                self.x, self.y, self.z = values
+
+        class MFnTransform:
+            def __init__(self, dag_path):
+                self.node = dag_path.node
+
+            def translation(self, space):
+                assert space == "kTransform"
+                return MVector(xform(self.node, q=True, os=True, t=True))
+
+        class MSpace:
+            kTransform = "kTransform"
+
+        self.added = []
+        self.MSelectionList = MSelectionList
+        self.MDistance = MDistance
+        self.MFnTransform = MFnTransform
+        self.MSpace = MSpace
+
+
+def test_world_queries_use_open_maya(cmds, monkeypatch):
+    import System.utils as utils
+
+    build_chain(cmds, [("a", (0, 0, 0)), ("b", (2, 0, 0))])
+    cmds.setAttr("a.rotateY", 45)
+    expected = list(utils.get_world_matrices(["b", "a", "b"]))
+
+    open_maya = FakeOpenMaya(cmds)
+    monkeypatch.setattr(utils, "import_open_maya", lambda: open_maya)
+    calls = count_calls(monkeypatch, cmds, "xform")
+
+    # Repeated nodes are added to the selection once
+    assert list(utils.get_world_matrices(["b", "a", "b"])) == expected
+    assert list(utils.get_world_positions(["a", "b"])) == (
+        expected[28:31] + expected[12:15]
+    )
+    assert open_maya.added == ["b", "a", "a", "b"]
+    assert calls == []
+
+    # A name OpenMaya can't resolve falls back to xform, which raises for it
+    # as before
+    assert utils.find_dag_paths(["a", "missing"]) == None
+
+
+def test_rest_lengths_are_read_in_one_query(cmds, monkeypatch):
+    import System.utils as utils
+
+    build_chain(cmds, [("a", (0, 0, 0)), ("b", (2, 0, 0)), ("c", (5, 0, 0))])
+    cmds.select(clear=True)
+
+    xform_calls = count_calls(monkeypatch, cmds, "xform")
+    get_attr_calls = count_calls(monkeypatch, cmds, "getAttr")
+    joints, rest_lengths = utils.find_joint_chain("a", "c")
+
+    assert list(rest_lengths) == [2.0, 3.0]
+    assert len(xform_calls) == 1
+    assert get_attr_calls == []
+
+    monkeypatch.undo()
+    open_maya = FakeOpenMaya(cmds)
+    monkeypatch.setattr(utils, "import_open_maya", lambda: open_maya)
+    assert list(utils.get_rest_lengths(["b", "c"])) == [2.0, 3.0]
+
+
+def record_calls(monkeypatch, module, name):
+    # Like count_calls, with keyword arguments
+    calls = []
+    function = getattr(module, name)
+
+    def recording(*args, **kwargs):
+        calls.append((args, kwargs))
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, recording)
+    return calls
+
+
+def test_force_scene_update_touches_only_the_module(cmds, monkeypatch):
+    import System.bulk_install as bulk_install
+    import System.utils as utils
+
+    for index in range(50):
+        cmds.group(empty=True, name="geo_%d" % index)
+    module = bulk_install.install_modules(
+        [{"module": "single_joint_segment", "user_specified_name": "a"}]
+    )[0]
+
+    dirtied = record_calls(monkeypatch, cmds, "dgdirty")
+    selects = record_calls(monkeypatch, cmds, "select")
+    utils.force_scene_update(module.container_name)
+
+    assert len(dirtied) == 1
+    nodes = dirtied[0][0][0]
+    assert nodes and all(node.startswith(module.module_namespace) for node in nodes)
+    assert selects == [((), {"clear": True})]
+
+    # A list of containers is refreshed in one pass; no container refreshes all
+    dirtied[:] = []
+    utils.force_scene_update([module.container_name, module.container_name])
+    assert len(dirtied) == 1
+    utils.force_scene_update()
+    assert dirtied[1] == ((), {"allPlugs": True})
+
+
+def test_container_additions_are_batched(cmds, monkeypatch):
+    import System.utils as utils
+
+    nodes = [cmds.group(empty=True, name=name) for name in "abcd"]
+    cmds.createNode("unitConversion", name="conversion")
+    cmds.connectAttr("a.translateX", "conversion.input")
+    cmds.connectAttr("conversion.output", "b.rotateX")
+    first = cmds.container(name="first")
+    second = cmds.container(name="second")
+
+    connection_queries = count_calls(monkeypatch, cmds, "listConnections")
+    container_edits = record_calls(monkeypatch, cmds, "container")
+    with utils.container_batch():
+        with utils.container_batch():
+            utils.add_node_to_container(first, ["a", "b"])
+        utils.add_node_to_container(first, [["b"], "c"])
+        utils.add_node_to_container(second, "d")
+        assert container_edits == []
+
+    # One query for the conversion nodes and one command per container, the
+    # conversion node joining the container of the first node it connects to
+    assert len(connection_queries) == 1
+    assert [kwargs["addNode"] for args, kwargs in container_edits] == [
+        ["a", "b", "c", "conversion"],
+        ["d"],
+    ]
+    monkeypatch.undo()
+    assert cmds.container(first, q=True, nodeList=True) == [
+        "a",
+        "b",
+        "c",
+        "conversion",
+    ]
+    assert cmds.container(second, q=True, nodeList=True) == nodes[3:]
+
+
+def evaluate_stretch(cmds, plug, distance):
+    # translateX through the stretch network's multiplyDivide nodes, with the
+    # distanceBetween node reading distance
+    node, _, attr = plug.partition(".")
+    connections = (
+        cmds.listConnections(
+            node, source=True, destination=False, connections=True, plugs=True
+        )
+        or []
+    )
+    sources = dict(zip(connections[0::2], connections[1::2]))
+    if plug in sources:
+        return evaluate_stretch(cmds, sources[plug], distance)
+    if attr == "distance":
+        return distance
+    if attr.startswith("output"):
+        channel = attr[-1]
+        input1 = evaluate_stretch(cmds, node + ".input1" + channel, distance)
+        input2 = evaluate_stretch(cmds, node + ".input2" + channel, distance)
+        if cmds.getAttr(node + ".operation") == 2:
+            return input1 / input2
+        return input1 * input2
+    return cmds.getAttr(plug)
+
+
+@pytest.mark.parametrize("joint_count", [2, 4, 8])
+def test_packed_stretch_matches_unpacked(cmds, joint_count):
+    import System.utils as utils
+
+    results = []
+    for pack_channels in [False, True]:
+        cmds.file(new=True, force=True)
+        positions = [0.0, 2.0, 2.0] + [3.0 + index for index in range(joint_count)]
+        joints = build_chain(
+            cmds,
+            [
+                ("j%d" % index, (position, 0, 0))
+                for index, position in enumerate(positions[:joint_count])
+            ],
+        )
+        nodes = utils.basic_stretchy_ik(
+            joints[0], joints[-1], pack_channels=pack_channels
+        )
+        rest_lengths = [cmds.getAttr(joint + ".translateX") for joint in joints[1:]]
+        results.append(
+            (
+                sorted(nodes),
+                len(cmds.ls(type="multiplyDivide")),
+                [
+                    evaluate_stretch(cmds, joint + ".translateX", 12.0)
+                    for joint in joints[1:]
+                ],
+            )
+        )
+
+    (keys, node_count, translations), (packed_keys, packed_count, packed) = results
+    assert packed_keys == keys
+    assert node_count == joint_count  # scale factor plus one per child joint
+    assert packed_count == (joint_count + 1) // 3
+    assert packed == pytest.approx(translations)
+    total = sum(rest_lengths)
+    assert translations == pytest.approx(
+        [length * 12.0 / total for length in rest_lengths]
+    )
@@ -0,0 +1,153 @@
+import json
+
+import System.validate_scenes as validate_scenes
+
+CLASS_NAMES = {"Single_Joint_Segment"}
+
+
+def blueprint_module(namespace, hook_object=None):
+    if hook_object == None:
+        hook_object = namespace + ":unhookedTarget"
+
+    return "\n".join(
+        [
+            'createNode container -n "%s:module_container";' % namespace,
+            'createNode transform -n "%s:root_joint_translation_control";' % namespace,
+            'createNode transform -n "%s:end_joint_translation_control";' % namespace,
+            'createNode transform -n "%s:unhookedTarget";' % namespace,
+            'createNode pointConstraint -n "%s:hook_pointConstraint";' % namespace,
+            'connectAttr "%s.pm" "%s:hook_pointConstraint.tg[0].tpm";'
+            % (hook_object, namespace),
+        ]
+    )
+
+
+def write_scene(directory, name, *parts):
+    path = directory / name
+    path.write_text(
+        "//Maya ASCII 2022 scene\nrequires maya \"2022\";\n" + "\n".join(parts) + "\n"
+    )
+    return str(path)
+
+
+def issue_codes(result):
+    return sorted((issue["module"], issue["code"]) for issue in result["issues"])
+
+
+def test_non_module_namespaces_are_ignored(tmp_path):
+    path = write_scene(
+        tmp_path,
+        "scene.ma",
+        blueprint_module("Single_Joint_Segment__a"),
+        'createNode transform -n "controlObjectTemplates:templates_grp";',
+        'createNode transform -n "controlObjectTemplates:translation_control"'
+        ' -p "controlObjectTemplates:templates_grp";',
+        'createNode lambert -n "controlObjectTemplates:m_translation_control";',
+        'createNode transform -n "geo:body";',
+        'createNode transform -n "char:rig:arm_ctrl";',
+        'createNode transform -n "other__tool:node";',
+    )
+
+    result = validate_scenes.validate_scene(path, CLASS_NAMES)
+    assert result["issues"] == []
+    assert list(result["modules"]) == ["Single_Joint_Segment__a"]
+
+    # Without the class list, Class__name namespaces are all taken for modules
+    result = validate_scenes.validate_scene(path)
+    assert sorted(result["modules"]) == ["Single_Joint_Segment__a", "other__tool"]
+
+
+def test_unknown_module_class_is_a_warning(tmp_path):
+    path = write_scene(tmp_path, "scene.ma", blueprint_module("Old_Module__a"))
+
+    result = validate_scenes.validate_scene(path, CLASS_NAMES)
+    assert issue_codes(result) == [("Old_Module__a", "unknown_module_class")]
+    assert result["issues"][0]["severity"] == "warning"
+
+
+def test_hooks(tmp_path):
+    path = write_scene(
+        tmp_path,
+        "scene.ma",
+        blueprint_module("Single_Joint_Segment__root"),
+        blueprint_module(
+            "Single_Joint_Segment__child",
+            "Single_Joint_Segment__root:end_joint_translation_control",
+        ),
+        blueprint_module(
+            "Single_Joint_Segment__broken",
+            "Single_Joint_Segment__gone:end_joint_translation_control",
+        ),
+        blueprint_module("Single_Joint_Segment__geo", "geo:body"),
+        'createNode transform -n "geo:body";',
+    )
+
+    result = validate_scenes.validate_scene(path, CLASS_NAMES)
+    assert issue_codes(result) == [
+        ("Single_Joint_Segment__broken", "broken_hook"),
+        ("Single_Joint_Segment__geo", "invalid_hook_target"),
+    ]
+    assert result["modules"]["Single_Joint_Segment__child"]["hook"] == (
+        "Single_Joint_Segment__root:end_joint_translation_control"
+    )
+
+
+def test_hook_cycle(tmp_path):
+    path = write_scene(
+        tmp_path,
+        "scene.ma",
+        blueprint_module(
+            "Single_Joint_Segment__a",
+            "Single_Joint_Segment__b:end_joint_translation_control",
+        ),
+        blueprint_module(
+            "Single_Joint_Segment__b",
+            "Single_Joint_Segment__a:end_joint_translation_control",
+        ),
+    )
+
+    result = validate_scenes.validate_scene(path, CLASS_NAMES)
+    assert issue_codes(result) == [("Single_Joint_Segment__a", "hook_cycle")]
+
+
+def test_module_states(tmp_path):
+    path = write_scene(
+        tmp_path,
+        "scene.ma",
+        'createNode transform -n "Single_Joint_Segment__nocontainer:unhookedTarget";',
+        'createNode container -n "Single_Joint_Segment__half:module_container";',
+        'createNode transform -n "Single_Joint_Segment__half:unhookedTarget";',
+        'createNode transform -n "Single_Joint_Segment__half:HOOK_IN";',
+        'createNode container -n "Single_Joint_Segment__locked:module_container";',
+        'createNode transform -n "Single_Joint_Segment__locked:HOOK_IN";',
+    )
+
+    result = validate_scenes.validate_scene(path, CLASS_NAMES)
+    assert issue_codes(result) == [
+        ("Single_Joint_Segment__half", "half_locked"),
+        ("Single_Joint_Segment__locked", "incomplete_lock"),
+        ("Single_Joint_Segment__nocontainer", "missing_hook_constraint"),
+        ("Single_Joint_Segment__nocontainer", "missing_module_container"),
+    ]
+    assert result["modules"]["Single_Joint_Segment__locked"]["state"] == "locked"
+
+
+def test_main_writes_report(tmp_path, capsys):
+    scenes = tmp_path / "scenes"
+    scenes.mkdir()
+    write_scene(scenes, "good.ma", blueprint_module("Single_Joint_Segment__a"))
+    report_path = tmp_path / "report.json"
+
+    exit_code = validate_scenes.main(
+        [str(scenes), "--jobs", "1", "--report", str(report_path)]
+    )
+    assert exit_code == 0
+    assert json.loads(report_path.read_text())["files"] == 1
+
+    write_scene(
+        scenes,
+        "bad.ma",
+        blueprint_module("Single_Joint_Segment__b", "Single_Joint_Segment__x:ctrl"),
+    )
+    assert validate_scenes.main([str(scenes), "--jobs", "2", "--quiet"]) == 1
+    assert "2 files, 2 modules, 1 with errors" in capsys.readouterr().out